@@ -4,7 +4,6 @@ Base agent class for financial AI agents.
 
 import os
 import json
-from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Callable, Tuple
 import re
@@ -155,40 +154,8 @@ class BaseAgent(ABC):
         for tool in self.tools:
             if tool.__name__ == tool_name:
                 try:
-                    # region agent log
-                    try:
-                        from datetime import datetime as _dt
-                        with open("/Users/danielli/Documents/penn/fa25/is/.cursor/debug.log", "a") as _f:
-                            _f.write(json.dumps({
-                                "sessionId": "debug-session",
-                                "runId": "run-docs-missing-pre",
-                                "hypothesisId": "H4",
-                                "location": "base_agent.py:_execute_tool:entry",
-                                "message": "executing tool",
-                                "data": {"tool": tool_name, "arguments": arguments},
-                                "timestamp": int(_dt.now().timestamp() * 1000),
-                            }) + "\n")
-                    except Exception:
-                        pass
-                    # endregion
                     return tool(**arguments)
                 except Exception as e:
-                    # region agent log
-                    try:
-                        from datetime import datetime as _dt
-                        with open("/Users/danielli/Documents/penn/fa25/is/.cursor/debug.log", "a") as _f:
-                            _f.write(json.dumps({
-                                "sessionId": "debug-session",
-                                "runId": "run-docs-missing-pre",
-                                "hypothesisId": "H4",
-                                "location": "base_agent.py:_execute_tool:exception",
-                                "message": "tool raised exception",
-                                "data": {"tool": tool_name, "error": str(e)},
-                                "timestamp": int(_dt.now().timestamp() * 1000),
-                            }) + "\n")
-                    except Exception:
-                        pass
-                    # endregion
                     return {"error": f"Tool execution failed: {str(e)}"}
         
         return {"error": f"Tool {tool_name} not found"}
@@ -548,26 +515,6 @@ class BaseAgent(ABC):
             result = self._execute_tool(action, parsed_args)
             tool_results.append({"tool": action, "arguments": parsed_args, "result": result})
             
-            # region agent log
-            try:
-                with open("/Users/danielli/Documents/penn/fa25/is/.cursor/debug.log", "a") as _f:
-                    _f.write(json.dumps({
-                        "sessionId": "debug-session",
-                        "runId": "run2",
-                        "hypothesisId": "H2",
-                        "location": "base_agent.py:_process_query_react_text:tool_exec",
-                        "message": "tool executed",
-                        "data": {
-                            "action": action,
-                            "arguments": parsed_args,
-                            "result_preview": str(result)[:500],
-                        },
-                        "timestamp": int(datetime.now().timestamp() * 1000),
-                    }) + "\n")
-            except Exception:
-                pass
-            # endregion
-            
             observation_text = json.dumps(result, default=str)
             step["observation"] = observation_text
             trace.append(step)
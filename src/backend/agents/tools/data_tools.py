@@ -61,15 +61,14 @@ def _try_ensure_fundamentals(ticker: str, config: ETLConfig) -> Dict[str, Any]:
         # Local imports to keep tool import cost low
         from ingestion.fetch_filings import fetch_fundamentals
         from processing.process_fundamentals import combine_fundamentals
+        from utils.storage import write_ticker_parquet
 
         fundamentals_data = fetch_fundamentals(ticker.upper())
         if fundamentals_data and "annualReports" in fundamentals_data:
             df = pd.DataFrame(fundamentals_data["annualReports"])
             if not df.empty:
                 df["ticker"] = ticker.upper()
-                config.RAW_FUNDAMENTALS_DIR.mkdir(parents=True, exist_ok=True)
-                save_path = config.RAW_FUNDAMENTALS_DIR / f"{ticker.upper()}_fundamentals.parquet"
-                df.to_parquet(save_path, index=False)
+                write_ticker_parquet(df, config.RAW_FUNDAMENTALS_DIR / f"{ticker.upper()}_fundamentals.parquet")
                 status["fetched"] = True
 
         combine_fundamentals(
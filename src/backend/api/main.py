@@ -2,30 +2,97 @@
 FastAPI application for serving processed financial data and triggering ETL pipelines.
 """
 
+import asyncio
+import functools
+import hashlib
 import os
+import re
 import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Tuple
 
 # Add parent directories to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse, Response
 import pandas as pd
 import numpy as np
-import math
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 
-from etl.orchestrator import run_etl_pipeline
-from etl.auto_orchestrator import run_autonomous
-from etl.config import ETLConfig
+from etl.orchestrator import finalize_indices, run_etl_pipeline
+from etl.auto_orchestrator import index_job_key, index_jobs, run_autonomous_async
+from etl.config import ETLConfig, PARQUET_WRITE_OPTIONS
+from etl.jobs import ETLJobQueue
+from etl.state import etl_state_is_current, load_etl_state, parquet_contains_ticker, ticker_datasets
+from etl.ticker_cache import (
+    TICKER_DATASETS,
+    read_ticker_table,
+    render_ticker_payload,
+    resolve_ticker_source,
+    ticker_cache_path,
+)
 from retrieval.retrieval_service import get_retrieval_service
 from agents.research_agent import ResearchAgent
+from utils.serialization import clean_dataframe_for_json, dumps_json
+from utils.logger import get_logger
 from pydantic import BaseModel
 
-app = FastAPI(title="Financial Data ETL API", version="1.0.0")
+logger = get_logger(__name__)
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse encoded with orjson (C float/list encoding, numpy-aware)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
+
+
+# Global agent instance
+_research_agent = None
+_research_agent_lock = threading.Lock()
+
+def get_research_agent() -> ResearchAgent:
+    """Get or create global research agent instance."""
+    global _research_agent
+    if _research_agent is None:
+        # Double-checked so concurrent first calls build a single instance
+        with _research_agent_lock:
+            if _research_agent is None:
+                _research_agent = ResearchAgent()
+    return _research_agent
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build the retrieval service and research agent before serving requests."""
+    try:
+        await run_in_threadpool(get_retrieval_service)
+        await run_in_threadpool(get_research_agent)
+    except Exception as e:
+        # Don't block startup (e.g. missing API key); the getters retry lazily
+        logger.warning(f"Eager initialization failed, falling back to lazy init: {e}")
+    yield
+
+
+app = FastAPI(
+    title="Financial Data ETL API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
 config = ETLConfig()
+etl_jobs = ETLJobQueue(max_workers=config.ETL_MAX_CONCURRENT_JOBS)
 
 # Add CORS middleware
 app.add_middleware(
@@ -36,49 +103,474 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+class EncodedPassthroughGZipMiddleware:
+    """
+    GZipMiddleware for every response that doesn't already carry a
+    Content-Encoding. Precompressed responses (the .json.gz payloads) go
+    straight to the client: only recent Starlette releases skip them on
+    their own, older ones gzip them a second time.
+    """
+
+    def __init__(self, app, **gzip_options):
+        self.app = app
+        self.gzip_options = gzip_options
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoded = False
+
+        async def route(scope, receive, gzip_send):
+            async def send_message(message):
+                nonlocal encoded
+                if message["type"] == "http.response.start":
+                    encoded = any(name.lower() == b"content-encoding" for name, _ in message.get("headers", []))
+                await (send if encoded else gzip_send)(message)
+
+            await self.app(scope, receive, send_message)
+
+        await GZipMiddleware(route, **self.gzip_options)(scope, receive, send)
+
 
-def load_parquet_file(filepath: Path) -> pd.DataFrame:
-    """Helper to load parquet file with error handling."""
-    if not filepath.exists():
+# Compress JSON/Arrow bodies for clients that accept gzip
+app.add_middleware(EncodedPassthroughGZipMiddleware, minimum_size=1024, compresslevel=4)
+
+
+# Existence checks are cached briefly: the same handful of paths are stat'ed on
+# every request, and ETL runs are far less frequent than the TTL.
+PATH_EXISTS_TTL_SECONDS = 2.0
+PATH_EXISTS_MAX_ENTRIES = 1024
+_path_exists_cache: Dict[str, Tuple[float, bool]] = {}
+
+
+def path_exists(path: Path) -> bool:
+    """Path.exists() memoized for PATH_EXISTS_TTL_SECONDS."""
+    key = str(path)
+    now = time.monotonic()
+    hit = _path_exists_cache.get(key)
+    if hit is not None and now - hit[0] < PATH_EXISTS_TTL_SECONDS:
+        return hit[1]
+    exists = path.exists()
+    if len(_path_exists_cache) >= PATH_EXISTS_MAX_ENTRIES:
+        # Filing/transcript names come from the client; keep the cache bounded
+        _path_exists_cache.clear()
+    _path_exists_cache[key] = (now, exists)
+    return exists
+
+
+# One lock per combined file, so concurrent misses for different tickers of
+# the same file decode it once (reads run on threadpool workers)
+_index_locks: Dict[str, threading.Lock] = {}
+_index_locks_guard = threading.Lock()
+
+
+@functools.lru_cache(maxsize=8)
+def _read_indexed_table(
+    dataset: str, path_str: str, mtime_ns: int
+) -> Tuple[pa.Table, Optional[Dict[str, np.ndarray]]]:
+    """
+    Decode a combined file once per (path, mtime) with a {ticker: row indices} index.
+
+    The index turns per-request ticker filtering into a hash lookup plus an
+    O(rows for that ticker) take. It is None when the file has no ticker column.
+    """
+    table = read_ticker_table(dataset, Path(path_str))
+    if "ticker" not in table.column_names:
+        return table, None
+    tickers = table.column("ticker").to_pandas()
+    return table, tickers.groupby(tickers, observed=True, sort=False).indices
+
+
+@functools.lru_cache(maxsize=2)
+def _load_etl_state_cached(path_str: str, mtime_ns: int) -> Optional[Dict[str, Any]]:
+    return load_etl_state(Path(path_str))
+
+
+def etl_state() -> Optional[Dict[str, Any]]:
+    """The ETL state index, re-read only when the file changes; None if not written yet."""
+    state_file = config.ETL_STATE_FILE
+    if not path_exists(state_file):
+        return None
+    try:
+        return _load_etl_state_cached(str(state_file), state_file.stat().st_mtime_ns)
+    except Exception:
+        return None
+
+
+@functools.lru_cache(maxsize=256)
+def _read_ticker_table_cached(
+    dataset: str, path_str: str, mtime_ns: int, ticker: str, combined: bool
+) -> pa.Table:
+    """One ticker's rows (heavy columns excluded), once per source file version."""
+    if not combined:
+        # Partition or per-ticker file: everything in it belongs to the ticker
+        return read_ticker_table(dataset, Path(path_str))
+    with _index_locks_guard:
+        lock = _index_locks.setdefault(path_str, threading.Lock())
+    with lock:
+        table, groups = _read_indexed_table(dataset, path_str, mtime_ns)
+    if groups is None:
+        return table
+    rows = groups.get(ticker)
+    return table.take(rows) if rows is not None else table.slice(0, 0)
+
+
+def load_ticker_table(dataset: str, filepath: Path, ticker: str, combined: bool) -> pa.Table:
+    """
+    Read a ticker's rows (minus heavy columns) with HTTP error handling.
+
+    Raises 404 if the file is missing or holds no rows for the ticker.
+    """
+    if not path_exists(filepath):
         raise HTTPException(status_code=404, detail=f"File not found: {filepath}")
     try:
-        return pd.read_parquet(filepath)
+        mtime_ns = filepath.stat().st_mtime_ns
+        table = _read_ticker_table_cached(dataset, str(filepath), mtime_ns, ticker, combined)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error reading file: {str(e)}")
+    if table.num_rows == 0:
+        raise HTTPException(status_code=404, detail=f"No {dataset} found for ticker {ticker}")
+    return table
 
 
-def clean_dataframe_for_json(df: pd.DataFrame) -> list:
-    """Convert DataFrame to JSON-serializable format, handling NaN values."""
-    # Convert to dict first, then clean (more reliable than DataFrame operations)
-    records = df.to_dict(orient='records')
-    
-    # Clean each record, handling NaN and inf values
-    def clean_dict(d):
-        if isinstance(d, dict):
-            cleaned = {}
-            for k, v in d.items():
-                if pd.isna(v):
-                    cleaned[k] = None
-                elif isinstance(v, (float, int)):
-                    if not math.isfinite(v):
-                        cleaned[k] = None
-                    else:
-                        cleaned[k] = v
-                elif isinstance(v, pd.Timestamp):
-                    cleaned[k] = v.isoformat() if pd.notna(v) else None
-                else:
-                    cleaned[k] = v
-            return cleaned
-        elif isinstance(d, list):
-            return [clean_dict(item) for item in d]
+# Upper-case symbols such as AAPL, BRK.B or BF-B
+TICKER_RE = re.compile(r"^[A-Z0-9.\-]{1,10}$")
+
+
+def validate_ticker(ticker: str) -> str:
+    """Upper-case a ticker symbol, rejecting malformed ones before any file I/O."""
+    symbol = ticker.upper()
+    if not TICKER_RE.match(symbol):
+        raise HTTPException(status_code=400, detail=f"Invalid ticker symbol: {ticker}")
+    return symbol
+
+
+def normalized_ticker(ticker: str) -> str:
+    """Path dependency: canonical (upper-case), validated form of the ticker symbol."""
+    return validate_ticker(ticker)
+
+
+def compute_etag(filepath: Path, ticker: str, variant: str = "json") -> Optional[str]:
+    """
+    Derive an ETag from the source file's mtime; None if the file is missing.
+
+    variant distinguishes representations (e.g. JSON vs Arrow) of the same data.
+    """
+    try:
+        mtime_ns = filepath.stat().st_mtime_ns
+    except OSError:
+        return None
+    digest = hashlib.blake2b(f"{filepath}:{mtime_ns}:{ticker}:{variant}".encode(), digest_size=8).hexdigest()
+    return f'"{digest}"'
+
+
+def gzip_etag(etag: str) -> str:
+    """ETag of the gzip-encoded bytes of a representation (the precomputed payloads)."""
+    return f'{etag[:-1]}-gzip"'
+
+
+def matching_etag(request: Request, etag: Optional[str]) -> Optional[str]:
+    """
+    The current ETag the request's If-None-Match names, or None.
+
+    A client holding the precomputed gzip payload sends its -gzip tag, which
+    matches as long as the data it was rendered from is unchanged.
+    """
+    if etag is None:
+        return None
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    if etag in candidates or "*" in candidates:
+        return etag
+    return gzip_etag(etag) if gzip_etag(etag) in candidates else None
+
+
+def cache_headers(etag: Optional[str]) -> Dict[str, str]:
+    """Caching headers for responses derived from processed parquet files."""
+    # The representation is negotiated on Accept (JSON vs Arrow/Parquet) and
+    # on Accept-Encoding (gzip middleware, precomputed .json.gz payloads)
+    vary = "Accept, Accept-Encoding"
+    if etag is None:
+        return {"Vary": vary}
+    return {"ETag": etag, "Cache-Control": "public, max-age=60", "Vary": vary}
+
+
+def cached_ticker_response(
+    request: Request, dataset: str, ticker: str, source: Path, etag: Optional[str]
+) -> Optional[FileResponse]:
+    """
+    Serve the payload precomputed at ETL time, if it is still current.
+
+    Returns None (fall back to the live path) when the client doesn't accept
+    gzip or the cache file is missing or older than its source parquet.
+    """
+    if "gzip" not in request.headers.get("accept-encoding", ""):
+        return None
+    cache_path = ticker_cache_path(config, dataset, ticker)
+    try:
+        if cache_path.stat().st_mtime_ns < source.stat().st_mtime_ns:
+            return None
+    except OSError:
+        return None
+    # Different bytes from the identity JSON, so a different validator
+    headers = cache_headers(gzip_etag(etag) if etag else None)
+    headers["Content-Encoding"] = "gzip"
+    return FileResponse(cache_path, media_type="application/json", headers=headers)
+
+
+# Binary representations of /api/ticker data, selectable with ?format= or Accept
+TICKER_MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def response_format(
+    request: Request,
+    format: Optional[str] = Query(
+        None,
+        pattern="^(json|arrow|parquet)$",
+        description="Response format: json, arrow (IPC stream) or parquet; defaults to the Accept header",
+    ),
+) -> str:
+    """Dependency: explicit ?format= wins, then the Accept header, then JSON."""
+    if format:
+        return format
+    accept = request.headers.get("accept", "")
+    for name, media_type in TICKER_MEDIA_TYPES.items():
+        if media_type in accept:
+            return name
+    return "json"
+
+
+# Candidate timestamp columns for ?since=/?until=, in order of preference
+DATE_COLUMNS = ("date", "published", "publish_date", "timestamp")
+
+
+@dataclass(frozen=True)
+class TickerRows:
+    """Row/column selection for /api/ticker responses; the default selects everything."""
+
+    limit: Optional[int] = None
+    offset: int = 0
+    since: Optional[pd.Timestamp] = None
+    until: Optional[pd.Timestamp] = None
+    columns: Optional[Tuple[str, ...]] = None
+
+    @property
+    def is_default(self) -> bool:
+        return self == TickerRows()
+
+    def variant(self, format: str) -> str:
+        """ETag variant: the format, plus the selection when there is one."""
+        return format if self.is_default else f"{format}:{self}"
+
+
+def _parse_bound(value: Optional[str], name: str) -> Optional[pd.Timestamp]:
+    if not value:
+        return None
+    try:
+        return pd.Timestamp(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name} date: {value}")
+
+
+def ticker_rows(
+    limit: Optional[int] = Query(None, ge=1, le=100_000, description="Maximum number of rows to return"),
+    offset: int = Query(0, ge=0, description="Rows to skip (ordered by date when the dataset has one)"),
+    since: Optional[str] = Query(None, description="Only rows dated on or after this date/time"),
+    until: Optional[str] = Query(None, description="Only rows dated on or before this date/time"),
+    columns: Optional[str] = Query(None, description="Comma-separated list of columns to return"),
+) -> TickerRows:
+    """Dependency: parse the /api/ticker row/column selection parameters."""
+    selected = tuple(c.strip() for c in columns.split(",") if c.strip()) if columns else None
+    return TickerRows(
+        limit=limit,
+        offset=offset,
+        since=_parse_bound(since, "since"),
+        until=_parse_bound(until, "until"),
+        columns=selected or None,
+    )
+
+
+def _date_bound(column: pa.ChunkedArray, ts: pd.Timestamp, date_col: str) -> pa.Scalar:
+    """Convert a query bound to a scalar comparable with the date column."""
+    if pa.types.is_timestamp(column.type):
+        # Naive columns are treated as UTC when the bound carries a zone, and vice versa
+        if column.type.tz is None and ts.tzinfo is not None:
+            ts = ts.tz_convert("UTC").tz_localize(None)
+        elif column.type.tz is not None and ts.tzinfo is None:
+            ts = ts.tz_localize("UTC")
+        return pa.scalar(ts, type=column.type)
+    if pa.types.is_date(column.type):
+        return pa.scalar(ts.date(), type=column.type)
+    raise HTTPException(status_code=400, detail=f"Column {date_col} is not a date; since/until are not supported")
+
+
+def select_ticker_rows(table: pa.Table, rows: TickerRows) -> pa.Table:
+    """Apply a TickerRows selection to a ticker's table, before any serialization."""
+    if rows.is_default:
+        return table
+    date_col = next((c for c in DATE_COLUMNS if c in table.column_names), None)
+
+    if rows.since is not None or rows.until is not None:
+        if date_col is None:
+            raise HTTPException(status_code=400, detail="This dataset has no date column to filter on")
+        column = table.column(date_col)
+        mask = None
+        if rows.since is not None:
+            mask = pc.greater_equal(column, _date_bound(column, rows.since, date_col))
+        if rows.until is not None:
+            upper = pc.less_equal(column, _date_bound(column, rows.until, date_col))
+            mask = upper if mask is None else pc.and_(mask, upper)
+        table = table.filter(mask)
+
+    if rows.limit is not None or rows.offset:
+        if date_col is not None:
+            # Stable sort, so pages are deterministic
+            table = table.sort_by(date_col)
+        table = table.slice(rows.offset, rows.limit)
+
+    if rows.columns:
+        unknown = [c for c in rows.columns if c not in table.column_names]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown columns: {', '.join(unknown)}")
+        table = table.select(list(rows.columns))
+    return table
+
+
+# Single-flight map: concurrent requests for the same (dataset, ticker, source
+# version) await the first request's result instead of redoing the work.
+# Only touched from the event loop, with no await between lookup and insert,
+# so it needs no lock.
+_in_flight: Dict[Tuple, asyncio.Future] = {}
+
+
+def _forget_in_flight(key: Tuple, task: asyncio.Future) -> None:
+    if _in_flight.get(key) is task:
+        del _in_flight[key]
+    if not task.cancelled():
+        task.exception()  # mark retrieved; every waiter may have gone away
+
+
+async def coalesce(key: Tuple, compute: Callable[[], Any]) -> Any:
+    """
+    Run compute in the threadpool once per key, sharing the result with concurrent callers.
+
+    The work runs in its own task rather than in the first caller's, and every
+    caller (that one included) awaits it through asyncio.shield, so a client
+    disconnecting only cancels its own wait, never the others'.
+    """
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(run_in_threadpool(compute))
+        _in_flight[key] = task
+        task.add_done_callback(functools.partial(_forget_in_flight, key))
+    return await asyncio.shield(task)
+
+
+# Rendered response bodies keyed by (dataset, ticker, ETag). The ETag encodes
+# the source file's mtime and the format, so an ETL rewrite changes the key and
+# stale entries simply age out. Event-loop only, like _in_flight.
+RENDERED_CACHE_MAX_ENTRIES = 512
+RENDERED_CACHE_MAX_BYTES = 256 * 1024 * 1024
+_rendered: "OrderedDict[Tuple, bytes]" = OrderedDict()
+_rendered_bytes = 0
+
+
+async def cached_body(key: Tuple, compute: Callable[[], bytes]) -> bytes:
+    """Return a memoized response body, rendering it (once per burst) on a miss."""
+    global _rendered_bytes
+    body = _rendered.get(key)
+    if body is not None:
+        _rendered.move_to_end(key)
+        return body
+
+    body = await coalesce(key, compute)
+    if key[-1] is not None and key not in _rendered:
+        _rendered[key] = body
+        _rendered_bytes += len(body)
+        while len(_rendered) > RENDERED_CACHE_MAX_ENTRIES or _rendered_bytes > RENDERED_CACHE_MAX_BYTES:
+            _, evicted = _rendered.popitem(last=False)
+            _rendered_bytes -= len(evicted)
+    return body
+
+
+async def _ticker_response(
+    dataset: str, ticker: str, etag: Optional[str], load_frame: Callable[[], pd.DataFrame]
+) -> Response:
+    """Standard /api/ticker JSON response, rendered once per source file version."""
+    body = await cached_body(
+        (dataset, ticker, etag),
+        lambda: render_ticker_payload(ticker, load_frame()),
+    )
+    return Response(body, media_type="application/json", headers=cache_headers(etag))
+
+
+async def binary_ticker_response(
+    dataset: str,
+    filepath: Path,
+    ticker: str,
+    combined: bool,
+    etag: Optional[str],
+    format: str,
+    rows: TickerRows = TickerRows(),
+) -> Response:
+    """
+    Return a ticker's rows as Arrow IPC or Parquet bytes, straight from Arrow.
+
+    Skips the pandas/JSON round trip entirely; clients read the body with
+    pyarrow.ipc.open_stream(body).read_all() or pandas.read_parquet.
+    """
+    def render() -> bytes:
+        table = select_ticker_rows(load_ticker_table(dataset, filepath, ticker, combined), rows)
+        sink = pa.BufferOutputStream()
+        if format == "parquet":
+            pq.write_table(table, sink, **PARQUET_WRITE_OPTIONS)
         else:
-            if pd.isna(d):
-                return None
-            elif isinstance(d, (float, int)) and not math.isfinite(d):
-                return None
-            return d
-    
-    return [clean_dict(record) for record in records]
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    body = await cached_body((dataset, ticker, etag), render)
+    return Response(body, media_type=TICKER_MEDIA_TYPES[format], headers=cache_headers(etag))
+
+
+async def _serve_ticker_dataset(
+    dataset: str, request: Request, ticker: str, format: str, rows: TickerRows
+) -> Response:
+    """
+    Response for every /api/ticker/{ticker}/{dataset} route.
+
+    In order: 304 when the client's ETag is current, Arrow/Parquet bytes for
+    a binary format, the precomputed gzip payload for an unfiltered JSON
+    request, and otherwise JSON rendered from the source file.
+    """
+    try:
+        filepath, combined = resolve_ticker_source(config, dataset, ticker, exists=path_exists)
+        etag = compute_etag(filepath, ticker, rows.variant(format))
+        matched = matching_etag(request, etag)
+        if matched:
+            return Response(status_code=304, headers=cache_headers(matched))
+        if format != "json":
+            return await binary_ticker_response(dataset, filepath, ticker, combined, etag, format, rows)
+        if rows.is_default:
+            cached = cached_ticker_response(request, dataset, ticker, filepath, etag)
+            if cached is not None:
+                return cached
+
+        def load_frame() -> pd.DataFrame:
+            return select_ticker_rows(load_ticker_table(dataset, filepath, ticker, combined), rows).to_pandas()
+
+        return await _ticker_response(dataset, ticker, etag, load_frame)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/")
@@ -105,215 +597,155 @@ async def root():
 
 
 @app.get("/api/ticker/{ticker}/features")
-async def get_features(ticker: str):
+async def get_features(
+    request: Request,
+    ticker: str = Depends(normalized_ticker),
+    format: str = Depends(response_format),
+    rows: TickerRows = Depends(ticker_rows),
+):
     """Get processed features for a ticker."""
-    try:
-        # Load features file (contains all tickers)
-        df = load_parquet_file(config.FEATURES_FILE)
-        
-        # Filter by ticker
-        ticker_data = df[df["ticker"] == ticker.upper()]
-        
-        if ticker_data.empty:
-            raise HTTPException(
-                status_code=404,
-                detail=f"No features found for ticker {ticker}"
-            )
-        
-        return {
-            "ticker": ticker.upper(),
-            "count": len(ticker_data),
-            "data": clean_dataframe_for_json(ticker_data)
-        }
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await _serve_ticker_dataset("features", request, ticker, format, rows)
 
 
 @app.get("/api/ticker/{ticker}/prices")
-async def get_prices(ticker: str):
+async def get_prices(
+    request: Request,
+    ticker: str = Depends(normalized_ticker),
+    format: str = Depends(response_format),
+    rows: TickerRows = Depends(ticker_rows),
+):
     """Get processed prices for a ticker."""
-    try:
-        # Try combined file first
-        if config.PROCESSED_PRICES_FILE.exists():
-            df = load_parquet_file(config.PROCESSED_PRICES_FILE)
-            ticker_data = df[df["ticker"] == ticker.upper()]
-        else:
-            # Try individual file
-            filepath = config.PROCESSED_PRICES_DIR / f"{ticker.upper()}.parquet"
-            df = load_parquet_file(filepath)
-            ticker_data = df
-        
-        if ticker_data.empty:
-            raise HTTPException(
-                status_code=404,
-                detail=f"No prices found for ticker {ticker}"
-            )
-        
-        return {
-            "ticker": ticker.upper(),
-            "count": len(ticker_data),
-            "data": clean_dataframe_for_json(ticker_data)
-        }
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await _serve_ticker_dataset("prices", request, ticker, format, rows)
 
 
 @app.get("/api/ticker/{ticker}/news")
-async def get_news(ticker: str):
+async def get_news(
+    request: Request,
+    ticker: str = Depends(normalized_ticker),
+    format: str = Depends(response_format),
+    rows: TickerRows = Depends(ticker_rows),
+):
     """Get processed news for a ticker."""
-    try:
-        # Try combined file first
-        if config.PROCESSED_NEWS_FILE.exists():
-            df = load_parquet_file(config.PROCESSED_NEWS_FILE)
-            ticker_data = df[df["ticker"] == ticker.upper()]
-        else:
-            # Try individual file
-            filepath = config.PROCESSED_NEWS_DIR / f"{ticker.upper()}_news.parquet"
-            df = load_parquet_file(filepath)
-            ticker_data = df
-        
-        if ticker_data.empty:
-            raise HTTPException(
-                status_code=404,
-                detail=f"No news found for ticker {ticker}"
-            )
-        
-        # Remove embedding column for API response (too large)
-        if "embedding" in ticker_data.columns:
-            ticker_data = ticker_data.drop(columns=["embedding"])
-        
-        return {
-            "ticker": ticker.upper(),
-            "count": len(ticker_data),
-            "data": clean_dataframe_for_json(ticker_data)
-        }
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await _serve_ticker_dataset("news", request, ticker, format, rows)
 
 
 @app.get("/api/ticker/{ticker}/fundamentals")
-async def get_fundamentals(ticker: str):
+async def get_fundamentals(
+    request: Request,
+    ticker: str = Depends(normalized_ticker),
+    format: str = Depends(response_format),
+    rows: TickerRows = Depends(ticker_rows),
+):
     """Get processed fundamentals for a ticker."""
-    try:
-        # Try combined file first
-        if config.PROCESSED_FUNDAMENTALS_FILE.exists():
-            df = load_parquet_file(config.PROCESSED_FUNDAMENTALS_FILE)
-            # Filter by ticker if column exists
-            if "ticker" in df.columns:
-                ticker_data = df[df["ticker"] == ticker.upper()]
-            else:
-                ticker_data = df
-        else:
-            # Try individual file
-            filepath = config.PROCESSED_FUNDAMENTALS_DIR / f"{ticker.upper()}_fundamentals.parquet"
-            df = load_parquet_file(filepath)
-            ticker_data = df
-        
-        if ticker_data.empty:
-            raise HTTPException(
-                status_code=404,
-                detail=f"No fundamentals found for ticker {ticker}"
-            )
-        
-        return {
-            "ticker": ticker.upper(),
-            "count": len(ticker_data),
-            "data": clean_dataframe_for_json(ticker_data)
-        }
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await _serve_ticker_dataset("fundamentals", request, ticker, format, rows)
 
 
 def run_etl_background(ticker: str) -> Dict[str, Any]:
-    """Run ETL pipeline in background."""
-    try:
-        results = run_etl_pipeline(ticker.upper())
-        return results
-    except Exception as e:
-        return {
-            "ticker": ticker.upper(),
-            "overall_success": False,
-            "error": str(e)
-        }
+    """
+    Run ETL pipeline in background.
+
+    Exceptions propagate, so the job queue records the job as "failed" with
+    the error instead of "finished".
+    """
+    results = run_etl_pipeline(ticker.upper())
+    # One full rebuild for back-to-back ETL runs: joins a rebuild that
+    # hasn't started yet instead of queueing another
+    results["index_job"], _ = index_jobs.submit(
+        index_job_key(None), finalize_indices, follow_running=True
+    )
+    return results
+
+
+def etl_job_key(ticker: str) -> str:
+    """Idempotency key for a ticker's ETL job."""
+    return f"etl:{ticker}"
 
 
 @app.post("/api/etl/run/{ticker}")
-async def trigger_etl(ticker: str, background_tasks: BackgroundTasks):
-    """Trigger ETL pipeline for a ticker."""
-    ticker = ticker.upper()
-    
-    # Run ETL in background
-    background_tasks.add_task(run_etl_background, ticker)
+async def trigger_etl(ticker: str = Depends(normalized_ticker)):
+    """Trigger ETL pipeline for a ticker (deduplicated while a run is in flight)."""
+    job, created = etl_jobs.submit(etl_job_key(ticker), run_etl_background, ticker)
     
     return {
-        "message": f"ETL pipeline started for {ticker}",
+        "message": f"ETL pipeline {'started' if created else 'already running'} for {ticker}",
         "ticker": ticker,
         "status": "processing",
+        "job": job,
         "note": "Check back in a few moments for results"
     }
 
 
+def probe_ticker_datasets(ticker: str) -> Dict[str, bool]:
+    """
+    Per-dataset presence flags read from the processed files themselves.
+
+    Skips row groups whose statistics rule the ticker out; blocking, so
+    callers run it off the event loop.
+    """
+    present = {dataset: False for dataset in TICKER_DATASETS}
+    for dataset, (combined_attr, dir_attr, filename) in TICKER_DATASETS.items():
+        combined_file = getattr(config, combined_attr)
+        if path_exists(combined_file):
+            try:
+                found = parquet_contains_ticker(combined_file, ticker)
+                present[dataset] = True if found is None else found
+            except Exception:
+                pass
+        elif dir_attr is not None and path_exists(getattr(config, dir_attr) / filename.format(ticker=ticker)):
+            present[dataset] = True
+    return present
+
+
 @app.get("/api/etl/status/{ticker}")
-async def get_etl_status(ticker: str):
-    """Check if processed data exists for a ticker."""
-    ticker = ticker.upper()
+async def get_etl_status(ticker: str = Depends(normalized_ticker)):
+    """Check which processed datasets exist for a ticker."""
     status = {
         "ticker": ticker,
         "features": False,
         "prices": False,
         "news": False,
         "fundamentals": False,
+        "job": etl_jobs.status(etl_job_key(ticker)),
     }
     
-    # Check features
-    if config.FEATURES_FILE.exists():
-        try:
-            df = pd.read_parquet(config.FEATURES_FILE)
-            status["features"] = ticker in df["ticker"].values if "ticker" in df.columns else False
-        except:
-            pass
-    
-    # Check prices
-    if config.PROCESSED_PRICES_FILE.exists():
-        try:
-            df = pd.read_parquet(config.PROCESSED_PRICES_FILE)
-            status["prices"] = ticker in df["ticker"].values if "ticker" in df.columns else False
-        except:
-            pass
-    elif (config.PROCESSED_PRICES_DIR / f"{ticker}.parquet").exists():
-        status["prices"] = True
-    
-    # Check news
-    if config.PROCESSED_NEWS_FILE.exists():
-        try:
-            df = pd.read_parquet(config.PROCESSED_NEWS_FILE)
-            status["news"] = ticker in df["ticker"].values if "ticker" in df.columns else False
-        except:
-            pass
-    elif (config.PROCESSED_NEWS_DIR / f"{ticker}_news.parquet").exists():
-        status["news"] = True
+    state = etl_state()
+    if state is not None and etl_state_is_current(config):
+        # Answered from the index written at the end of each ETL run
+        status.update(ticker_datasets(state, ticker))
+        status["updated_at"] = state.get("updated_at")
+        return status
     
-    # Check fundamentals
-    if config.PROCESSED_FUNDAMENTALS_FILE.exists():
-        try:
-            df = pd.read_parquet(config.PROCESSED_FUNDAMENTALS_FILE)
-            status["fundamentals"] = ticker in df["ticker"].values if "ticker" in df.columns else True
-        except:
-            pass
-    elif (config.PROCESSED_FUNDAMENTALS_DIR / f"{ticker}_fundamentals.parquet").exists():
-        status["fundamentals"] = True
+    # No index yet, or processed files rewritten since (e.g. by run_autonomous):
+    # probe the processed files
+    status.update(await run_in_threadpool(probe_ticker_datasets, ticker))
     
     return status
 
 
+@app.get("/api/etl/jobs/{ticker}")
+async def get_etl_job(
+    ticker: str = Depends(normalized_ticker),
+    wait: float = Query(0.0, ge=0.0, le=60.0, description="Seconds to long-poll for the job to finish"),
+):
+    """Return the state of a ticker's ETL job from the job queue."""
+    job = await etl_jobs.wait(etl_job_key(ticker), wait)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No ETL job for ticker {ticker}")
+    return job
+
+
+@app.get("/api/search/index-jobs/{job_id}")
+async def get_index_job(
+    job_id: str,
+    wait: float = Query(0.0, ge=0.0, le=60.0, description="Seconds to long-poll for the rebuild to finish"),
+):
+    """Return the state of a background index rebuild queued by run_autonomous or an ETL run."""
+    job = await index_jobs.wait(job_id, wait)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No index job {job_id}")
+    return job
+
+
 @app.get("/api/search")
 async def search(
     query: str,
@@ -333,7 +765,7 @@ async def search(
         auto_status = None
         if auto_etl:
             # Potentially expensive: fetch/process data and rebuild indices (depending on orchestrator settings)
-            auto_status = run_autonomous(query, ticker_hint=ticker)
+            auto_status = await run_autonomous_async(query, ticker_hint=ticker)
         if rebuild_index:
             # Explicit rebuild (expensive). Prefer calling /api/search/rebuild-indices out of band.
             service = get_retrieval_service()
@@ -442,6 +874,43 @@ class DocumentRequest(BaseModel):
     transcript_file: Optional[str] = None
 
 
+def read_document_row(filepath: Path, index: Optional[int], ticker: Optional[str] = None) -> pd.DataFrame:
+    """
+    Read a single document row without loading the whole parquet file.
+
+    Search metadata stores `index` as the row's position in the file it was
+    indexed from, so the row group holding it is located from the footer and
+    only that group is decoded. The embedding column is never read.
+    """
+    pf = pq.ParquetFile(filepath, memory_map=True, pre_buffer=True)
+    columns = [c for c in pf.schema_arrow.names if c != "embedding"]
+    meta = pf.metadata
+    if meta.num_rows == 0:
+        raise HTTPException(status_code=404, detail="No data found")
+    
+    if index is not None and 0 <= index < meta.num_rows:
+        offset = index
+        for rg in range(meta.num_row_groups):
+            rg_rows = meta.row_group(rg).num_rows
+            if offset < rg_rows:
+                row = pf.read_row_group(rg, columns=columns).slice(offset, 1)
+                break
+            offset -= rg_rows
+        if ticker is None or "ticker" not in columns or str(row.column("ticker")[0].as_py()).upper() == ticker:
+            return row.to_pandas()
+    
+    if ticker is None or "ticker" not in columns:
+        return pf.read_row_group(0, columns=columns).slice(0, 1).to_pandas()
+    
+    # Index is missing or points at another ticker's row: fall back to the
+    # ticker's rows, positionally if possible
+    table = ds.dataset(filepath, format="parquet").to_table(columns=columns, filter=ds.field("ticker") == ticker)
+    if table.num_rows == 0:
+        raise HTTPException(status_code=404, detail=f"No data found for ticker {ticker}")
+    position = index if index is not None and 0 <= index < table.num_rows else 0
+    return table.slice(position, 1).to_pandas()
+
+
 @app.post("/api/document")
 async def get_document(request: DocumentRequest):
     """Retrieve full document by metadata from search result."""
@@ -449,51 +918,24 @@ async def get_document(request: DocumentRequest):
         doc_type = request.doc_type
         ticker = request.ticker
         
-        # Remove embedding column for API response (too large)
-        def remove_embedding(data: dict) -> dict:
-            if isinstance(data, dict):
-                return {k: v for k, v in data.items() if k != 'embedding'}
-            return data
-        
-        def select_row(df: pd.DataFrame) -> dict:
-            """Select a row by index label if possible; otherwise fall back to positional iloc."""
-            if df is None or df.empty:
-                raise HTTPException(status_code=404, detail="No data found")
-            if request.index is not None:
-                # Prefer label-based match if the stored index came from iterrows() (often a label index)
-                try:
-                    if request.index in df.index:
-                        row = df.loc[request.index]
-                        if isinstance(row, pd.DataFrame):
-                            row = row.iloc[0]
-                        return row.to_dict()
-                except Exception:
-                    pass
-                # Fall back to positional index
-                if 0 <= request.index < len(df):
-                    return df.iloc[request.index].to_dict()
-            return df.iloc[0].to_dict()
-
         if doc_type == 'news':
             # Load news parquet file
-            if config.PROCESSED_NEWS_FILE.exists():
-                df = pd.read_parquet(config.PROCESSED_NEWS_FILE)
-                if ticker and 'ticker' in df.columns:
-                    df = df[df['ticker'].str.upper() == ticker.upper()]
+            if path_exists(config.PROCESSED_NEWS_FILE):
+                filepath = config.PROCESSED_NEWS_FILE
+                row_ticker = validate_ticker(ticker) if ticker else None
             else:
-                filepath = config.PROCESSED_NEWS_DIR / f"{ticker.upper()}_news.parquet"
-                if not filepath.exists():
+                if not ticker:
+                    raise HTTPException(status_code=400, detail="ticker is required for news documents")
+                filepath = config.PROCESSED_NEWS_DIR / f"{validate_ticker(ticker)}_news.parquet"
+                if not path_exists(filepath):
                     raise HTTPException(status_code=404, detail=f"News file not found for {ticker}")
-                df = pd.read_parquet(filepath)
-            
-            if df.empty:
-                raise HTTPException(status_code=404, detail="No news data found")
+                row_ticker = None
             
-            doc = select_row(df)
+            doc = await run_in_threadpool(read_document_row, filepath, request.index, row_ticker)
             
             return {
                 "doc_type": "news",
-                "document": clean_dataframe_for_json([doc])[0]
+                "document": clean_dataframe_for_json(doc)[0]
             }
         
         elif doc_type == 'filing':
@@ -502,18 +944,14 @@ async def get_document(request: DocumentRequest):
             
             # Load specific filing file
             filepath = config.PROCESSED_FILINGS_DIR / f"{request.filing_file}.parquet"
-            if not filepath.exists():
+            if not path_exists(filepath):
                 raise HTTPException(status_code=404, detail=f"Filing file not found: {request.filing_file}")
             
-            df = pd.read_parquet(filepath)
-            if df.empty:
-                raise HTTPException(status_code=404, detail="Filing file is empty")
-            
-            doc = select_row(df)
+            doc = await run_in_threadpool(read_document_row, filepath, request.index)
             
             return {
                 "doc_type": "filing",
-                "document": clean_dataframe_for_json([doc])[0]
+                "document": clean_dataframe_for_json(doc)[0]
             }
         
         elif doc_type == 'transcript':
@@ -522,18 +960,14 @@ async def get_document(request: DocumentRequest):
             
             # Load specific transcript file
             filepath = config.PROCESSED_TRANSCRIPTS_DIR / f"{request.transcript_file}.parquet"
-            if not filepath.exists():
+            if not path_exists(filepath):
                 raise HTTPException(status_code=404, detail=f"Transcript file not found: {request.transcript_file}")
             
-            df = pd.read_parquet(filepath)
-            if df.empty:
-                raise HTTPException(status_code=404, detail="Transcript file is empty")
-            
-            doc = select_row(df)
+            doc = await run_in_threadpool(read_document_row, filepath, request.index)
             
             return {
                 "doc_type": "transcript",
-                "document": clean_dataframe_for_json([doc])[0]
+                "document": clean_dataframe_for_json(doc)[0]
             }
         
         else:
@@ -555,24 +989,13 @@ class AgentQueryRequest(BaseModel):
     rebuild_index: bool = False
 
 
-# Global agent instance
-_research_agent = None
-
-def get_research_agent() -> ResearchAgent:
-    """Get or create global research agent instance."""
-    global _research_agent
-    if _research_agent is None:
-        _research_agent = ResearchAgent()
-    return _research_agent
-
-
 @app.post("/api/agent/query")
 async def agent_query(request: AgentQueryRequest):
     """Query the research agent with a natural language question."""
     try:
         auto_status = None
         if request.auto_etl:
-            auto_status = run_autonomous(request.query, ticker_hint=request.ticker)
+            auto_status = await run_autonomous_async(request.query, ticker_hint=request.ticker)
         if request.rebuild_index:
             service = get_retrieval_service()
             service.rebuild_indices(ticker=None)
@@ -12,6 +12,10 @@ def extract_data(*args, **kwargs):
     from .orchestrator import extract_data as _impl
     return _impl(*args, **kwargs)
 
+def extract_all(*args, **kwargs):
+    from .orchestrator import extract_all as _impl
+    return _impl(*args, **kwargs)
+
 def transform_data(*args, **kwargs):
     from .orchestrator import transform_data as _impl
     return _impl(*args, **kwargs)
@@ -20,11 +24,17 @@ def load_features(*args, **kwargs):
     from .orchestrator import load_features as _impl
     return _impl(*args, **kwargs)
 
+def finalize_indices(*args, **kwargs):
+    from .orchestrator import finalize_indices as _impl
+    return _impl(*args, **kwargs)
+
 __all__ = [
     'run_etl_pipeline',
     'extract_data',
+    'extract_all',
     'transform_data',
     'load_features',
+    'finalize_indices',
     'ETLConfig',
 ]
 
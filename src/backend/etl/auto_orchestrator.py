@@ -4,14 +4,40 @@ Autonomous fetch/process orchestration based on a user query.
 
 from __future__ import annotations
 
-import glob
+import asyncio
+import copy
+import dataclasses
+import functools
 import os
-import json
-from datetime import datetime, timedelta
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional, Set, List
+from typing import Callable, Dict, Any, FrozenSet, Optional, Set, List, Tuple, Union
+
+import orjson
 
 from agents.query_intent import parse_intent, IntentResult
+from etl.config import ETLConfig
+from etl.jobs import ETLJobQueue
+from ingestion.fetch_news import fetch_news_and_save
+from ingestion.fetch_earnings_calls import download_transcripts_to_dataframe
+from ingestion.download_filings import download_recent_filing_documents
+from ingestion.fetch_filings import fetch_filings, filings_to_dataframe
+from processing.process_news import combine_news_files
+from processing.process_transcripts import TRANSCRIPT_SUFFIXES, process_transcript_from_text, read_transcript_text
+from processing.process_filings import process_filing_file
+from retrieval.index_builder import build_combined_index
+from utils.logger import get_logger
+from utils.storage import scan_ticker_files, write_ticker_parquet
+
+logger = get_logger(__name__)
+
+
+# Index rebuilds run one at a time: concurrent writers would corrupt the index
+index_jobs = ETLJobQueue(max_workers=1)
+
+
 TICKER_STOPLIST = {
     "US", "USA",
     "Q1", "Q2", "Q3", "Q4",
@@ -29,75 +55,231 @@ TICKER_STOPLIST = {
 }
 
 
-def _load_ticker_universe() -> Set[str]:
+TICKER_UNIVERSE_PATH = Path(__file__).parent.parent / "data" / "stock_tickers.json"
+
+
+@functools.lru_cache(maxsize=4)
+def _load_ticker_universe_cached(mtime_ns: int, path: str) -> FrozenSet[str]:
+    tickers = orjson.loads(Path(path).read_bytes())
+    if isinstance(tickers, list):
+        return frozenset(t.upper() for t in tickers if isinstance(t, str) and t.strip())
+    return frozenset()
+
+
+def _load_ticker_universe() -> FrozenSet[str]:
+    """Ticker universe from stock_tickers.json, parsed once per file version."""
     try:
-        data_path = Path(__file__).parent.parent / "data" / "stock_tickers.json"
-        with open(data_path, "r") as f:
-            tickers = json.load(f)
-        if isinstance(tickers, list):
-            return {t.upper() for t in tickers if isinstance(t, str) and t.strip()}
+        mtime_ns = TICKER_UNIVERSE_PATH.stat().st_mtime_ns
+        return _load_ticker_universe_cached(mtime_ns, str(TICKER_UNIVERSE_PATH))
     except Exception as exc:
         logger.warning(f"Failed to load ticker universe: {exc}")
-    return set()
+    return frozenset()
 
 
-def _fallback_sector_tickers(query: str, universe: Set[str]) -> List[str]:
-    q = (query or "").lower()
-    seeds: List[str] = []
-    if "consumer staple" in q or "staples" in q:
-        seeds = ["PG", "KO", "PEP", "CL", "KHC", "COST", "WMT"]
-    elif "consumer discretionary" in q or "discretionary" in q:
-        seeds = ["HD", "LOW", "NKE", "SBUX", "AMZN", "TSLA"]
-    elif "tech" in q or "technology" in q:
-        seeds = ["AAPL", "MSFT", "GOOGL", "AMZN", "NVDA", "META"]
-    elif "energy" in q:
-        seeds = ["XOM", "CVX", "COP", "SLB"]
-    elif "financial" in q or "banks" in q:
-        seeds = ["JPM", "BAC", "C", "WFC", "GS", "MS"]
-    elif "health" in q or "pharma" in q or "biotech" in q:
-        seeds = ["JNJ", "PFE", "MRK", "ABT", "LLY", "ABBV"]
-    elif "industrial" in q or "industrials" in q:
-        seeds = ["CAT", "DE", "GE", "HON", "UPS"]
-    elif "semiconductor" in q or "chip" in q:
-        seeds = ["NVDA", "AMD", "INTC", "AVGO", "QCOM"]
-    if not seeds:
-        return []
-    if universe:
-        return [s for s in seeds if s in universe]
-    return seeds
-from etl.config import ETLConfig
-from ingestion.fetch_news import fetch_news_and_save
-from ingestion.fetch_earnings_calls import download_transcripts_to_dataframe
-from ingestion.download_filings import download_recent_filing_documents
-from ingestion.fetch_filings import fetch_filings, filings_to_dataframe
-from processing.process_news import combine_news_files
-from processing.process_transcripts import process_transcript_from_text
-from processing.process_filings import process_all_filings
-from retrieval.index_builder import build_combined_index
-from utils.logger import get_logger
+@functools.lru_cache(maxsize=256)
+def _parse_intent_cached(query: str, ticker_hint: Optional[str]) -> IntentResult:
+    return parse_intent(query, ticker_hint)
 
-logger = get_logger(__name__)
+
+def _cached_intent(query: str, ticker_hint: Optional[str]) -> IntentResult:
+    """parse_intent memoized on (query, ticker_hint); returns a private copy."""
+    intent = _parse_intent_cached(query, ticker_hint)
+    # IntentResult is mutable and its __dict__ ends up in results
+    return dataclasses.replace(intent, raw_ticker_candidates=list(intent.raw_ticker_candidates))
+
+
+def _index_version(cfg: ETLConfig) -> int:
+    """mtime of the combined index metadata; changes whenever the index is saved."""
+    try:
+        return (cfg.PROCESSED_DIR / "indices" / "combined.pkl").stat().st_mtime_ns
+    except OSError:
+        return 0
+
+
+@functools.lru_cache(maxsize=256)
+def _suggest_tickers_cached(
+    query: str, k: int, candidate_k: int, min_score: float, index_version: int
+) -> Dict[str, Any]:
+    # Local import to avoid heavy deps at module import time
+    from agents.tools.search_tools import suggest_tickers
+    return suggest_tickers(query=query, doc_type=None, k=k, candidate_k=candidate_k, min_score=min_score)
+
+
+def _cached_suggestions(
+    cfg: ETLConfig, query: str, k: int = 5, candidate_k: int = 120, min_score: float = 0.0
+) -> Dict[str, Any]:
+    """
+    suggest_tickers memoized per query and index version, so a rebuilt index
+    is searched afresh. Returns a private copy.
+    """
+    payload = _suggest_tickers_cached(query, k, candidate_k, min_score, _index_version(cfg))
+    return copy.deepcopy(payload)
+
+
+# (query keywords, seed tickers), checked in order; the first sector with a
+# keyword in the query wins
+SECTOR_SEEDS: Tuple[Tuple[Tuple[str, ...], Tuple[str, ...]], ...] = (
+    (("consumer staple", "staples"), ("PG", "KO", "PEP", "CL", "KHC", "COST", "WMT")),
+    (("consumer discretionary", "discretionary"), ("HD", "LOW", "NKE", "SBUX", "AMZN", "TSLA")),
+    (("tech", "technology"), ("AAPL", "MSFT", "GOOGL", "AMZN", "NVDA", "META")),
+    (("energy",), ("XOM", "CVX", "COP", "SLB")),
+    (("financial", "banks"), ("JPM", "BAC", "C", "WFC", "GS", "MS")),
+    (("health", "pharma", "biotech"), ("JNJ", "PFE", "MRK", "ABT", "LLY", "ABBV")),
+    (("industrial", "industrials"), ("CAT", "DE", "GE", "HON", "UPS")),
+    (("semiconductor", "chip"), ("NVDA", "AMD", "INTC", "AVGO", "QCOM")),
+)
+
+
+def _fallback_sector_tickers(query: str, universe: FrozenSet[str]) -> List[str]:
+    q = (query or "").lower()
+    for keywords, seeds in SECTOR_SEEDS:
+        if any(keyword in q for keyword in keywords):
+            return [s for s in seeds if not universe or s in universe]
+    return []
 
 
 def _is_stale(path: Path, hours: int) -> bool:
-    if not path.exists():
+    try:
+        mtime = os.stat(path).st_mtime
+    except FileNotFoundError:
         return True
-    age = datetime.now() - datetime.fromtimestamp(path.stat().st_mtime)
-    return age > timedelta(hours=hours)
+    return time.time() - mtime > hours * 3600.0
 
 
 def _latest_mtime_in_dir(directory: Path) -> Optional[datetime]:
-    if not directory.exists():
+    """Newest file mtime under directory; file types come from the readdir entries."""
+    latest = None
+    stack = [directory]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            # Missing or unreadable directories are skipped, as os.walk did
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        mtime = entry.stat().st_mtime
+                        latest = mtime if latest is None or mtime > latest else latest
+                except OSError:
+                    # Removed between listing and stat
+                    continue
+    return datetime.fromtimestamp(latest) if latest is not None else None
+
+
+# A filename suffix or a tuple of alternatives, as accepted by str.endswith
+Suffix = Union[str, Tuple[str, ...]]
+# Per-run cache of directory scans: {(directory, suffix): {ticker: [DirEntry]}}
+DirScans = Dict[Tuple[str, Suffix], Dict[str, List[os.DirEntry]]]
+
+
+def _scan_by_ticker(directory: Path, suffix: Suffix) -> Dict[str, List[os.DirEntry]]:
+    """Group a directory's ``{TICKER}_*{suffix}`` files by ticker in one scandir pass."""
+    groups: Dict[str, List[os.DirEntry]] = {}
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.endswith(suffix) and "_" in name and entry.is_file():
+                    groups.setdefault(name.split("_", 1)[0], []).append(entry)
+    except FileNotFoundError:
+        pass
+    return groups
+
+
+def _ticker_entries(directory: Path, suffix: Suffix, ticker: str, scans: Optional[DirScans] = None) -> List[os.DirEntry]:
+    """A ticker's ``{TICKER}_*{suffix}`` files, scanning each directory at most once per run."""
+    if scans is None:
+        return scan_ticker_files(directory, suffix, ticker)
+    key = (str(directory), suffix)
+    groups = scans.get(key)
+    if groups is None:
+        groups = scans[key] = _scan_by_ticker(directory, suffix)
+    return groups.get(ticker, [])
+
+
+def _prescan_sources(cfg: ETLConfig, needed: Set[str]) -> DirScans:
+    """
+    Scan every directory the needed ensure_* steps read, once, up front.
+
+    Filling the cache before tickers are dispatched to worker threads means
+    each directory is listed exactly once per run rather than once per thread
+    that happens to reach it first.
+    """
+    dirs: List[Tuple[Path, Suffix]] = []
+    for name in needed:
+        source = DOCUMENT_SOURCES.get(name)
+        if source is not None:
+            dirs += [(getattr(cfg, source.processed_dir), ".parquet"), (getattr(cfg, source.raw_dir), source.raw_suffixes)]
+    return {(str(directory), suffix): _scan_by_ticker(directory, suffix) for directory, suffix in dirs}
+
+
+def _entry_mtime(entry: os.DirEntry) -> Optional[float]:
+    """A scanned file's mtime, or None if it has since been removed."""
+    try:
+        return entry.stat().st_mtime
+    except OSError:
         return None
-    mtimes = []
-    for root, _, files in os.walk(directory):
-        for f in files:
-            full = Path(root) / f
-            mtimes.append(datetime.fromtimestamp(full.stat().st_mtime))
-    return max(mtimes) if mtimes else None
 
 
-def ensure_news(ticker: str, cfg: ETLConfig) -> Dict[str, Any]:
+def _latest_mtime_for_ticker(directory: Path, ticker: str, scans: Optional[DirScans] = None) -> Optional[float]:
+    """Get latest modification time for parquet files of a specific ticker."""
+    # DirEntry caches its stat result, so repeated lookups don't hit the disk
+    mtimes = [_entry_mtime(entry) for entry in _ticker_entries(directory, ".parquet", ticker, scans)]
+    return max((m for m in mtimes if m is not None), default=None)
+
+
+def _output_name(raw_name: str, suffixes: Tuple[str, ...]) -> str:
+    """Processed parquet filename for a raw document file."""
+    for suffix in suffixes:
+        if raw_name.endswith(suffix):
+            return raw_name[:-len(suffix)] + ".parquet"
+    return raw_name
+
+
+def _outdated_sources(
+    sources: List[os.DirEntry], output_dir: Path, ticker: str, scans: Optional[DirScans] = None,
+    suffixes: Tuple[str, ...] = (".txt",),
+) -> List[str]:
+    """Paths of raw sources whose processed parquet is missing or older than the source."""
+    outputs = {entry.name: entry for entry in _ticker_entries(output_dir, ".parquet", ticker, scans)}
+    outdated = []
+    for source in sources:
+        output = outputs.get(_output_name(source.name, suffixes))
+        source_mtime = _entry_mtime(source)
+        if source_mtime is None:
+            continue
+        output_mtime = _entry_mtime(output) if output is not None else None
+        if output_mtime is None or output_mtime < source_mtime:
+            outdated.append(source.path)
+    return outdated
+
+
+def _process_files(files: List[str], process_one, cfg: ETLConfig) -> None:
+    """
+    Run process_one over independent files on a small thread pool.
+
+    The per-file work is dominated by LLM calls and embedding/parquet code that
+    releases the GIL. The first failure is re-raised, as in a plain loop.
+    """
+    if len(files) <= 1 or cfg.PROCESS_WORKERS <= 1:
+        for path in files:
+            process_one(path)
+        return
+    with ThreadPoolExecutor(max_workers=min(cfg.PROCESS_WORKERS, len(files)), thread_name_prefix="process") as pool:
+        list(pool.map(process_one, files))
+
+
+def ensure_news(ticker: str, cfg: ETLConfig, combine: bool = True) -> Dict[str, Any]:
+    """
+    Fetch news for a ticker if stale and rebuild the combined news file.
+
+    combine=False only fetches; callers running several tickers concurrently
+    combine once afterwards, since every ticker writes the same output file.
+    """
     status = {"source": "news", "ticker": ticker, "fetched": False, "processed": False, "error": None}
     try:
         target = cfg.PROCESSED_NEWS_FILE
@@ -105,151 +287,179 @@ def ensure_news(ticker: str, cfg: ETLConfig) -> Dict[str, Any]:
         if stale:
             fetch_news_and_save(ticker, max_articles=cfg.AUTO_MAX_NEWS, save_dir=str(cfg.RAW_NEWS_DIR))
             status["fetched"] = True
-        combine_news_files(input_dir=str(cfg.RAW_NEWS_DIR), output_path=str(cfg.PROCESSED_NEWS_FILE), config=cfg)
-        status["processed"] = True
+        if combine:
+            combine_news_files(input_dir=str(cfg.RAW_NEWS_DIR), output_path=str(cfg.PROCESSED_NEWS_FILE), config=cfg)
+            status["processed"] = True
     except Exception as exc:
         status["error"] = str(exc)
         logger.error(f"Error ensuring news for {ticker}: {exc}")
     return status
 
 
-def ensure_transcripts(ticker: str, cfg: ETLConfig) -> Dict[str, Any]:
-    status = {"source": "transcripts", "ticker": ticker, "fetched": False, "processed": False, "error": None}
+def _fetch_transcripts(ticker: str, cfg: ETLConfig) -> None:
+    download_transcripts_to_dataframe(
+        ticker,
+        max_transcripts=cfg.AUTO_MAX_TRANSCRIPTS,
+        save_dir=str(cfg.RAW_TRANSCRIPTS_DIR),
+        api_key=cfg.API_NINJAS_API_KEY,
+    )
+
+
+def _process_transcript(raw_path: str, output_path: str, cfg: ETLConfig) -> None:
+    process_transcript_from_text(read_transcript_text(raw_path), output_path, config=cfg)
+
+
+def _fetch_filings(ticker: str, cfg: ETLConfig) -> None:
+    # refresh metadata parquet
+    filings_data = fetch_filings(ticker)
+    df = filings_to_dataframe(filings_data)
+    if not df.empty:
+        write_ticker_parquet(df, cfg.RAW_FILINGS_DIR / f"{ticker}_filings.parquet")
+        logger.info(f"Saved metadata: {len(df)} filings")
+    # download raw docs
+    downloaded = download_recent_filing_documents(
+        ticker,
+        filing_types=cfg.FILING_TYPES,
+        max_filings=cfg.AUTO_MAX_FILINGS,
+        save_dir=cfg.RAW_FILINGS_DOCS_DIR,
+    )
+    logger.info(f"Downloaded {len(downloaded)} filing documents for {ticker}")
+
+
+def _process_filing(raw_path: str, output_path: str, cfg: ETLConfig) -> None:
+    process_filing_file(raw_path, output_path, config=cfg)
+
+
+@dataclasses.dataclass(frozen=True)
+class DocumentSource:
+    """
+    A source stored as one raw ``{TICKER}_*{suffix}`` file per document and
+    one processed ``.parquet`` per raw file. Directories are ETLConfig
+    attribute names so a spec works with any config instance.
+    """
+    name: str
+    raw_dir: str
+    processed_dir: str
+    fetch: Callable[[str, ETLConfig], None]
+    process: Callable[[str, str, ETLConfig], None]  # (raw path, output path, config)
+    # Whether a ticker with no raw files after fetching is an error
+    require_files: bool = False
+    # Raw file suffixes, tried in order when mapping to the output name
+    raw_suffixes: Tuple[str, ...] = (".txt",)
+
+
+DOCUMENT_SOURCES: Dict[str, DocumentSource] = {
+    "transcripts": DocumentSource(
+        "transcripts", "RAW_TRANSCRIPTS_DIR", "PROCESSED_TRANSCRIPTS_DIR", _fetch_transcripts, _process_transcript,
+        raw_suffixes=TRANSCRIPT_SUFFIXES,
+    ),
+    "filings": DocumentSource(
+        "filings", "RAW_FILINGS_DOCS_DIR", "PROCESSED_FILINGS_DIR", _fetch_filings, _process_filing,
+        require_files=True,
+    ),
+}
+
+
+def _ensure_documents(
+    source: DocumentSource, ticker: str, cfg: ETLConfig, scans: Optional[DirScans] = None
+) -> Dict[str, Any]:
+    """Fetch a ticker's documents if stale, then process raw files whose output is out of date."""
+    name = source.name
+    raw_dir = getattr(cfg, source.raw_dir)
+    processed_dir = getattr(cfg, source.processed_dir)
+    status = {"source": name, "ticker": ticker, "fetched": False, "processed": False, "skipped": 0, "error": None}
     try:
-        logger.debug(f"Checking transcripts for {ticker}...")
-        processed_dir = cfg.PROCESSED_TRANSCRIPTS_DIR
+        logger.debug(f"Checking {name} for {ticker}...")
         # Check staleness for THIS ticker specifically
-        latest = _latest_mtime_for_ticker(processed_dir, ticker)
+        latest = _latest_mtime_for_ticker(processed_dir, ticker, scans)
         stale = True
         if latest:
-            stale = datetime.now() - latest > timedelta(hours=cfg.AUTO_STALENESS_HOURS)
-            logger.debug(f"Latest processed transcript for {ticker}: {latest}, stale: {stale}")
+            age = time.time() - latest
+            stale = age > cfg.AUTO_STALENESS_HOURS * 3600.0
+            logger.debug(f"Latest processed {name} for {ticker} is {age / 3600:.1f}h old, stale: {stale}")
         else:
-            logger.debug(f"No processed transcripts found for {ticker}, will fetch")
-        
-        # Check if raw files exist for this ticker
-        transcript_files = glob.glob(str(cfg.RAW_TRANSCRIPTS_DIR / f"{ticker}_*.txt"))
-        if not transcript_files and stale:
-            logger.info(f"No raw files for {ticker}, fetching...")
-            stale = True  # Force fetch if no files exist
-        
+            logger.debug(f"No processed {name} found for {ticker}, will fetch")
+
+        raw_entries = _ticker_entries(raw_dir, source.raw_suffixes, ticker, scans)
         if stale:
-            logger.info(f"Fetching transcripts for {ticker}...")
-            download_transcripts_to_dataframe(
-                ticker,
-                max_transcripts=cfg.AUTO_MAX_TRANSCRIPTS,
-                save_dir=str(cfg.RAW_TRANSCRIPTS_DIR),
-                api_key=cfg.API_NINJAS_API_KEY,
-            )
+            logger.info(f"Fetching {name} for {ticker}...")
+            source.fetch(ticker, cfg)
             status["fetched"] = True
-            logger.info(f"Download complete for {ticker}")
-            # Refresh file list after download
-            transcript_files = glob.glob(str(cfg.RAW_TRANSCRIPTS_DIR / f"{ticker}_*.txt"))
+            # Refresh file list after download (bypassing the per-run scan cache)
+            raw_entries = _ticker_entries(raw_dir, source.raw_suffixes, ticker)
         else:
-            logger.debug(f"Transcripts for {ticker} are fresh, skipping fetch")
-        
-        logger.info(f"Found {len(transcript_files)} transcript files for {ticker} to process")
-        for transcript_file in transcript_files:
-            with open(transcript_file, "r", encoding="utf-8") as f:
-                text = f.read()
-            filename = os.path.basename(transcript_file).replace(".txt", ".parquet")
-            output_path = cfg.PROCESSED_TRANSCRIPTS_DIR / filename
-            process_transcript_from_text(text, str(output_path), config=cfg)
+            logger.debug(f"{name.capitalize()} for {ticker} are fresh, skipping fetch")
+
+        if not raw_entries and source.require_files:
+            logger.warning(f"No raw {name} files found for {ticker} to process")
+            status["error"] = f"No {name} found for {ticker}"
+            return status
+
+        # Outputs newer than their source are already up to date
+        raw_files = _outdated_sources(raw_entries, processed_dir, ticker, scans, source.raw_suffixes)
+        status["skipped"] = len(raw_entries) - len(raw_files)
+        logger.info(
+            f"Found {len(raw_entries)} raw {name} files for {ticker}, "
+            f"{len(raw_files)} to process ({status['skipped']} up to date)"
+        )
+
+        def process_one(raw_path: str) -> None:
+            filename = _output_name(os.path.basename(raw_path), source.raw_suffixes)
+            source.process(raw_path, str(processed_dir / filename), cfg)
+
+        _process_files(raw_files, process_one, cfg)
         status["processed"] = True
-        logger.info(f"Processing complete for {ticker}: {len(transcript_files)} files")
+        logger.info(f"Processing complete for {ticker}: {len(raw_files)} {name} files")
     except Exception as exc:
         status["error"] = str(exc)
-        logger.error(f"Error processing transcripts for {ticker}: {exc}")
+        logger.error(f"Error processing {name} for {ticker}: {exc}")
         import traceback
         traceback.print_exc()
     return status
 
 
-def _latest_mtime_for_ticker(directory: Path, ticker: str) -> Optional[datetime]:
-    """Get latest modification time for files matching a specific ticker."""
-    if not directory.exists():
-        return None
-    mtimes = []
-    pattern = f"{ticker}_*.parquet"
-    import glob
-    for filepath in glob.glob(str(directory / pattern)):
-        full = Path(filepath)
-        if full.exists():
-            mtimes.append(datetime.fromtimestamp(full.stat().st_mtime))
-    return max(mtimes) if mtimes else None
-
-
-def ensure_filings(ticker: str, cfg: ETLConfig) -> Dict[str, Any]:
-    status = {"source": "filings", "ticker": ticker, "fetched": False, "processed": False, "error": None}
-    try:
-        logger.debug(f"Checking filings for {ticker}...")
-        # Check staleness for THIS ticker specifically
-        latest = _latest_mtime_for_ticker(cfg.PROCESSED_FILINGS_DIR, ticker)
-        stale = True
-        if latest:
-            stale = datetime.now() - latest > timedelta(hours=cfg.AUTO_STALENESS_HOURS)
-            logger.debug(f"Latest processed filing for {ticker}: {latest}, stale: {stale}")
-        else:
-            logger.debug(f"No processed filings found for {ticker}, will fetch")
-        
-        # Check if raw files exist for this ticker
-        import glob
-        raw_files = glob.glob(str(cfg.RAW_FILINGS_DOCS_DIR / f"{ticker}_*.txt"))
-        if not raw_files and stale:
-            logger.info(f"No raw files for {ticker}, fetching...")
-            stale = True  # Force fetch if no files exist
-        
-        if stale:
-            logger.info(f"Fetching filings for {ticker}...")
-            # refresh metadata parquet
-            filings_data = fetch_filings(ticker)
-            df = filings_to_dataframe(filings_data)
-            if not df.empty:
-                save_path = cfg.RAW_FILINGS_DIR / f"{ticker}_filings.parquet"
-                df.to_parquet(save_path, index=False)
-                logger.info(f"Saved metadata: {len(df)} filings")
-            # download raw docs
-            downloaded = download_recent_filing_documents(
-                ticker,
-                filing_types=cfg.FILING_TYPES,
-                max_filings=cfg.AUTO_MAX_FILINGS,
-                save_dir=cfg.RAW_FILINGS_DOCS_DIR,
-            )
-            logger.info(f"Downloaded {len(downloaded)} filing documents for {ticker}")
-            status["fetched"] = True
-        else:
-            logger.debug(f"Filings for {ticker} are fresh, skipping fetch")
-        
-        # Process only files for this ticker
-        logger.info(f"Processing filings for {ticker} from {cfg.RAW_FILINGS_DOCS_DIR}...")
-        raw_files = glob.glob(str(cfg.RAW_FILINGS_DOCS_DIR / f"{ticker}_*.txt"))
-        logger.info(f"Found {len(raw_files)} raw filing files for {ticker}")
-        
-        if raw_files:
-            for filepath in raw_files:
-                filename = os.path.basename(filepath).replace(".txt", ".parquet")
-                output_path = cfg.PROCESSED_FILINGS_DIR / filename
-                from processing.process_filings import process_filing_file
-                process_filing_file(filepath, str(output_path), config=cfg)
-            status["processed"] = True
-            logger.info(f"Processing complete for {ticker}: {len(raw_files)} files")
-        else:
-            logger.warning(f"No raw filing files found for {ticker} to process")
-            status["error"] = f"No filing files found for {ticker}"
-    except Exception as exc:
-        status["error"] = str(exc)
-        logger.error(f"Error processing filings for {ticker}: {exc}")
-        import traceback
-        traceback.print_exc()
-    return status
+def ensure_transcripts(ticker: str, cfg: ETLConfig, scans: Optional[DirScans] = None) -> Dict[str, Any]:
+    return _ensure_documents(DOCUMENT_SOURCES["transcripts"], ticker, cfg, scans)
+
+
+def ensure_filings(ticker: str, cfg: ETLConfig, scans: Optional[DirScans] = None) -> Dict[str, Any]:
+    return _ensure_documents(DOCUMENT_SOURCES["filings"], ticker, cfg, scans)
+
+
+# source -> index doc types it contributes, in run order
+SOURCE_DOC_TYPES: Dict[str, Set[str]] = {
+    "news": {"news", "news_insight"},
+    "transcripts": {"transcript", "transcript_qa", "transcript_guidance"},
+    "filings": {"filing", "filing_insight"},
+}
+
+
+def index_job_key(doc_types: Optional[Set[str]]) -> str:
+    """Job key for an index rebuild over doc_types (empty/None means all)."""
+    return "index:" + (",".join(sorted(doc_types)) if doc_types else "all")
+
 
+def _rebuild_index(cfg: ETLConfig, doc_types: Optional[Set[str]]) -> None:
+    # The built store is saved to disk; don't keep it alive in the job record
+    build_combined_index(cfg, ticker=None, doc_types=doc_types)
 
-def run_autonomous(query: str, ticker_hint: Optional[str] = None, doc_types: Optional[Set[str]] = None) -> Dict[str, Any]:
+
+def run_autonomous(
+    query: str,
+    ticker_hint: Optional[str] = None,
+    doc_types: Optional[Set[str]] = None,
+    index_async: Optional[bool] = None,
+) -> Dict[str, Any]:
     """
     Infer ticker/sources, fetch missing data with caps, process, and rebuild indices.
+
+    With index_async (default cfg.AUTO_INDEX_ASYNC) the index rebuild is
+    queued on index_jobs and results["index_job"] holds the job to poll;
+    otherwise it finishes before returning.
     """
     cfg = ETLConfig()
-    intent: IntentResult = parse_intent(query, ticker_hint)
+    cfg.ensure_directories_once()
+    intent: IntentResult = _cached_intent(query, ticker_hint)
     universe = _load_ticker_universe()
     
     logger.info(f"Query: '{query}', ticker_hint: {ticker_hint}")
@@ -262,18 +472,11 @@ def run_autonomous(query: str, ticker_hint: Optional[str] = None, doc_types: Opt
     raw_candidates.extend(intent.raw_ticker_candidates)
     if intent.ticker:
         raw_candidates.append(intent.ticker)
-    dedup: List[str] = []
-    for t in raw_candidates:
-        tu = t.upper()
-        if tu not in dedup:
-            dedup.append(tu)
-    filtered: List[str] = []
-    for t in dedup:
-        if t in TICKER_STOPLIST:
-            continue
-        if universe and t not in universe:
-            continue
-        filtered.append(t)
+    # Order-preserving dedup, then drop stoplisted / out-of-universe symbols
+    dedup: List[str] = list(dict.fromkeys(t.upper() for t in raw_candidates))
+    filtered: List[str] = [
+        t for t in dedup if t not in TICKER_STOPLIST and (not universe or t in universe)
+    ]
     chosen_ticker = filtered[0] if filtered else None
 
     # If none, try sector-based fallback seeds
@@ -287,9 +490,7 @@ def run_autonomous(query: str, ticker_hint: Optional[str] = None, doc_types: Opt
     suggested_payload = None
     if not chosen_ticker:
         try:
-            # Local import to avoid heavy deps at module import time
-            from agents.tools.search_tools import suggest_tickers as _suggest_tickers
-            suggested_payload = _suggest_tickers(query=query, doc_type=None, k=5, candidate_k=120, min_score=0.0)
+            suggested_payload = _cached_suggestions(cfg, query, k=5, candidate_k=120, min_score=0.0)
             suggested = [t.get("ticker") for t in (suggested_payload.get("tickers") or []) if t.get("ticker")]
             # Apply universe filtering if configured
             suggested = [t for t in suggested if (not universe or t in universe)]
@@ -335,37 +536,73 @@ def run_autonomous(query: str, ticker_hint: Optional[str] = None, doc_types: Opt
 
     if cfg.AUTO_ENABLED:
         logger.info(f"AUTO_ENABLED=True, fetching sources: {needed}")
-        for t in tickers_to_process:
-            if "news" in needed:
-                logger.info(f"Ensuring news for {t}...")
-                results["actions"].append(ensure_news(t, cfg))
-                index_doc_types.update({"news", "news_insight"})
-            if "transcripts" in needed:
-                logger.info(f"Ensuring transcripts for {t}...")
-                results["actions"].append(ensure_transcripts(t, cfg))
-                index_doc_types.update({"transcript", "transcript_qa", "transcript_guidance"})
-            if "filings" in needed:
-                logger.info(f"Ensuring filings for {t}...")
-                results["actions"].append(ensure_filings(t, cfg))
-                index_doc_types.update({"filing", "filing_insight"})
+        # Every (ticker, source) pair is independent and network-bound, so
+        # fetch them concurrently; actions keep the sequential order.
+        scans: DirScans = _prescan_sources(cfg, needed)
+        tasks = [(source, t) for t in tickers_to_process for source in SOURCE_DOC_TYPES if source in needed]
+        for source in needed:
+            index_doc_types.update(SOURCE_DOC_TYPES.get(source, ()))
+        workers = max(1, min(cfg.AUTO_MAX_WORKERS, len(tasks)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="auto-etl") as pool:
+            futures = []
+            for source, t in tasks:
+                logger.info(f"Ensuring {source} for {t}...")
+                if source == "news":
+                    futures.append(pool.submit(ensure_news, t, cfg, combine=False))
+                else:
+                    futures.append(pool.submit(_ensure_documents, DOCUMENT_SOURCES[source], t, cfg, scans))
+            results["actions"] = [f.result() for f in futures]
+
+        # All tickers write the same combined news file: rebuild it once
+        news_actions = [a for a in results["actions"] if a["source"] == "news"]
+        if news_actions:
+            try:
+                combine_news_files(input_dir=str(cfg.RAW_NEWS_DIR), output_path=str(cfg.PROCESSED_NEWS_FILE), config=cfg)
+                for action in news_actions:
+                    action["processed"] = action["error"] is None
+            except Exception as exc:
+                logger.error(f"Error combining news files: {exc}")
+                for action in news_actions:
+                    action["error"] = action["error"] or str(exc)
     else:
         logger.info("AUTO_ENABLED=False, skipping fetch")
 
     # Rebuild indices (include all documents, not just this ticker)
     # Search will filter by ticker as needed
-    logger.info(f"Rebuilding indices with doc_types: {index_doc_types or 'all'}")
-    try:
-        build_combined_index(cfg, ticker=None, doc_types=index_doc_types or None)
-        results["index_rebuilt"] = True
+    # Concurrent queries needing the same rebuild share one queued job
+    key = index_job_key(index_doc_types)
+    job, created = index_jobs.submit(key, _rebuild_index, cfg, index_doc_types or None, follow_running=True)
+    if cfg.AUTO_INDEX_ASYNC if index_async is None else index_async:
+        logger.info(f"{'Queued' if created else 'Joined'} index rebuild with doc_types: {index_doc_types or 'all'}")
+        results["index_job"] = job
+        return results
+
+    logger.info(f"Rebuilding indices with doc_types: {index_doc_types or 'all'}{'' if created else ' (joined queued rebuild)'}")
+    job = index_jobs.join(key)
+    results["index_rebuilt"] = job["status"] == "finished"
+    if results["index_rebuilt"]:
         logger.info("Index rebuild successful")
-    except Exception as exc:
-        results["index_rebuilt"] = False
-        results["index_error"] = str(exc)
-        logger.error(f"Index rebuild failed: {exc}")
-        import traceback
-        traceback.print_exc()
+    else:
+        results["index_error"] = job["error"]
+        logger.error(f"Index rebuild failed: {job['error']}")
 
     return results
 
 
-__all__ = ["run_autonomous"]
+async def run_autonomous_async(
+    query: str,
+    ticker_hint: Optional[str] = None,
+    doc_types: Optional[Set[str]] = None,
+    index_async: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """
+    run_autonomous for async callers.
+
+    The fetchers (yfinance, feedparser, requests) are blocking clients, so the
+    run executes on a worker thread, where its own pool fetches every
+    (ticker, source) pair concurrently, and the event loop stays free.
+    """
+    return await asyncio.to_thread(run_autonomous, query, ticker_hint, doc_types, index_async)
+
+
+__all__ = ["run_autonomous", "run_autonomous_async"]
@@ -3,6 +3,7 @@ ETL configuration settings.
 """
 
 import os
+import threading
 from pathlib import Path
 
 # Base directories
@@ -11,8 +12,30 @@ DATA_DIR = BASE_DIR / "data"
 RAW_DIR = DATA_DIR / "raw"
 PROCESSED_DIR = DATA_DIR / "processed"
 
+# Writer settings for processed parquet files. zstd(3) is markedly smaller than
+# the snappy default at similar decode speed; pyarrow dictionary-encodes string
+# columns such as ticker by default, and statistics enable row-group pruning.
+PARQUET_WRITE_OPTIONS = {
+    "compression": "zstd",
+    "compression_level": 3,
+    "data_page_size": 1 << 20,
+    "write_statistics": True,
+}
+
+# Directory layouts already created by ETLConfig.ensure_directories_once()
+_ENSURED_LAYOUTS = set()
+_ENSURED_LOCK = threading.Lock()
+
+
 class ETLConfig:
-    """Configuration class for ETL pipeline."""
+    """
+    Configuration class for ETL pipeline.
+
+    All settings are class attributes, so instances carry no state and
+    can't be assigned to; override settings on a subclass (or the class).
+    """
+
+    __slots__ = ()
     
     # Base directories (as class attributes)
     BASE_DIR = BASE_DIR
@@ -43,6 +66,16 @@ class ETLConfig:
     PROCESSED_NEWS_INSIGHTS_FILE = PROCESSED_DIR / "news_insights.parquet"
     PROCESSED_FUNDAMENTALS_FILE = PROCESSED_DIR / "fundamentals.parquet"
     FEATURES_FILE = PROCESSED_DIR / "features.parquet"
+
+    # Precomputed /api/ticker payloads (written at the end of each ETL run)
+    TICKER_CACHE_DIR = PROCESSED_DIR / "cache"
+    # Combined files split per ticker (dataset/ticker=XYZ/part-0.parquet)
+    TICKER_PARTITIONS_DIR = PROCESSED_DIR / "by_ticker"
+    PARTITION_ROW_GROUP_SIZE = 131072
+    # Which tickers each processed dataset holds (rebuilt at the end of each ETL run)
+    ETL_STATE_FILE = PROCESSED_DIR / "state.json"
+    
+    PARQUET_WRITE_OPTIONS = PARQUET_WRITE_OPTIONS
     
     # Default parameters
     PRICE_PERIOD = "5y"
@@ -57,10 +90,20 @@ class ETLConfig:
     AUTO_MAX_TRANSCRIPTS = 10
     AUTO_MAX_FILINGS = 10
     AUTO_STALENESS_HOURS = 24
+    # Concurrent (ticker, source) fetches in run_autonomous; they're network-bound
+    AUTO_MAX_WORKERS = int(os.getenv("AUTO_MAX_WORKERS", 9))
+    # Concurrent per-file processing inside ensure_transcripts/ensure_filings
+    PROCESS_WORKERS = int(os.getenv("PROCESS_WORKERS", min(4, os.cpu_count() or 1)))
+    # Tickers processed concurrently by etl/run_all_tickers.py
+    RUN_ALL_WORKERS = int(os.getenv("RUN_ALL_WORKERS", 4))
+    # Rebuild the search index in the background after run_autonomous
+    # instead of before it returns
+    AUTO_INDEX_ASYNC = os.getenv("AUTO_INDEX_ASYNC", "false").lower() == "true"
     
     # API settings
     API_HOST = "0.0.0.0"
     API_PORT = 8000
+    ETL_MAX_CONCURRENT_JOBS = int(os.getenv("ETL_MAX_CONCURRENT_JOBS", 2))
 
     # DocETL settings
     DOCETL_ENABLED = True
@@ -75,6 +118,18 @@ class ETLConfig:
     # FMP API settings (deprecated, kept for backward compatibility)
     FMP_API_KEY = os.getenv("FMP_API_KEY")
     
+    # On-disk cache of upstream HTTP responses (ingestion/http_cache.py)
+    HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "true").lower() == "true"
+    HTTP_CACHE_DIR = RAW_DIR / "http_cache"
+    # Seconds a cached response stays fresh, per host; other hosts aren't cached
+    HTTP_CACHE_TTLS = {
+        "www.sec.gov": 30 * 86400,  # Archived filing documents never change
+        "data.sec.gov": 86400,  # Submissions index gains new filings
+        "api.api-ninjas.com": 86400,
+        "www.alphavantage.co": 86400,
+        "news.google.com": 6 * 3600,
+    }
+    
     # Storage settings
     USE_SUPABASE_STORAGE = os.getenv("USE_SUPABASE_STORAGE", "false").lower() == "true"
     SUPABASE_STORAGE_BUCKET = os.getenv("SUPABASE_STORAGE_BUCKET", "financial-data")
@@ -82,7 +137,26 @@ class ETLConfig:
     @classmethod
     def ensure_directories(cls):
         """Create all necessary directories if they don't exist."""
-        directories = [
+        for directory in cls._directories():
+            directory.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def ensure_directories_once(cls):
+        """
+        ensure_directories, done once per process for a given directory layout
+        so per-query callers don't repeat the mkdir syscalls.
+        """
+        directories = cls._directories()
+        if directories in _ENSURED_LAYOUTS:
+            return
+        with _ENSURED_LOCK:
+            if directories not in _ENSURED_LAYOUTS:
+                cls.ensure_directories()
+                _ENSURED_LAYOUTS.add(directories)
+
+    @classmethod
+    def _directories(cls):
+        return (
             cls.RAW_PRICES_DIR,
             cls.RAW_NEWS_DIR,
             cls.RAW_FILINGS_DIR,
@@ -97,8 +171,8 @@ class ETLConfig:
             cls.PROCESSED_TRANSCRIPTS_QA_DIR,
             cls.PROCESSED_TRANSCRIPTS_GUIDANCE_DIR,
             cls.PROCESSED_FUNDAMENTALS_DIR,
-            PROCESSED_DIR,  # Module-level constant
-        ]
-        for directory in directories:
-            directory.mkdir(parents=True, exist_ok=True)
+            cls.TICKER_CACHE_DIR,
+            cls.TICKER_PARTITIONS_DIR,
+            cls.PROCESSED_DIR,
+        )
 
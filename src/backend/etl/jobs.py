@@ -0,0 +1,113 @@
+"""
+In-process ETL job queue with idempotency keys.
+
+Jobs run on a bounded worker pool instead of the API's request workers, and a
+second submission for a key that is still queued or running returns the
+existing job rather than starting a duplicate pipeline.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+ACTIVE_STATES = ("queued", "running")
+
+
+class ETLJobQueue:
+    """Bounded worker pool that deduplicates jobs by key."""
+
+    def __init__(self, max_workers: int = 2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="etl-job")
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._futures: Dict[str, Future] = {}
+
+    def submit(
+        self, key: str, fn: Callable[..., Any], *args, follow_running: bool = False, **kwargs
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Get-or-create a job for key.
+
+        Returns (job snapshot, created). created is False when an active job
+        with the same key already exists. With follow_running, only a queued
+        job is joined: a running one may have read its inputs before the
+        caller's changes, so a new job is queued behind it and becomes the
+        job tracked for key.
+        """
+        joinable = ("queued",) if follow_running else ACTIVE_STATES
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job["status"] in joinable:
+                return dict(job), False
+            job = {
+                "job_id": key,
+                "status": "queued",
+                "submitted_at": datetime.now().isoformat(),
+                "started_at": None,
+                "finished_at": None,
+                "result": None,
+                "error": None,
+            }
+            self._jobs[key] = job
+            snapshot = dict(job)
+            # Submitted under the lock so wait() never sees a job without its future
+            self._futures[key] = self._executor.submit(self._run, job, fn, args, kwargs)
+        return snapshot, True
+
+    def _run(self, job: Dict[str, Any], fn: Callable[..., Any], args: tuple, kwargs: dict) -> Dict[str, Any]:
+        with self._lock:
+            job["status"] = "running"
+            job["started_at"] = datetime.now().isoformat()
+        try:
+            result = fn(*args, **kwargs)
+            status, error = "finished", None
+        except Exception as exc:
+            logger.error(f"ETL job {job['job_id']} failed: {exc}")
+            result, status, error = None, "failed", str(exc)
+        with self._lock:
+            job["result"] = result
+            job["error"] = error
+            job["status"] = status
+            job["finished_at"] = datetime.now().isoformat()
+            return dict(job)
+
+    def status(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a snapshot of the job for key, or None if it was never submitted."""
+        with self._lock:
+            job = self._jobs.get(key)
+            return dict(job) if job is not None else None
+
+    def join(self, key: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Block until the job for key finishes (or timeout elapses), then return
+        its snapshot. The snapshot is of the job waited on, even if a newer job
+        for key was queued meanwhile.
+        """
+        with self._lock:
+            future = self._futures.get(key)
+        if future is not None:
+            try:
+                return future.result(timeout)
+            except FutureTimeoutError:
+                pass
+        return self.status(key)
+
+    async def wait(self, key: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Wait up to timeout seconds for the job for key to finish, without
+        blocking the event loop, then return its snapshot.
+        """
+        with self._lock:
+            future = self._futures.get(key)
+        if future is not None and timeout > 0:
+            try:
+                await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.status(key)
@@ -4,29 +4,40 @@ ETL workflow orchestrator.
 Coordinates the complete Extract, Transform, Load pipeline for financial data.
 """
 
+import argparse
+import functools
 import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import pandas as pd
+
 # Add parent directories to path for imports
 backend_path = Path(__file__).parent.parent
 sys.path.insert(0, str(backend_path.parent))
 
 from .config import ETLConfig
+from .partitioning import partition_by_ticker, partition_fingerprint_path, source_fingerprint
+from .state import write_etl_state
+from .ticker_cache import TICKER_DATASETS, write_ticker_cache
+from utils.logger import setup_logger
+from utils.storage import scan_ticker_files, write_ticker_parquet
 
 # Import ingestion modules
 sys.path.insert(0, str(backend_path / "ingestion"))
 from fetch_prices import fetch_prices_and_save
 from fetch_news import fetch_news_and_save
 from fetch_earnings_calls import download_transcripts_to_dataframe
-from fetch_filings import fetch_filings, filings_to_dataframe
+from fetch_filings import fetch_filings, fetch_fundamentals, filings_to_dataframe
 from ingestion.download_filings import download_recent_filing_documents
 
 # Import processing modules
 sys.path.insert(0, str(backend_path / "processing"))
 from clean_prices import combine_price_files
 from process_news import process_all_news, combine_news_files
-from process_transcripts import process_transcript_from_text
+from process_transcripts import TRANSCRIPT_SUFFIXES, process_transcript_files
 from process_fundamentals import combine_fundamentals
 from process_filings import process_all_filings
 from build_features import build_features
@@ -35,74 +46,116 @@ from build_features import build_features
 sys.path.insert(0, str(backend_path / "retrieval"))
 from index_builder import build_combined_index
 
+# Records are queued from the extract/transform worker threads and written
+# by one listener thread, so the workers never wait on stdout
+logger = setup_logger(__name__, queued=True)
 
-def extract_data(ticker, config=None):
-    """Extract (fetch) all raw data for a ticker."""
-    if config is None:
-        config = ETLConfig()
-    
-    config.ensure_directories()
-    status = {
-        "ticker": ticker,
-        "prices": {"success": False, "error": None},
-        "news": {"success": False, "error": None},
-        "transcripts": {"success": False, "error": None},
-        "filings": {"success": False, "error": None},
-        "fundamentals": {"success": False, "error": None},
-    }
-    
-    # Extract prices
+
+def _run_steps(stage: str, verb: str, ticker, config, steps) -> dict:
+    """
+    Run independent per-source steps concurrently and collect their status.
+
+    Each step is step(ticker, config, entry) and marks entry["success"] (or
+    sets entry["error"]) itself; an exception is recorded as the error.
+    Status keys keep the order of steps.
+    """
+    status = {"ticker": ticker}
+    status.update({name: {"success": False, "error": None} for name in steps})
+
+    # The steps hit different upstream APIs / write different files
+    with ThreadPoolExecutor(max_workers=len(steps), thread_name_prefix=stage.lower()) as pool:
+        futures = [
+            pool.submit(_run_step, stage, verb, ticker, config, name, step, status[name])
+            for name, step in steps.items()
+        ]
+        for future in futures:
+            future.result()
+    return status
+
+
+def _run_step(stage: str, verb: str, ticker, config, name, step, entry):
+    """Run one step, recording an exception as the entry's error."""
+    try:
+        step(ticker, config, entry)
+    except Exception as e:
+        entry["error"] = str(e)
+        logger.error("[%s] ✗ Failed to %s %s for %s: %s", stage, verb, name, ticker, e)
+
+
+def _extract_prices(ticker, config, entry):
+    logger.info("[EXTRACT] Fetching prices for %s...", ticker)
+    df = fetch_prices_and_save(
+        ticker,
+        period=config.PRICE_PERIOD,
+        interval=config.PRICE_INTERVAL,
+        save_dir=str(config.RAW_PRICES_DIR)
+    )
+    if df.empty:
+        entry["error"] = "No price data returned"
+        logger.warning("[EXTRACT] ⚠ No price data returned for %s", ticker)
+        return
+    entry["success"] = True
+    logger.info("[EXTRACT] ✓ Prices extracted for %s", ticker)
+
+
+def _extract_prices_batch(tickers, config) -> dict:
+    """Fetch prices for all tickers with one yfinance request; returns {ticker: entry}."""
+    entries = {ticker: {"success": False, "error": None} for ticker in tickers}
+    logger.info("[EXTRACT] Fetching prices for %d tickers...", len(tickers))
     try:
-        print(f"[EXTRACT] Fetching prices for {ticker}...")
-        fetch_prices_and_save(
-            ticker,
+        df = fetch_prices_and_save(
+            tickers,
             period=config.PRICE_PERIOD,
             interval=config.PRICE_INTERVAL,
             save_dir=str(config.RAW_PRICES_DIR)
         )
-        status["prices"]["success"] = True
-        print(f"[EXTRACT] ✓ Prices extracted for {ticker}")
-    except Exception as e:
-        status["prices"]["error"] = str(e)
-        print(f"[EXTRACT] ✗ Failed to extract prices for {ticker}: {e}")
-    
-    # Extract news
-    try:
-        print(f"[EXTRACT] Fetching news for {ticker}...")
-        fetch_news_and_save(
-            ticker,
-            max_articles=config.MAX_NEWS_ARTICLES,
-            save_dir=str(config.RAW_NEWS_DIR)
-        )
-        status["news"]["success"] = True
-        print(f"[EXTRACT] ✓ News extracted for {ticker}")
     except Exception as e:
-        status["news"]["error"] = str(e)
-        print(f"[EXTRACT] ✗ Failed to extract news for {ticker}: {e}")
-    
-    # Extract transcripts
-    try:
-        print(f"[EXTRACT] Fetching transcripts for {ticker}...")
-        download_transcripts_to_dataframe(
-            ticker,
-            max_transcripts=config.MAX_TRANSCRIPTS,
-            save_dir=str(config.RAW_TRANSCRIPTS_DIR),
-            api_key=config.API_NINJAS_API_KEY,
-        )
-        status["transcripts"]["success"] = True
-        print(f"[EXTRACT] ✓ Transcripts extracted for {ticker}")
-    except Exception as e:
-        status["transcripts"]["error"] = str(e)
-        print(f"[EXTRACT] ✗ Failed to extract transcripts for {ticker}: {e}")
-    
-    # Extract filings
-    try:
-        print(f"[EXTRACT] Fetching filings for {ticker}...")
-        filings_data = fetch_filings(ticker)
-        df = filings_to_dataframe(filings_data)
-        if not df.empty:
-            save_path = config.RAW_FILINGS_DIR / f"{ticker}_filings.parquet"
-            df.to_parquet(save_path, index=False)
+        logger.error("[EXTRACT] ✗ Failed to extract prices: %s", e)
+        for entry in entries.values():
+            entry["error"] = str(e)
+        return entries
+
+    fetched = set(df["ticker"].unique())
+    for ticker, entry in entries.items():
+        if ticker in fetched:
+            entry["success"] = True
+        else:
+            entry["error"] = "No price data returned"
+            logger.warning("[EXTRACT] ⚠ No price data returned for %s", ticker)
+    return entries
+
+
+def _extract_news(ticker, config, entry):
+    logger.info("[EXTRACT] Fetching news for %s...", ticker)
+    fetch_news_and_save(
+        ticker,
+        max_articles=config.MAX_NEWS_ARTICLES,
+        save_dir=str(config.RAW_NEWS_DIR)
+    )
+    entry["success"] = True
+    logger.info("[EXTRACT] ✓ News extracted for %s", ticker)
+
+
+def _extract_transcripts(ticker, config, entry):
+    logger.info("[EXTRACT] Fetching transcripts for %s...", ticker)
+    download_transcripts_to_dataframe(
+        ticker,
+        max_transcripts=config.MAX_TRANSCRIPTS,
+        save_dir=str(config.RAW_TRANSCRIPTS_DIR),
+        api_key=config.API_NINJAS_API_KEY,
+    )
+    entry["success"] = True
+    logger.info("[EXTRACT] ✓ Transcripts extracted for %s", ticker)
+
+
+def _extract_filings(ticker, config, entry):
+    logger.info("[EXTRACT] Fetching filings for %s...", ticker)
+    filings_data = fetch_filings(ticker)
+    df = filings_to_dataframe(filings_data)
+    if not df.empty:
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="filings-write") as writer:
+            # Encode the metadata parquet while the documents download
+            written = writer.submit(write_ticker_parquet, df, config.RAW_FILINGS_DIR / f"{ticker}_filings.parquet")
             # Download actual filing documents for DocETL processing
             download_recent_filing_documents(
                 ticker,
@@ -110,130 +163,210 @@ def extract_data(ticker, config=None):
                 max_filings=config.MAX_FILINGS,
                 save_dir=config.RAW_FILINGS_DOCS_DIR,
             )
-            status["filings"]["success"] = True
-            print(f"[EXTRACT] ✓ Filings extracted for {ticker}")
-        else:
-            status["filings"]["error"] = "No filings data returned"
-            print(f"[EXTRACT] ✗ No filings data for {ticker}")
-    except Exception as e:
-        status["filings"]["error"] = str(e)
-        print(f"[EXTRACT] ✗ Failed to extract filings for {ticker}: {e}")
-    
-    # Extract fundamentals (if API key available)
-    try:
-        print(f"[EXTRACT] Fetching fundamentals for {ticker}...")
-        sys.path.insert(0, str(Path(__file__).parent.parent / "ingestion"))
-        from fetch_filings import fetch_fundamentals
-        fundamentals_data = fetch_fundamentals(ticker)
-        if fundamentals_data and "annualReports" in fundamentals_data:
-            import pandas as pd
-            df = pd.DataFrame(fundamentals_data["annualReports"])
-            if not df.empty:
-                df["ticker"] = ticker  # Add ticker column
-                save_path = config.RAW_FUNDAMENTALS_DIR / f"{ticker}_fundamentals.parquet"
-                df.to_parquet(save_path, index=False)
-                status["fundamentals"]["success"] = True
-                print(f"[EXTRACT] ✓ Fundamentals extracted for {ticker}")
-            else:
-                status["fundamentals"]["error"] = "No fundamentals data in response"
-                print(f"[EXTRACT] ⚠ No fundamentals data in response for {ticker}")
+            written.result()
+        entry["success"] = True
+        logger.info("[EXTRACT] ✓ Filings extracted for %s", ticker)
+    else:
+        entry["error"] = "No filings data returned"
+        logger.error("[EXTRACT] ✗ No filings data for %s", ticker)
+
+
+def _extract_fundamentals(ticker, config, entry):
+    # Only available with an API key
+    logger.info("[EXTRACT] Fetching fundamentals for %s...", ticker)
+    fundamentals_data = fetch_fundamentals(ticker)
+    if fundamentals_data and "annualReports" in fundamentals_data:
+        df = pd.DataFrame(fundamentals_data["annualReports"])
+        if not df.empty:
+            df["ticker"] = ticker  # Add ticker column
+            write_ticker_parquet(df, config.RAW_FUNDAMENTALS_DIR / f"{ticker}_fundamentals.parquet")
+            entry["success"] = True
+            logger.info("[EXTRACT] ✓ Fundamentals extracted for %s", ticker)
         else:
-            status["fundamentals"]["error"] = "No fundamentals data available"
-            print(f"[EXTRACT] ⚠ Fundamentals not available for {ticker} (API key may be required)")
-    except Exception as e:
-        status["fundamentals"]["error"] = str(e)
-        print(f"[EXTRACT] ✗ Failed to extract fundamentals for {ticker}: {e}")
+            entry["error"] = "No fundamentals data in response"
+            logger.warning("[EXTRACT] ⚠ No fundamentals data in response for %s", ticker)
+    else:
+        entry["error"] = "No fundamentals data available"
+        logger.warning("[EXTRACT] ⚠ Fundamentals not available for %s (API key may be required)", ticker)
+
+
+EXTRACT_STEPS = {
+    "prices": _extract_prices,
+    "news": _extract_news,
+    "transcripts": _extract_transcripts,
+    "filings": _extract_filings,
+    "fundamentals": _extract_fundamentals,
+}
+
+
+def extract_data(ticker, config=None):
+    """Extract (fetch) all raw data for a ticker; the sources are fetched concurrently."""
+    if config is None:
+        config = ETLConfig()
     
-    return status
+    config.ensure_directories_once()
+    return _run_steps("EXTRACT", "extract", ticker, config, EXTRACT_STEPS)
 
 
-def transform_data(ticker, config=None):
-    """Transform (process) all raw data for a ticker."""
+def extract_all(tickers, config=None, concurrency=None) -> dict:
+    """
+    Extract several tickers at once on one bounded thread pool.
+
+    Every (ticker, source) step is its own task on a single pool of
+    concurrency threads (default config.RUN_ALL_WORKERS), so no more than
+    that many fetches are in flight however many tickers are given. Prices
+    for every ticker are fetched with one batched yfinance download on the
+    same pool. Returns {ticker: extract status}.
+    """
     if config is None:
         config = ETLConfig()
     
-    config.ensure_directories()
-    status = {
-        "ticker": ticker,
-        "prices": {"success": False, "error": None},
-        "news": {"success": False, "error": None},
-        "transcripts": {"success": False, "error": None},
-        "fundamentals": {"success": False, "error": None},
-        "filings": {"success": False, "error": None},
+    config.ensure_directories_once()
+    ordered = [t for t in dict.fromkeys(t.upper().strip() for t in tickers) if t]
+    if not ordered:
+        return {}
+    workers = max(1, concurrency or config.RUN_ALL_WORKERS)
+    # Prices are batched across tickers; the other sources are fetched per ticker
+    steps = {name: step for name, step in EXTRACT_STEPS.items() if name != "prices"}
+    results = {
+        ticker: {"ticker": ticker, "prices": None, **{name: {"success": False, "error": None} for name in steps}}
+        for ticker in ordered
     }
-    
-    # Transform prices
-    try:
-        print(f"[TRANSFORM] Processing prices for {ticker}...")
-        combine_price_files(
-            input_dir=str(config.RAW_PRICES_DIR),
-            output_path=str(config.PROCESSED_PRICES_FILE)
-        )
-        status["prices"]["success"] = True
-        print(f"[TRANSFORM] ✓ Prices processed for {ticker}")
-    except Exception as e:
-        status["prices"]["error"] = str(e)
-        print(f"[TRANSFORM] ✗ Failed to process prices for {ticker}: {e}")
-    
-    # Transform news
-    try:
-        print(f"[TRANSFORM] Processing news for {ticker}...")
-        combine_news_files(
-            input_dir=str(config.RAW_NEWS_DIR),
-            output_path=str(config.PROCESSED_NEWS_FILE),
-            config=config,
-        )
-        status["news"]["success"] = True
-        print(f"[TRANSFORM] ✓ News processed for {ticker}")
-    except Exception as e:
-        status["news"]["error"] = str(e)
-        print(f"[TRANSFORM] ✗ Failed to process news for {ticker}: {e}")
-    
-    # Transform transcripts
-    try:
-        print(f"[TRANSFORM] Processing transcripts for {ticker}...")
-        import glob
-        transcript_files = glob.glob(str(config.RAW_TRANSCRIPTS_DIR / f"{ticker}_*.txt"))
-        for transcript_file in transcript_files:
-            with open(transcript_file, "r", encoding="utf-8") as f:
-                text = f.read()
-            filename = os.path.basename(transcript_file).replace(".txt", ".parquet")
-            output_path = config.PROCESSED_TRANSCRIPTS_DIR / filename
-            process_transcript_from_text(text, str(output_path), config=config)
-        status["transcripts"]["success"] = True
-        print(f"[TRANSFORM] ✓ Transcripts processed for {ticker}")
-    except Exception as e:
-        status["transcripts"]["error"] = str(e)
-        print(f"[TRANSFORM] ✗ Failed to process transcripts for {ticker}: {e}")
-    
-    # Transform fundamentals
-    try:
-        print(f"[TRANSFORM] Processing fundamentals for {ticker}...")
-        combine_fundamentals(
-            input_dir=str(config.RAW_FUNDAMENTALS_DIR),
-            output_path=str(config.PROCESSED_FUNDAMENTALS_FILE)
-        )
-        status["fundamentals"]["success"] = True
-        print(f"[TRANSFORM] ✓ Fundamentals processed for {ticker}")
-    except Exception as e:
-        status["fundamentals"]["error"] = str(e)
-        print(f"[TRANSFORM] ✗ Failed to process fundamentals for {ticker}: {e}")
-    
-    # Transform filings
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="extract-all") as pool:
+        prices = pool.submit(_extract_prices_batch, ordered, config)
+        futures = [
+            pool.submit(_run_step, "EXTRACT", "extract", ticker, config, name, step, results[ticker][name])
+            for ticker in ordered
+            for name, step in steps.items()
+        ]
+        for future in futures:
+            future.result()
+        price_entries = prices.result()
+
+    for ticker in ordered:
+        results[ticker]["prices"] = price_entries[ticker]
+    return results
+
+
+def _transform_prices(ticker, config, entry):
+    logger.info("[TRANSFORM] Processing prices for %s...", ticker)
+    combine_price_files(
+        input_dir=str(config.RAW_PRICES_DIR),
+        output_path=str(config.PROCESSED_PRICES_FILE)
+    )
+    entry["success"] = True
+    logger.info("[TRANSFORM] ✓ Prices processed for %s", ticker)
+
+
+def _transform_news(ticker, config, entry):
+    logger.info("[TRANSFORM] Processing news for %s...", ticker)
+    combine_news_files(
+        input_dir=str(config.RAW_NEWS_DIR),
+        output_path=str(config.PROCESSED_NEWS_FILE),
+        config=config,
+    )
+    entry["success"] = True
+    logger.info("[TRANSFORM] ✓ News processed for %s", ticker)
+
+
+def _transform_transcripts(ticker, config, entry):
+    logger.info("[TRANSFORM] Processing transcripts for %s...", ticker)
+    transcript_files = [
+        entry.path for entry in scan_ticker_files(config.RAW_TRANSCRIPTS_DIR, TRANSCRIPT_SUFFIXES, ticker)
+    ]
+    process_transcript_files(transcript_files, str(config.PROCESSED_TRANSCRIPTS_DIR), config=config)
+    entry["success"] = True
+    logger.info("[TRANSFORM] ✓ Transcripts processed for %s", ticker)
+
+
+def _transform_fundamentals(ticker, config, entry):
+    logger.info("[TRANSFORM] Processing fundamentals for %s...", ticker)
+    combine_fundamentals(
+        input_dir=str(config.RAW_FUNDAMENTALS_DIR),
+        output_path=str(config.PROCESSED_FUNDAMENTALS_FILE)
+    )
+    entry["success"] = True
+    logger.info("[TRANSFORM] ✓ Fundamentals processed for %s", ticker)
+
+
+def _transform_filings(ticker, config, entry):
+    logger.info("[TRANSFORM] Processing filings for %s...", ticker)
+    process_all_filings(
+        input_dir=str(config.RAW_FILINGS_DOCS_DIR),
+        output_dir=str(config.PROCESSED_FILINGS_DIR),
+        config=config,
+    )
+    entry["success"] = True
+    logger.info("[TRANSFORM] ✓ Filings processed for %s", ticker)
+
+
+def _input_fingerprint(input_dir: Path) -> str:
+    """Cheap identity of a raw directory's contents: entry count and newest mtime."""
+    count, newest = 0, 0
     try:
-        print(f"[TRANSFORM] Processing filings for {ticker}...")
-        process_all_filings(
-            input_dir=str(config.RAW_FILINGS_DOCS_DIR),
-            output_dir=str(config.PROCESSED_FILINGS_DIR),
-            config=config,
-        )
-        status["filings"]["success"] = True
-        print(f"[TRANSFORM] ✓ Filings processed for {ticker}")
-    except Exception as e:
-        status["filings"]["error"] = str(e)
-        print(f"[TRANSFORM] ✗ Failed to process filings for {ticker}: {e}")
+        with os.scandir(input_dir) as entries:
+            for entry in entries:
+                try:
+                    newest = max(newest, entry.stat().st_mtime_ns)
+                except OSError:
+                    continue
+                count += 1
+    except FileNotFoundError:
+        pass
+    return f"{count}:{newest}"
+
+
+def _fingerprint_path(output: Path) -> Path:
+    return output.with_name(output.name + ".fp")
+
+
+def _unless_unchanged(name: str, input_attr: str, output_attr: str, step):
+    """
+    Wrap a combine step so it is skipped while its raw input directory is
+    unchanged since the output was last built.
+
+    The input fingerprint is taken before the step runs and recorded in a
+    .fp sidecar only on success, so inputs that change mid-run are picked up
+    next time. Delete the sidecar to force a rebuild.
+    """
+    @functools.wraps(step)
+    def run(ticker, config, entry):
+        output = getattr(config, output_attr)
+        sidecar = _fingerprint_path(output)
+        fingerprint = _input_fingerprint(getattr(config, input_attr))
+        try:
+            unchanged = output.exists() and sidecar.read_text() == fingerprint
+        except OSError:
+            unchanged = False
+        if unchanged:
+            entry["success"] = True
+            entry["skipped"] = True
+            logger.info("[TRANSFORM] ✓ %s inputs unchanged, skipped for %s", name.capitalize(), ticker)
+            return
+        step(ticker, config, entry)
+        if entry["success"]:
+            sidecar.write_text(fingerprint)
+    return run
+
+
+TRANSFORM_STEPS = {
+    "prices": _unless_unchanged("prices", "RAW_PRICES_DIR", "PROCESSED_PRICES_FILE", _transform_prices),
+    "news": _unless_unchanged("news", "RAW_NEWS_DIR", "PROCESSED_NEWS_FILE", _transform_news),
+    "transcripts": _transform_transcripts,
+    "fundamentals": _unless_unchanged(
+        "fundamentals", "RAW_FUNDAMENTALS_DIR", "PROCESSED_FUNDAMENTALS_FILE", _transform_fundamentals
+    ),
+    "filings": _unless_unchanged("filings", "RAW_FILINGS_DOCS_DIR", "PROCESSED_FILINGS_DIR", _transform_filings),
+}
+
+
+def transform_data(ticker, config=None):
+    """Transform (process) all raw data for a ticker; each source is processed concurrently."""
+    if config is None:
+        config = ETLConfig()
     
-    return status
+    config.ensure_directories_once()
+    return _run_steps("TRANSFORM", "process", ticker, config, TRANSFORM_STEPS)
 
 
 def load_features(ticker, config=None):
@@ -241,24 +374,24 @@ def load_features(ticker, config=None):
     if config is None:
         config = ETLConfig()
     
-    config.ensure_directories()
+    config.ensure_directories_once()
     status = {
         "ticker": ticker,
         "features": {"success": False, "error": None},
     }
     
     try:
-        print(f"[LOAD] Building features for {ticker}...")
+        logger.info("[LOAD] Building features for %s...", ticker)
         build_features(
             prices_path=str(config.PROCESSED_PRICES_FILE),
             news_path=str(config.PROCESSED_NEWS_FILE),
             output_path=str(config.FEATURES_FILE)
         )
         status["features"]["success"] = True
-        print(f"[LOAD] ✓ Features built for {ticker}")
+        logger.info("[LOAD] ✓ Features built for %s", ticker)
     except Exception as e:
         status["features"]["error"] = str(e)
-        print(f"[LOAD] ✗ Failed to build features for {ticker}: {e}")
+        logger.error("[LOAD] ✗ Failed to build features for %s: %s", ticker, e)
     
     return status
 
@@ -268,32 +401,140 @@ def build_vector_indices(ticker, config=None):
     if config is None:
         config = ETLConfig()
     
-    config.ensure_directories()
+    config.ensure_directories_once()
     status = {
         "ticker": ticker,
         "indices": {"success": False, "error": None},
     }
     
     try:
-        print(f"[INDICES] Building vector indices for {ticker}...")
+        logger.info("[INDICES] Building vector indices for %s...", ticker)
         build_combined_index(config, ticker=ticker)
         status["indices"]["success"] = True
-        print(f"[INDICES] ✓ Vector indices built for {ticker}")
+        logger.info("[INDICES] ✓ Vector indices built for %s", ticker)
+    except Exception as e:
+        status["indices"]["error"] = str(e)
+        logger.error("[INDICES] ✗ Failed to build indices for %s: %s", ticker, e)
+    
+    return status
+
+
+def finalize_indices(config=None):
+    """
+    Build the combined vector index over every ticker's processed documents.
+
+    Batch callers run this once after their run_etl_pipeline calls (which
+    defer indexing by default) instead of re-embedding per ticker.
+    """
+    if config is None:
+        config = ETLConfig()
+    
+    config.ensure_directories_once()
+    status = {"indices": {"success": False, "error": None}}
+    try:
+        logger.info("[INDICES] Building combined vector indices...")
+        build_combined_index(config, ticker=None)
+        status["indices"]["success"] = True
+        logger.info("[INDICES] ✓ Combined vector indices built")
     except Exception as e:
         status["indices"]["error"] = str(e)
-        print(f"[INDICES] ✗ Failed to build indices for {ticker}: {e}")
+        logger.error("[INDICES] ✗ Failed to build combined indices: %s", e)
     
     return status
 
 
-def run_etl_pipeline(ticker, config=None, skip_extract=False, skip_transform=False, skip_load=False):
-    """Run the complete ETL pipeline for a ticker."""
+# One lock per dataset: concurrent pipelines (ETL jobs, run_all workers) share
+# the partitions directory, and whichever waits then finds it up to date
+_partition_locks = {dataset: threading.Lock() for dataset in TICKER_DATASETS}
+
+
+def partition_processed_files(ticker, config=None):
+    """Split the combined processed files into per-ticker partitions for the API."""
     if config is None:
         config = ETLConfig()
     
-    print(f"\n{'='*60}")
-    print(f"Starting ETL pipeline for {ticker}")
-    print(f"{'='*60}\n")
+    config.ensure_directories_once()
+    status = {"ticker": ticker}
+    for dataset, (combined_attr, _, _) in TICKER_DATASETS.items():
+        source = getattr(config, combined_attr)
+        target = config.TICKER_PARTITIONS_DIR / dataset
+        status[dataset] = {"success": False, "error": None}
+        with _partition_locks[dataset]:
+            try:
+                fingerprint = source_fingerprint(source)
+            except FileNotFoundError:
+                status[dataset]["error"] = f"File not found: {source}"
+                continue
+            # Combined files skipped by transform keep their partitions as they are
+            sidecar = partition_fingerprint_path(config, dataset)
+            try:
+                unchanged = target.exists() and sidecar.read_text() == fingerprint
+            except OSError:
+                unchanged = False
+            if unchanged:
+                status[dataset].update(success=True, skipped=True)
+                logger.info("[PARTITION] ✓ %s: unchanged, partitions kept", dataset)
+                continue
+            try:
+                count = partition_by_ticker(
+                    source,
+                    target,
+                    row_group_size=config.PARTITION_ROW_GROUP_SIZE,
+                )
+                sidecar.write_text(fingerprint)
+                status[dataset]["success"] = True
+                logger.info("[PARTITION] ✓ %s: %s ticker partitions", dataset, count)
+            except Exception as e:
+                status[dataset]["error"] = str(e)
+                logger.error("[PARTITION] ✗ Failed to partition %s: %s", dataset, e)
+    
+    return status
+
+
+def build_ticker_cache(ticker, config=None):
+    """Precompute the /api/ticker payloads for a ticker from the loaded parquet files."""
+    if config is None:
+        config = ETLConfig()
+    
+    config.ensure_directories_once()
+    logger.info("[CACHE] Writing API payloads for %s...", ticker)
+    status = {"ticker": ticker}
+    status.update(write_ticker_cache(ticker, config))
+    written = [k for k, v in status.items() if k != "ticker" and v["success"]]
+    logger.info("[CACHE] ✓ Cached %s for %s", ", ".join(written) or "no datasets", ticker)
+    return status
+
+
+def update_etl_state(ticker, config=None):
+    """Refresh the ticker/dataset index read by /api/etl/status."""
+    if config is None:
+        config = ETLConfig()
+    
+    status = {"ticker": ticker, "success": False, "error": None}
+    try:
+        state = write_etl_state(config)
+        status["success"] = True
+        present = [d for d, tickers in state["datasets"].items() if tickers is None or ticker in tickers]
+        logger.info("[STATE] ✓ %s present in %s", ticker, ", ".join(present) or "no datasets")
+    except Exception as e:
+        status["error"] = str(e)
+        logger.error("[STATE] ✗ Failed to update ETL state: %s", e)
+    
+    return status
+
+
+def run_etl_pipeline(ticker, config=None, skip_extract=False, skip_transform=False, skip_load=False, defer_indices=True):
+    """
+    Run the complete ETL pipeline for a ticker.
+
+    With defer_indices (the default) the vector index is not rebuilt; call
+    finalize_indices() once after the batch. defer_indices=False builds the
+    ticker's index as part of the run.
+    """
+    if config is None:
+        config = ETLConfig()
+    
+    logger.info("Starting ETL pipeline for %s", ticker)
     
     results = {
         "ticker": ticker,
@@ -301,6 +542,8 @@ def run_etl_pipeline(ticker, config=None, skip_extract=False, skip_transform=Fal
         "transform": None,
         "load": None,
         "indices": None,
+        "partitions": None,
+        "cache": None,
         "overall_success": False,
     }
     
@@ -308,26 +551,45 @@ def run_etl_pipeline(ticker, config=None, skip_extract=False, skip_transform=Fal
     if not skip_extract:
         results["extract"] = extract_data(ticker, config)
     else:
-        print("[SKIP] Extraction step skipped")
+        logger.info("[SKIP] Extraction step skipped")
         results["extract"] = {"ticker": ticker, "skipped": True}
     
     # Transform
     if not skip_transform:
         results["transform"] = transform_data(ticker, config)
     else:
-        print("[SKIP] Transformation step skipped")
+        logger.info("[SKIP] Transformation step skipped")
         results["transform"] = {"ticker": ticker, "skipped": True}
     
     # Load
     if not skip_load:
         results["load"] = load_features(ticker, config)
-        # Build vector indices after loading features
-        results["indices"] = build_vector_indices(ticker, config)
+        if defer_indices:
+            logger.info("[SKIP] Vector indices deferred to finalize_indices()")
+            results["indices"] = {"ticker": ticker, "deferred": True}
+        else:
+            # Build vector indices after loading features
+            results["indices"] = build_vector_indices(ticker, config)
     else:
-        print("[SKIP] Load step skipped")
+        logger.info("[SKIP] Load step skipped")
         results["load"] = {"ticker": ticker, "skipped": True}
         results["indices"] = {"ticker": ticker, "skipped": True}
     
+    # Re-partition after any step that may have rewritten the combined files,
+    # otherwise the API would keep serving stale partitions
+    if not (skip_transform and skip_load):
+        results["partitions"] = partition_processed_files(ticker, config)
+    else:
+        results["partitions"] = {"ticker": ticker, "skipped": True}
+    
+    # Render API payloads last so they reflect the final parquet files
+    if not skip_load:
+        results["cache"] = build_ticker_cache(ticker, config)
+    else:
+        results["cache"] = {"ticker": ticker, "skipped": True}
+    
+    results["state"] = update_etl_state(ticker, config)
+    
     # Determine overall success
     extract_success = results["extract"] is None or results["extract"].get("skipped") or any(
         v.get("success", False) for k, v in results["extract"].items() if k != "ticker"
@@ -339,18 +601,30 @@ def run_etl_pipeline(ticker, config=None, skip_extract=False, skip_transform=Fal
     
     results["overall_success"] = extract_success and transform_success and load_success
     
-    print(f"\n{'='*60}")
-    print(f"ETL pipeline completed for {ticker}")
-    print(f"Overall success: {results['overall_success']}")
-    print(f"{'='*60}\n")
+    logger.info("ETL pipeline completed for %s (overall success: %s)", ticker, results["overall_success"])
     
     return results
 
 
-if __name__ == "__main__":
-    # Example usage
-    ticker = "AAPL"
-    results = run_etl_pipeline(ticker)
+def main(argv=None):
+    """Command-line entry point: run the pipeline (or just the extract) for tickers."""
+    parser = argparse.ArgumentParser(description="Run the ETL pipeline for one or more tickers.")
+    parser.add_argument("tickers", nargs="*", default=["AAPL"], help="Ticker symbols (default: AAPL)")
+    parser.add_argument("--extract-only", action="store_true",
+                        help="Only fetch raw data, all tickers at once on one bounded pool")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Threads for --extract-only (default: RUN_ALL_WORKERS)")
+    args = parser.parse_args(argv)
+
+    if args.extract_only:
+        results = extract_all(args.tickers, concurrency=args.workers)
+    else:
+        results = {ticker: run_etl_pipeline(ticker) for ticker in args.tickers}
+        results["indices"] = finalize_indices()
     print("\nResults summary:")
     print(results)
+    return results
 
+
+if __name__ == "__main__":
+    main()
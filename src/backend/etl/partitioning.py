@@ -0,0 +1,99 @@
+"""
+Per-ticker partitioning of the combined processed parquet files.
+
+The combined files are written in ingestion order, so every row group holds
+every ticker and min/max statistics can't prune anything. After the ETL run
+each combined file is split into a Hive-style layout:
+
+    {TICKER_PARTITIONS_DIR}/{dataset}/ticker=XYZ/part-0.parquet
+
+so a single-ticker read touches one small file. Unlike
+pyarrow.dataset.write_dataset, the ticker column is kept inside each file, so
+a partition can be read on its own with the original column order.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict
+
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from .config import PARQUET_WRITE_OPTIONS
+
+
+# One lock per target directory, so two swaps into the same place can't
+# interleave their renames
+_swap_locks: Dict[str, threading.Lock] = {}
+_swap_locks_guard = threading.Lock()
+
+
+def ticker_partition_path(partitions_dir: Path, dataset: str, ticker: str) -> Path:
+    """Location of one ticker's partition file for a dataset under TICKER_PARTITIONS_DIR."""
+    return partitions_dir / dataset / f"ticker={ticker}" / "part-0.parquet"
+
+
+def partition_fingerprint_path(config, dataset: str) -> Path:
+    """Sidecar recording which version of the combined file a dataset's partitions were split from."""
+    return config.TICKER_PARTITIONS_DIR / f"{dataset}.fp"
+
+
+def source_fingerprint(source: Path) -> str:
+    """Identity of a combined file's current version (size and mtime); raises if it's missing."""
+    st = source.stat()
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def partition_by_ticker(source: Path, target_dir: Path, row_group_size: int = 131072) -> int:
+    """
+    Split a combined parquet file into one file per ticker under target_dir.
+
+    The new layout is built next to target_dir and swapped in with renames,
+    so readers see either the old or the new partitions, never a mix.
+    Returns the number of partitions written.
+    """
+    table = pq.read_table(source)
+    if "ticker" not in table.column_names:
+        return 0
+    table = table.filter(pc.is_valid(table["ticker"]))
+    # Stable sort keeps each ticker's rows in their original order
+    table = table.take(pc.sort_indices(table, sort_keys=[("ticker", "ascending")]))
+
+    # Unique names, so pipelines partitioning the same dataset never remove or
+    # rename each other's directories
+    target_dir.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(dir=target_dir.parent, prefix=f".{target_dir.name}.", suffix=".tmp"))
+    previous = staging.with_name(staging.name + ".old")
+    try:
+        offset = 0
+        counts = pc.value_counts(table["ticker"])
+        for entry in counts:
+            ticker = entry["values"].as_py()
+            length = entry["counts"].as_py()
+            part = staging / f"ticker={ticker}" / "part-0.parquet"
+            part.parent.mkdir(parents=True, exist_ok=True)
+            pq.write_table(
+                table.slice(offset, length), part, row_group_size=row_group_size, **PARQUET_WRITE_OPTIONS
+            )
+            offset += length
+
+        with _swap_locks_guard:
+            lock = _swap_locks.setdefault(str(target_dir.resolve()), threading.Lock())
+        with lock:
+            if target_dir.exists():
+                os.replace(target_dir, previous)
+            try:
+                os.replace(staging, target_dir)
+            except BaseException:
+                if previous.exists():
+                    os.replace(previous, target_dir)
+                raise
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    if previous.exists():
+        shutil.rmtree(previous, ignore_errors=True)
+    return len(counts)
@@ -3,6 +3,7 @@ from __future__ import annotations
 import argparse
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import List, Dict, Any
 
@@ -11,26 +12,87 @@ _BACKEND_DIR = Path(__file__).resolve().parents[1]  # .../src/backend
 sys.path.insert(0, str(_BACKEND_DIR))
 
 from etl.config import ETLConfig
-from etl.auto_orchestrator import ensure_news, ensure_transcripts, ensure_filings, _load_ticker_universe
+from etl.auto_orchestrator import (
+    DirScans,
+    ensure_news,
+    ensure_transcripts,
+    ensure_filings,
+    _load_ticker_universe,
+    _prescan_sources,
+)
+from ingestion.http_cache import force_refresh
+from processing.process_news import combine_news_files
 from retrieval.index_builder import build_combined_index
 from utils.logger import get_logger
+from utils.throttle import Throttle
 
 logger = get_logger(__name__)
 
 
-def _write_jsonl(path: Path, obj: Dict[str, Any]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(obj, default=str) + "\n")
+class _JsonlWriter:
+    """
+    Appends JSON lines to a file kept open for the whole run.
+
+    Lines are buffered and flushed at most every flush_interval seconds (and
+    on close), so a long run's progress can still be tailed.
+    """
+
+    def __init__(self, path: Path, flush_interval: float = 1.0):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = path.open("a", encoding="utf-8")
+        self._flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+
+    def write(self, obj: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(obj, default=str) + "\n")
+        now = time.monotonic()
+        if now - self._last_flush >= self._flush_interval:
+            self._file.flush()
+            self._last_flush = now
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "_JsonlWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _run_ticker(ticker: str, cfg: ETLConfig, scans: DirScans, throttles: Dict[str, Throttle]) -> Dict[str, Any]:
+    """Fetch+process one ticker's sources; news is combined once after all tickers."""
+    step = {"ticker": ticker, "news": None, "transcripts": None, "filings": None}
+    steps = (
+        ("news", lambda: ensure_news(ticker, cfg, combine=False)),
+        ("transcripts", lambda: ensure_transcripts(ticker, cfg, scans)),
+        ("filings", lambda: ensure_filings(ticker, cfg, scans)),
+    )
+    for source, ensure in steps:
+        # Gentle throttling, per upstream API
+        throttles[source].wait()
+        try:
+            step[source] = ensure()
+        except Exception as exc:
+            step[source] = {"source": source, "ticker": ticker, "error": str(exc)}
+    return step
 
 
 def run_all(
     tickers: List[str],
     sleep_s: float = 0.25,
     progress_path: Path | None = None,
+    workers: int | None = None,
 ) -> Dict[str, Any]:
+    """
+    Fetch and process every ticker, then rebuild the search index once.
+
+    Tickers run concurrently on workers threads (default cfg.RUN_ALL_WORKERS);
+    calls to each upstream source are spaced sleep_s apart across all of them.
+    """
     cfg = ETLConfig()
     cfg.ensure_directories()
+    workers = max(1, workers or cfg.RUN_ALL_WORKERS)
 
     progress_path = progress_path or (cfg.PROCESSED_DIR / "etl_runs" / "run_all_tickers.jsonl")
 
@@ -41,37 +103,32 @@ def run_all(
         "progress_path": str(progress_path),
     }
 
-    for i, t in enumerate(tickers, start=1):
-        ticker = t.upper().strip()
-        if not ticker:
-            continue
-
-        logger.info(f"Processing ticker {i}/{len(tickers)}: {ticker}")
-        step = {"ticker": ticker, "news": None, "transcripts": None, "filings": None}
-
-        # Fetch+process per ticker
-        try:
-            step["news"] = ensure_news(ticker, cfg)
-        except Exception as exc:
-            step["news"] = {"source": "news", "ticker": ticker, "error": str(exc)}
-        try:
-            step["transcripts"] = ensure_transcripts(ticker, cfg)
-        except Exception as exc:
-            step["transcripts"] = {"source": "transcripts", "ticker": ticker, "error": str(exc)}
-        try:
-            step["filings"] = ensure_filings(ticker, cfg)
-        except Exception as exc:
-            step["filings"] = {"source": "filings", "ticker": ticker, "error": str(exc)}
-
-        # Record progress
-        _write_jsonl(progress_path, step)
-        results["tickers_processed"] += 1
-        if any((isinstance(step[k], dict) and step[k].get("error")) for k in ["news", "transcripts", "filings"]):
-            results["errors"] += 1
-
-        # Gentle throttling for upstream APIs
-        if sleep_s:
-            time.sleep(sleep_s)
+    # Each directory is listed once, before any worker starts; a ticker's own
+    # downloads are re-scanned directly inside ensure_*
+    scans: DirScans = _prescan_sources(cfg, {"transcripts", "filings"})
+    throttles = {source: Throttle(sleep_s) for source in ("news", "transcripts", "filings")}
+
+    ordered = list(dict.fromkeys(t.upper().strip() for t in tickers))
+    ordered = [t for t in ordered if t]
+    # Only this thread writes progress; workers hand their results back
+    with _JsonlWriter(progress_path) as progress, \
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix="run-all") as pool:
+        futures = {pool.submit(_run_ticker, ticker, cfg, scans, throttles): ticker for ticker in ordered}
+        for future in as_completed(futures):
+            step = future.result()
+
+            # Record progress (completion order)
+            progress.write(step)
+            results["tickers_processed"] += 1
+            logger.info(f"Processed ticker {results['tickers_processed']}/{len(ordered)}: {step['ticker']}")
+            if any((isinstance(step[k], dict) and step[k].get("error")) for k in ["news", "transcripts", "filings"]):
+                results["errors"] += 1
+
+    # All tickers write the same combined news file: rebuild it once
+    try:
+        combine_news_files(input_dir=str(cfg.RAW_NEWS_DIR), output_path=str(cfg.PROCESSED_NEWS_FILE), config=cfg)
+    except Exception as exc:
+        logger.error(f"Combining news files failed: {exc}")
 
     logger.info("Rebuilding indices (news + filings + transcripts)...")
     build_combined_index(
@@ -86,16 +143,21 @@ def run_all(
 
 def main():
     ap = argparse.ArgumentParser()
-    ap.add_argument("--sleep", type=float, default=0.25, help="sleep seconds between tickers (throttle)")
+    ap.add_argument("--sleep", type=float, default=0.25, help="min seconds between calls to each source (throttle)")
+    ap.add_argument("--workers", type=int, default=0, help="tickers processed concurrently (0 = RUN_ALL_WORKERS)")
     ap.add_argument("--max-tickers", type=int, default=0, help="limit tickers processed (0 = all)")
     ap.add_argument("--progress-path", type=str, default="", help="jsonl progress output path")
+    ap.add_argument("--force-refresh", action="store_true", help="ignore cached HTTP responses")
     args = ap.parse_args()
 
+    if args.force_refresh:
+        force_refresh()
+
     universe = sorted(_load_ticker_universe())
     tickers = universe[: args.max_tickers] if args.max_tickers and args.max_tickers > 0 else universe
     progress_path = Path(args.progress_path) if args.progress_path else None
 
-    out = run_all(tickers=tickers, sleep_s=args.sleep, progress_path=progress_path)
+    out = run_all(tickers=tickers, sleep_s=args.sleep, progress_path=progress_path, workers=args.workers or None)
     logger.info(f"Run completed: {json.dumps(out, indent=2)}")
 
 
@@ -0,0 +1,123 @@
+"""
+ETL state index: which tickers are present in which processed dataset.
+
+Rebuilt at the end of every ETL run by reading only the ticker column of each
+combined file, and written to ``ETL_STATE_FILE`` as a small JSON document so
+/api/etl/status can answer without opening any parquet file:
+
+    {"updated_at": "...", "datasets": {"prices": ["AAPL", ...], ...}}
+
+A dataset whose combined file has no ticker column maps to null, meaning it is
+available for every ticker.
+"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from .config import ETLConfig
+from .ticker_cache import TICKER_DATASETS
+from utils.storage import staging_path
+
+
+def _dataset_tickers(config, dataset: str) -> Optional[list]:
+    """Tickers present in a dataset, or None if it isn't split by ticker."""
+    combined_attr, dir_attr, filename = TICKER_DATASETS[dataset]
+    combined_file = getattr(config, combined_attr)
+    if combined_file.exists():
+        if "ticker" not in pq.read_schema(combined_file).names:
+            return None
+        column = pq.read_table(combined_file, columns=["ticker"])["ticker"]
+        return sorted(t for t in pc.unique(column).to_pylist() if t)
+    if dir_attr is None:
+        return []
+    # Per-ticker files only: recover tickers from the filenames
+    directory = getattr(config, dir_attr)
+    suffix = filename.format(ticker="")
+    return sorted(p.name[: -len(suffix)] for p in directory.glob(f"*{suffix}"))
+
+
+def parquet_contains_ticker(path: Path, ticker: str) -> Optional[bool]:
+    """
+    Whether a parquet file holds any row for ticker; None if it has no ticker column.
+
+    Row groups whose min/max statistics exclude the ticker are skipped, and
+    only the ticker column of the remaining ones is decoded.
+    """
+    parquet = pq.ParquetFile(path, memory_map=True)
+    names = parquet.schema_arrow.names
+    if "ticker" not in names:
+        return None
+    # Leaf index of the ticker column (flat schemas: same as the field index)
+    column_index = parquet.metadata.schema.names.index("ticker")
+    for rg in range(parquet.num_row_groups):
+        stats = parquet.metadata.row_group(rg).column(column_index).statistics
+        if stats is not None and stats.has_min_max and not (stats.min <= ticker <= stats.max):
+            continue
+        column = parquet.read_row_group(rg, columns=["ticker"])["ticker"]
+        if pc.any(pc.equal(column, ticker)).as_py():
+            return True
+    return False
+
+
+def write_etl_state(config=None) -> Dict[str, Any]:
+    """Rebuild the state index from the processed files and write it atomically."""
+    if config is None:
+        config = ETLConfig()
+
+    state = {"updated_at": datetime.now().isoformat(), "datasets": {}}
+    for dataset in TICKER_DATASETS:
+        state["datasets"][dataset] = _dataset_tickers(config, dataset)
+
+    target = config.ETL_STATE_FILE
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = staging_path(target)
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, target)
+    return state
+
+
+def load_etl_state(path: Path) -> Optional[Dict[str, Any]]:
+    """Read the state index, or None if it hasn't been written yet."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def etl_state_is_current(config) -> bool:
+    """
+    Whether the state index is at least as new as every processed dataset.
+
+    Only run_etl_pipeline rewrites the index; run_autonomous, run_all and the
+    agent data tools rewrite the processed files alone, after which the index
+    can miss tickers they added.
+    """
+    try:
+        written = config.ETL_STATE_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        return False
+    for combined_attr, dir_attr, _ in TICKER_DATASETS.values():
+        # A per-ticker directory's mtime moves when a file is added to it
+        for path in (getattr(config, combined_attr), getattr(config, dir_attr) if dir_attr else None):
+            try:
+                if path is not None and path.stat().st_mtime_ns > written:
+                    return False
+            except FileNotFoundError:
+                continue
+    return True
+
+
+def ticker_datasets(state: Dict[str, Any], ticker: str) -> Dict[str, bool]:
+    """Per-dataset presence flags for a ticker from a loaded state index."""
+    return {
+        dataset: tickers is None or ticker in tickers
+        for dataset, tickers in state.get("datasets", {}).items()
+    }
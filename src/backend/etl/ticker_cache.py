@@ -0,0 +1,229 @@
+"""
+Precomputed per-ticker API payloads.
+
+At the end of an ETL run the /api/ticker/{ticker}/* responses are fully
+determined by the processed parquet files, so they are rendered once here and
+written as gzip-compressed JSON under ``TICKER_CACHE_DIR/{ticker}/``. The API
+serves these files directly while they are newer than their source parquet.
+"""
+
+import functools
+import gzip
+import os
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+
+from .config import ETLConfig
+from .partitioning import partition_fingerprint_path, source_fingerprint, ticker_partition_path
+from utils.serialization import clean_dataframe_for_json, dumps_json
+from utils.storage import staging_path
+
+# dataset -> (combined file attribute, per-ticker directory attribute, per-ticker filename)
+TICKER_DATASETS = {
+    "features": ("FEATURES_FILE", None, None),
+    "prices": ("PROCESSED_PRICES_FILE", "PROCESSED_PRICES_DIR", "{ticker}.parquet"),
+    "news": ("PROCESSED_NEWS_FILE", "PROCESSED_NEWS_DIR", "{ticker}_news.parquet"),
+    "fundamentals": ("PROCESSED_FUNDAMENTALS_FILE", "PROCESSED_FUNDAMENTALS_DIR", "{ticker}_fundamentals.parquet"),
+}
+
+# Columns never included in /api/ticker responses (too large)
+EXCLUDED_COLUMNS = {"news": ["embedding"]}
+
+# Columns served as float32 instead of float64, by dataset. Only unitless
+# ratios and scores, where ~7 significant digits is plenty; price levels and
+# volumes stay float64 (float32 drops the cents above ~131k, e.g. BRK.A).
+# The list is fixed so a column's type never depends on which rows were read.
+FLOAT32_COLUMNS = {
+    "features": ("returns_1d", "momentum_5d", "volatility_20d", "sentiment"),
+}
+
+# Keep ticker dictionary-encoded on read instead of materializing one Python
+# string per row; the filter compares against the dictionary. pre_buffer
+# coalesces the many small column-chunk reads into a few large ones.
+TICKER_PARQUET_FORMAT = ds.ParquetFileFormat(
+    read_options={"dictionary_columns": ["ticker"]},
+    default_fragment_scan_options=ds.ParquetFragmentScanOptions(pre_buffer=True),
+)
+
+# Memory-map local files so repeat reads are served from the page cache,
+# shared across API workers, instead of copied through read() calls
+TICKER_FILESYSTEM = pafs.LocalFileSystem(use_mmap=True)
+
+
+def _open_dataset(source: Path, schema: Optional[pa.Schema] = None) -> ds.Dataset:
+    return ds.dataset(
+        str(Path(source).resolve()), format=TICKER_PARQUET_FORMAT, filesystem=TICKER_FILESYSTEM, schema=schema
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def _ticker_source_paths(
+    partitions_dir: Path, per_ticker_dir: Optional[Path], dataset: str, ticker: str
+) -> Tuple[Path, Optional[Path]]:
+    """(partition, per-ticker file) paths, built once per directory layout and ticker."""
+    filename = TICKER_DATASETS[dataset][2]
+    per_ticker = per_ticker_dir / filename.format(ticker=ticker) if per_ticker_dir else None
+    return ticker_partition_path(partitions_dir, dataset, ticker), per_ticker
+
+
+def _ticker_source_candidates(config, dataset: str, ticker: str) -> Tuple[Path, Path, Optional[Path]]:
+    """(partition, combined file, per-ticker file) paths for the config's current settings."""
+    combined_attr, dir_attr, _ = TICKER_DATASETS[dataset]
+    per_ticker_dir = getattr(config, dir_attr) if dir_attr else None
+    partition, per_ticker = _ticker_source_paths(config.TICKER_PARTITIONS_DIR, per_ticker_dir, dataset, ticker)
+    return partition, getattr(config, combined_attr), per_ticker
+
+
+@functools.lru_cache(maxsize=16)
+def _read_fingerprint(path_str: str, mtime_ns: int) -> str:
+    return Path(path_str).read_text()
+
+
+def partitions_current(config, dataset: str) -> bool:
+    """
+    Whether a dataset's partitions were split from its current combined file.
+
+    Only run_etl_pipeline re-partitions; other pipelines (run_autonomous,
+    run_all, the agent data tools) rewrite the combined files alone, which
+    leaves the partitions stale until the next full run.
+    """
+    combined_file = getattr(config, TICKER_DATASETS[dataset][0])
+    try:
+        fingerprint = source_fingerprint(combined_file)
+    except FileNotFoundError:
+        return True  # nothing newer to fall back to
+    sidecar = partition_fingerprint_path(config, dataset)
+    try:
+        return _read_fingerprint(str(sidecar), sidecar.stat().st_mtime_ns) == fingerprint
+    except FileNotFoundError:
+        return False
+
+
+def resolve_ticker_source(
+    config, dataset: str, ticker: str, exists: Callable[[Path], bool] = Path.exists
+) -> Tuple[Path, bool]:
+    """
+    Return (parquet path, is_combined) backing a ticker dataset.
+
+    Preference order: the ticker's partition of the combined file (unless
+    the combined file has changed since it was partitioned), the combined
+    multi-ticker file, then the per-ticker file. exists lets callers
+    substitute a cached check.
+    """
+    partition, combined_file, per_ticker = _ticker_source_candidates(config, dataset, ticker)
+    if exists(partition) and partitions_current(config, dataset):
+        return partition, False
+    if per_ticker is None or exists(combined_file):
+        return combined_file, True
+    return per_ticker, False
+
+
+@functools.lru_cache(maxsize=64)
+def _read_schema(path_str: str, mtime_ns: int) -> pa.Schema:
+    return _open_dataset(Path(path_str)).schema
+
+
+def ticker_table_schema(source: Path) -> pa.Schema:
+    """
+    Read schema of a dataset file (ticker dictionary-encoded), inspected once
+    per file version instead of on every read.
+    """
+    return _read_schema(str(source), source.stat().st_mtime_ns)
+
+
+def read_ticker_table(dataset: str, source: Path, ticker: Optional[str] = None) -> pa.Table:
+    """
+    Read a dataset file with filter and projection pushdown.
+
+    With a ticker, only that ticker's rows are returned (files without a
+    ticker column are returned whole); without one, all rows are read.
+
+    Only row groups that can contain the ticker are decoded, and excluded
+    columns (e.g. news embeddings) are never read. ticker comes back
+    dictionary-encoded (a pandas Categorical after to_pandas()), and the
+    dataset's FLOAT32_COLUMNS come back as float32.
+    """
+    schema = ticker_table_schema(source)
+    names = schema.names
+    excluded = EXCLUDED_COLUMNS.get(dataset, [])
+    columns = [name for name in names if name not in excluded]
+    # A known schema skips fragment inspection when the dataset is opened
+    parquet = _open_dataset(source, schema=schema)
+    row_filter = ds.field("ticker") == ticker if ticker and "ticker" in names else None
+    table = parquet.to_table(columns=columns, filter=row_filter)
+    return downcast_floats(table, FLOAT32_COLUMNS.get(dataset, ()))
+
+
+def downcast_floats(table: pa.Table, columns) -> pa.Table:
+    """Cast the named float64 columns of table to float32; others are left alone."""
+    for name in columns:
+        i = table.schema.get_field_index(name)
+        if i < 0:
+            continue
+        field = table.schema.field(i)
+        if pa.types.is_float64(field.type):
+            table = table.set_column(i, field.with_type(pa.float32()), pc.cast(table.column(i), pa.float32()))
+    return table
+
+
+def ticker_cache_path(config, dataset: str, ticker: str) -> Path:
+    """Location of the precomputed gzip JSON payload for a ticker dataset."""
+    return config.TICKER_CACHE_DIR / ticker / f"{dataset}.json.gz"
+
+
+def build_ticker_payload(ticker: str, df: pd.DataFrame) -> dict:
+    """The {"ticker", "count", "data"} body shared by every /api/ticker endpoint."""
+    return {
+        "ticker": ticker,
+        "count": len(df),
+        "data": clean_dataframe_for_json(df),
+    }
+
+
+def render_ticker_payload(ticker: str, df: pd.DataFrame) -> bytes:
+    """Encode a ticker response body; the API serves these exact bytes."""
+    return dumps_json(build_ticker_payload(ticker, df))
+
+
+def write_ticker_cache(ticker: str, config=None) -> Dict[str, Dict]:
+    """Render and write cached payloads for every ticker dataset."""
+    if config is None:
+        config = ETLConfig()
+
+    ticker = ticker.upper()
+    status = {}
+    for dataset in TICKER_DATASETS:
+        status[dataset] = {"success": False, "error": None}
+        try:
+            source, combined = resolve_ticker_source(config, dataset, ticker)
+            try:
+                table = read_ticker_table(dataset, source, ticker if combined else None)
+            except FileNotFoundError:
+                status[dataset]["error"] = f"File not found: {source}"
+                continue
+
+            # The table isn't reused, so let pandas take over its buffers
+            df = table.to_pandas(self_destruct=True, split_blocks=True)
+            del table
+            if df.empty:
+                status[dataset]["error"] = f"No {dataset} found for ticker {ticker}"
+                continue
+
+            target = ticker_cache_path(config, dataset, ticker)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = staging_path(target)
+            with gzip.open(tmp, "wb", compresslevel=6) as f:
+                f.write(render_ticker_payload(ticker, df))
+            # Atomic swap so the API never serves a half-written file
+            os.replace(tmp, target)
+            status[dataset]["success"] = True
+        except Exception as e:
+            status[dataset]["error"] = str(e)
+
+    return status
@@ -2,17 +2,19 @@
 Download actual SEC filing text files (not just metadata).
 """
 
-import requests
+import itertools
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional
-
-from secedgar.cik_lookup import CIKLookup
+from typing import Iterator, List, Optional, Tuple
 
 from etl.config import ETLConfig
-from ingestion.fetch_filings import fetch_filings
+from ingestion.fetch_filings import download_filing, fetch_filings, lookup_cik
 
 
-USER_AGENT = "DocETL/1.0 (contact: dli2004@seas.upenn.edu)"
+# Concurrent document downloads per ticker; download_filing keeps every SEC
+# request within 10 per second whatever the number of workers
+DOWNLOAD_WORKERS = 4
 
 
 def _build_filing_url(cik: str, accession: str, primary_document: str) -> str:
@@ -20,12 +22,11 @@ def _build_filing_url(cik: str, accession: str, primary_document: str) -> str:
     return f"https://www.sec.gov/Archives/edgar/data/{cik}/{accession_clean}/{primary_document}"
 
 
-def _download_text(url: str, save_path: Path) -> None:
-    resp = requests.get(url, headers={"User-Agent": USER_AGENT})
-    resp.raise_for_status()
-    save_path.parent.mkdir(parents=True, exist_ok=True)
-    # Some filings are HTML; keep raw bytes but save as text for downstream parsing
-    save_path.write_bytes(resp.content)
+def _already_downloaded(path: Path) -> bool:
+    try:
+        return path.stat().st_size > 0
+    except OSError:
+        return False
 
 
 def download_recent_filing_documents(
@@ -33,10 +34,16 @@ def download_recent_filing_documents(
     filing_types: Optional[List[str]] = None,
     max_filings: int = 4,
     save_dir: Optional[Path] = None,
+    max_workers: int = DOWNLOAD_WORKERS,
 ) -> List[Path]:
     """
     Download recent filing documents (10-K/10-Q by default) as raw text/html files.
 
+    Up to max_filings of each type are downloaded concurrently over one
+    keep-alive session; a failed download is replaced by the next most
+    recent filing of that type, as in a sequential pass. Documents already
+    on disk are kept and returned without a request.
+
     Returns a list of saved file paths.
     """
     cfg = ETLConfig()
@@ -54,33 +61,57 @@ def download_recent_filing_documents(
     primary_docs = recent.get("primaryDocument", [])
     accessions = recent.get("accessionNumber", [])
 
-    cik = str(CIKLookup(lookups=[ticker], user_agent=USER_AGENT).lookup_dict[ticker]).zfill(10)
+    cik = lookup_cik(ticker)
+
+    def form_candidates(form_type: str, indices) -> Iterator[Tuple[int, str, str, Path]]:
+        """Downloads for one form type, most recent first, built as they are needed."""
+        for idx in indices.tolist():
+            accession = accessions[idx] if idx < len(accessions) else ""
+            if not accession:
+                continue
+            filing_date = filing_dates[idx] if idx < len(filing_dates) else ""
+            primary_doc = primary_docs[idx] if idx < len(primary_docs) else f"{form_type.lower()}.txt"
+            url = _build_filing_url(cik, accession, primary_doc)
+            filename = f"{ticker}_{form_type}_{filing_date or idx}.txt"
+            yield idx, filing_date, url, save_dir / filename
+
+    # Positions of each wanted form type in one vectorized pass over the index
+    forms_a = np.asarray(forms, dtype=str)
+    candidates = {ft: form_candidates(ft, np.flatnonzero(forms_a == ft)) for ft in filing_types}
+
     counts = {ft: 0 for ft in filing_types}
-    downloaded: List[Path] = []
-
-    for idx, form_type in enumerate(forms):
-        if form_type not in filing_types:
-            continue
-        if counts[form_type] >= max_filings:
-            continue
-
-        filing_date = filing_dates[idx] if idx < len(filing_dates) else ""
-        accession = accessions[idx] if idx < len(accessions) else ""
-        primary_doc = primary_docs[idx] if idx < len(primary_docs) else f"{form_type.lower()}.txt"
-
-        if not accession:
-            continue
-
-        url = _build_filing_url(cik, accession, primary_doc)
-        filename = f"{ticker}_{form_type}_{filing_date or idx}.txt"
-        filepath = save_dir / filename
-
-        try:
-            _download_text(url, filepath)
-            counts[form_type] += 1
-            downloaded.append(filepath)
-            print(f"[FILINGS] Downloaded {form_type} ({filing_date}) -> {filepath.name}")
-        except Exception as exc:
-            print(f"[FILINGS] Failed {form_type} ({filing_date}): {exc}")
-
-    return downloaded
+    done: List[Tuple[int, Path]] = []
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="filings") as pool:
+        while True:
+            # Fill every type's remaining slots from its next candidates
+            batch = []
+            for form_type, queue in candidates.items():
+                needed = max_filings - counts[form_type]
+                batch += [(form_type, c) for c in itertools.islice(queue, needed)]
+            if not batch:
+                break
+            futures = []
+            for form_type, candidate in batch:
+                idx, filing_date, url, filepath = candidate
+                if _already_downloaded(filepath):
+                    # Archived filings never change: keep the local copy
+                    counts[form_type] += 1
+                    done.append((idx, filepath))
+                    print(f"[FILINGS] Already have {form_type} ({filing_date}) -> {filepath.name}")
+                    continue
+                # Some filings are HTML; the raw bytes are saved as .txt for downstream parsing
+                futures.append((form_type, candidate, pool.submit(download_filing, url, filepath)))
+            for form_type, (idx, filing_date, _, filepath), future in futures:
+                try:
+                    future.result()
+                    counts[form_type] += 1
+                    done.append((idx, filepath))
+                    print(f"[FILINGS] Downloaded {form_type} ({filing_date}) -> {filepath.name}")
+                except Exception as exc:
+                    print(f"[FILINGS] Failed {form_type} ({filing_date}): {exc}")
+
+    # Same order as the filing index
+    return [filepath for _, filepath in sorted(done, key=lambda item: item[0])]
+
+
+__all__ = ["download_recent_filing_documents"]
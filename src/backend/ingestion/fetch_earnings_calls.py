@@ -1,18 +1,117 @@
 import os
 from datetime import datetime
 import pandas as pd
+import pyarrow as pa
 import requests
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 
-def download_transcripts(ticker: str, max_transcripts: Optional[int] = None, save_dir: str = "data/raw/earnings_calls", api_key: Optional[str] = None) -> List[Dict[str, Any]]:
+from ingestion.http_cache import cached_get
+from ingestion.http_session import make_session
+
+# Concurrent quarter probes per ticker
+PROBE_WORKERS = 4
+BASE_URL = "https://api.api-ninjas.com/v1/earningstranscript"
+
+# Transcripts are saved as {TICKER}_Q{q}_{year}.txt.zst; processing reads
+# them back with process_transcripts.read_transcript_text
+TRANSCRIPT_CODEC = pa.Codec("zstd", compression_level=3)
+
+_session = make_session()
+
+
+def _transcript_text(transcript_data: Dict[str, Any]) -> Optional[str]:
+    # Try multiple possible field names for transcript content
+    return (
+        transcript_data.get('transcript') or 
+        transcript_data.get('content') or 
+        transcript_data.get('text') or
+        transcript_data.get('body')
+    )
+
+
+def _write_transcript(filepath: str, transcript_text: str, year, quarter) -> None:
+    with open(filepath, "wb") as f:
+        f.write(TRANSCRIPT_CODEC.compress(transcript_text.encode("utf-8"), asbytes=True))
+    # An uncompressed copy saved before would otherwise be processed as well
+    try:
+        os.remove(filepath[:-len(".zst")])
+    except FileNotFoundError:
+        pass
+    
+    print(f"* Q{quarter} {year} -- saved ({len(transcript_text)} chars)")
+
+
+def _transcript_path(ticker: str, year, quarter, save_dir: str) -> str:
+    return os.path.join(save_dir, f"{ticker}_Q{quarter}_{year}.txt.zst")
+
+
+def _saved_transcript(ticker: str, year, quarter, save_dir: str) -> Optional[str]:
+    """Path of a non-empty transcript already saved for the quarter (compressed or plain)."""
+    path = _transcript_path(ticker, year, quarter, save_dir)
+    for candidate in (path, path[:-len(".zst")]):
+        try:
+            if os.path.getsize(candidate) > 0:
+                return candidate
+        except OSError:
+            pass
+    return None
+
+
+def _transcript_record(ticker: str, year, quarter, date_str, text_length: Optional[int], filepath: str) -> Dict[str, Any]:
+    return {
+        "ticker": ticker,
+        "quarter": quarter,
+        "year": year,
+        "conference_date": date_str,
+        "filepath": filepath,
+        "filename": os.path.basename(filepath),
+        "text_length": text_length
+    }
+
+
+def _probe(params: Dict[str, Any], headers: Dict[str, str], session: requests.Session) -> Any:
+    response = cached_get(BASE_URL, params=params, headers=headers, timeout=30, session=session)
+    response.raise_for_status()
+    return response.json()
+
+
+def _quarters_to_try(now: datetime) -> List[Tuple[int, int]]:
+    """Quarters going back up to 8 quarters (2 years), most recent first."""
+    current_year = now.year
+    current_quarter = (now.month - 1) // 3 + 1
+    quarters_to_try = []
+    for year_offset in range(2):  # Last 2 years
+        for q in range(4, 0, -1):  # Q4 to Q1
+            year = current_year - year_offset
+            # Adjust for current quarter
+            if year == current_year and q > current_quarter:
+                continue
+            quarters_to_try.append((year, q))
+    return quarters_to_try
+
+
+def download_transcripts(ticker: str, max_transcripts: Optional[int] = None, save_dir: str = "data/raw/earnings_calls", api_key: Optional[str] = None, force_refresh: bool = False) -> List[Dict[str, Any]]:
     """
     Download earnings call transcripts for a given ticker using API Ninjas API.
     
+    API Ninjas has no list endpoint, so the latest transcript (no params) and
+    recent quarters are probed. Probes run concurrently in waves sized to the
+    transcripts still needed; results are applied in the same order as a
+    sequential pass (latest first, then quarters newest to oldest). Files
+    are written on a background thread while later probes are awaited.
+    
+    Quarters already saved in save_dir are not requested again and their
+    files are not rewritten (their metadata has no conference date or text
+    length); the latest-transcript probe always runs, since which quarter
+    it returns isn't known in advance.
+    
     Args:
         ticker: Stock ticker symbol
         max_transcripts: Maximum number of transcripts to download
         save_dir: Directory to save transcript files
         api_key: API Ninjas API key (if None, will try to get from environment)
+        force_refresh: Request and rewrite quarters that are already saved
     
     Returns:
         List of metadata dictionaries for downloaded transcripts
@@ -28,166 +127,112 @@ def download_transcripts(ticker: str, max_transcripts: Optional[int] = None, sav
         raise ValueError("API_NINJAS_API_KEY is required. Set it as an environment variable or pass it as a parameter.")
     
     downloaded = []
-    
-    # API Ninjas API base URL
-    base_url = "https://api.api-ninjas.com/v1/earningstranscript"
-    
-    # API Ninjas doesn't have a list endpoint, so we'll try to fetch recent transcripts
-    # by iterating through recent quarters. We'll start with the latest (no params) and
-    # then try recent quarters going back.
-    
-    current_year = datetime.now().year
-    current_quarter = (datetime.now().month - 1) // 3 + 1
+    # Set to track which transcripts we've already downloaded (by year-quarter)
+    downloaded_quarters = set()
     
     # Headers for API Ninjas
     headers = {
         "X-Api-Key": api_key
     }
     
-    # Set to track which transcripts we've already downloaded (by year-quarter)
-    downloaded_quarters = set()
-    
-    # First, try to get the latest transcript (no year/quarter specified)
-    try:
-        response = requests.get(
-            base_url,
-            params={"ticker": ticker.upper()},
-            headers=headers,
-            timeout=30
-        )
-        response.raise_for_status()
-        transcript_data = response.json()
-        
-        # API Ninjas returns a single transcript object
-        # Handle different possible response formats
-        transcript_text = None
-        year = None
-        quarter = None
-        date_str = None
-        
-        if isinstance(transcript_data, dict) and transcript_data.get('ticker'):
-            year = transcript_data.get('year')
-            quarter = transcript_data.get('quarter')
-            date_str = transcript_data.get('date')
+    def remaining() -> int:
+        return len(quarters) if max_transcripts is None else max_transcripts - len(downloaded)
+    
+    writes = []
+    
+    def saved(year, quarter) -> Optional[str]:
+        return None if force_refresh else _saved_transcript(ticker, year, quarter, save_dir)
+    
+    def save(year, quarter, date_str, transcript_text: str) -> None:
+        filepath = saved(year, quarter)
+        if filepath is None:
+            filepath = _transcript_path(ticker, year, quarter, save_dir)
+            writes.append(writer.submit(_write_transcript, filepath, transcript_text, year, quarter))
+        downloaded.append(_transcript_record(ticker, year, quarter, date_str, len(transcript_text), filepath))
+        downloaded_quarters.add((year, quarter))
+    
+    quarters = _quarters_to_try(datetime.now())
+    latest_pending = True
+    with ThreadPoolExecutor(max_workers=PROBE_WORKERS, thread_name_prefix="transcripts") as pool, \
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="transcript-writer") as writer:
+        while latest_pending or (quarters and remaining() > 0):
+            # Latest first, then as many quarter probes as transcripts are still needed
+            wave = [(None, None)] if latest_pending else []
+            wave += [q for q in quarters[:max(remaining(), 0)] if q not in downloaded_quarters]
+            del quarters[:max(remaining(), 0)]
+            latest_pending = False
+            futures = []
+            for year, quarter in wave:
+                filepath = saved(year, quarter) if year is not None else None
+                if filepath is not None:
+                    futures.append((year, quarter, filepath))
+                    continue
+                params = {"ticker": ticker.upper()}
+                if year is not None:
+                    params.update(year=year, quarter=quarter)
+                futures.append((year, quarter, pool.submit(_probe, params, headers, _session)))
             
-            # Try multiple possible field names for transcript content
-            transcript_text = (
-                transcript_data.get('transcript') or 
-                transcript_data.get('content') or 
-                transcript_data.get('text') or
-                transcript_data.get('body')
-            )
-        
-        if year and quarter and transcript_text:
-            quarter_key = (year, quarter)
-            if quarter_key not in downloaded_quarters:
-                filename = f"{ticker}_Q{quarter}_{year}.txt"
-                filepath = os.path.join(save_dir, filename)
-                
-                with open(filepath, "w", encoding="utf-8") as f:
-                    f.write(transcript_text)
+            for year, quarter, future in futures:
+                if max_transcripts and len(downloaded) >= max_transcripts:
+                    break
+                if year is None:
+                    # The latest transcript: year/quarter come from the response
+                    try:
+                        transcript_data = future.result()
+                    except requests.exceptions.RequestException as e:
+                        print(f"Error fetching latest transcript for {ticker}: {e}")
+                        if hasattr(e, 'response') and e.response is not None:
+                            print(f"Response status: {e.response.status_code}")
+                            print(f"Response body: {e.response.text[:500]}")
+                        continue
+                    if isinstance(transcript_data, dict) and transcript_data.get('ticker'):
+                        latest_year = transcript_data.get('year')
+                        latest_quarter = transcript_data.get('quarter')
+                        transcript_text = _transcript_text(transcript_data)
+                        if latest_year and latest_quarter and transcript_text:
+                            save(latest_year, latest_quarter, transcript_data.get('date'), transcript_text)
+                    continue
                 
-                metadata = {
-                    "ticker": ticker,
-                    "quarter": quarter,
-                    "year": year,
-                    "conference_date": date_str,
-                    "filepath": filepath,
-                    "filename": filename,
-                    "text_length": len(transcript_text)
-                }
-                downloaded.append(metadata)
-                downloaded_quarters.add(quarter_key)
-                print(f"* Q{quarter} {year} -- saved ({len(transcript_text)} chars)")
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching latest transcript for {ticker}: {e}")
-        if hasattr(e, 'response') and e.response is not None:
-            print(f"Response status: {e.response.status_code}")
-            print(f"Response body: {e.response.text[:500]}")
-    
-    # If we need more transcripts, try recent quarters going back
-    if max_transcripts is None or len(downloaded) < max_transcripts:
-        # Try quarters going back up to 8 quarters (2 years)
-        quarters_to_try = []
-        for year_offset in range(2):  # Last 2 years
-            for q in range(4, 0, -1):  # Q4 to Q1
-                year = current_year - year_offset
-                # Adjust for current quarter
-                if year == current_year and q > current_quarter:
+                if (year, quarter) in downloaded_quarters:
+                    continue
+                if isinstance(future, str):
+                    # Saved on an earlier run
+                    downloaded.append(_transcript_record(ticker, year, quarter, None, None, future))
+                    downloaded_quarters.add((year, quarter))
+                    print(f"* Q{quarter} {year} -- already saved")
+                    continue
+                try:
+                    transcript_data = future.result()
+                except requests.exceptions.RequestException:
+                    # Silently skip if request fails (might be premium-only or not available)
                     continue
-                quarters_to_try.append((year, q))
-        
-        for year, quarter in quarters_to_try:
-            if max_transcripts and len(downloaded) >= max_transcripts:
-                break
-            
-            if (year, quarter) in downloaded_quarters:
-                continue
-            
-            try:
-                response = requests.get(
-                    base_url,
-                    params={
-                        "ticker": ticker.upper(),
-                        "year": year,
-                        "quarter": quarter
-                    },
-                    headers=headers,
-                    timeout=30
-                )
-                response.raise_for_status()
-                transcript_data = response.json()
                 
                 # Handle error responses and different response formats
                 transcript_text = None
                 date_str = None
-                
                 if isinstance(transcript_data, dict):
                     if "error" in transcript_data or "Error" in transcript_data:
                         # Skip if error (might be premium-only feature or no transcript available)
                         continue
-                    
                     if transcript_data.get('ticker'):
                         date_str = transcript_data.get('date')
-                        # Try multiple possible field names for transcript content
-                        transcript_text = (
-                            transcript_data.get('transcript') or 
-                            transcript_data.get('content') or 
-                            transcript_data.get('text') or
-                            transcript_data.get('body')
-                        )
+                        transcript_text = _transcript_text(transcript_data)
                 
-                if transcript_text and year and quarter:
-                    filename = f"{ticker}_Q{quarter}_{year}.txt"
-                    filepath = os.path.join(save_dir, filename)
-                    
-                    with open(filepath, "w", encoding="utf-8") as f:
-                        f.write(transcript_text)
-                    
-                    metadata = {
-                        "ticker": ticker,
-                        "quarter": quarter,
-                        "year": year,
-                        "conference_date": date_str,
-                        "filepath": filepath,
-                        "filename": filename,
-                        "text_length": len(transcript_text)
-                    }
-                    downloaded.append(metadata)
-                    downloaded_quarters.add((year, quarter))
-                    print(f"* Q{quarter} {year} -- saved ({len(transcript_text)} chars)")
-                elif year and quarter:
+                if transcript_text:
+                    save(year, quarter, date_str, transcript_text)
+                else:
                     print(f"* Q{quarter} {year} -- No transcript content found")
-            except requests.exceptions.RequestException as e:
-                # Silently skip if request fails (might be premium-only or not available)
-                continue
+    
+    # Surface any failed write
+    for write in writes:
+        write.result()
     
     if not downloaded:
         print(f"No transcripts available for {ticker}")
     
     return downloaded
 
-def download_transcripts_to_dataframe(ticker: str, max_transcripts: Optional[int] = None, save_dir: str = "data/raw/earnings_calls", api_key: Optional[str] = None) -> pd.DataFrame:
+def download_transcripts_to_dataframe(ticker: str, max_transcripts: Optional[int] = None, save_dir: str = "data/raw/earnings_calls", api_key: Optional[str] = None, force_refresh: bool = False) -> pd.DataFrame:
     """
     Download transcripts and return as a DataFrame.
     
@@ -196,11 +241,12 @@ def download_transcripts_to_dataframe(ticker: str, max_transcripts: Optional[int
         max_transcripts: Maximum number of transcripts to download
         save_dir: Directory to save transcript files
         api_key: API Ninjas API key (if None, will try to get from environment)
+        force_refresh: Request and rewrite quarters that are already saved
     
     Returns:
         DataFrame with transcript metadata
     """
-    downloaded = download_transcripts(ticker, max_transcripts, save_dir, api_key)
+    downloaded = download_transcripts(ticker, max_transcripts, save_dir, api_key, force_refresh)
     if downloaded:
         return pd.DataFrame(downloaded)
     return pd.DataFrame()
@@ -1,9 +1,20 @@
+import functools
+import orjson
 import requests
 import pandas as pd
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, List, Tuple
 from dotenv import load_dotenv
 from secedgar.cik_lookup import CIKLookup
 
+from etl.config import ETLConfig
+from ingestion.http_cache import cached_download, cached_get
+from ingestion.http_session import make_session
+from utils.throttle import Throttle
+
 try:
     # In some sandboxed environments `.env` may be unreadable or absent; treat it as optional.
     load_dotenv()
@@ -11,10 +22,85 @@ except Exception:
     pass
 
 API_KEY = os.getenv("AV_API_KEY")
+SEC_USER_AGENT = "Daniel Li dli2004@seas.upenn.edu"
+CIK_MAP_URL = "https://www.sec.gov/files/company_tickers.json"
+# SEC fair-access policy: at most 10 requests per second
+SEC_MAX_REQUESTS_PER_SECOND = 10
+SEC_DOWNLOAD_WORKERS = 8
+# CIKs found by secedgar for tickers missing from the SEC table
+CIK_CACHE_FILE = ETLConfig.HTTP_CACHE_DIR / "edgar_cik.json"
+# Submissions columns kept by filings_to_dataframe (SEC sends ~15 more)
+FILING_COLUMNS = ("form", "filingDate", "reportDate", "accessionNumber", "primaryDocument")
+# YYYY-MM-DD columns parsed to datetimes; blanks (e.g. no report date) become NaT
+FILING_DATE_COLUMNS = ("filingDate", "reportDate")
+
+# Shared by every SEC request (here and in ingestion.download_filings), so
+# connections are reused and every request is spaced to SEC's rate limit
+_sec_throttle = Throttle(1 / SEC_MAX_REQUESTS_PER_SECOND)
+_sec_session = make_session(headers={"User-Agent": SEC_USER_AGENT}, throttle=_sec_throttle)
+_av_session = make_session()
+_cik_cache_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1)
+def _cik_map():
+    """SEC's ticker -> CIK table, fetched once per process (and cached on disk)."""
+    r = cached_get(CIK_MAP_URL, session=_sec_session)
+    r.raise_for_status()
+    return {entry["ticker"].upper(): entry["cik_str"] for entry in r.json().values()}
+
+
+def _read_cik_cache():
+    try:
+        return orjson.loads(CIK_CACHE_FILE.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return {}
+
+
+def _fallback_cik(ticker):
+    """secedgar's per-ticker lookup, with results kept in CIK_CACHE_FILE across runs."""
+    with _cik_cache_lock:
+        cik = _read_cik_cache().get(ticker)
+    if cik is not None:
+        return cik
+    cik = CIKLookup(lookups=[ticker], user_agent=SEC_USER_AGENT).lookup_dict[ticker]
+    with _cik_cache_lock:
+        cached = _read_cik_cache()
+        cached[ticker] = cik
+        CIK_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = CIK_CACHE_FILE.with_name(f".{CIK_CACHE_FILE.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(orjson.dumps(cached))
+        os.replace(tmp, CIK_CACHE_FILE)
+    return cik
+
+
+@functools.lru_cache(maxsize=None)
+def _resolve_cik(ticker):
+    try:
+        cik = _cik_map().get(ticker)
+    except (requests.RequestException, ValueError) as e:
+        print(f"[FILINGS] Could not load SEC ticker table: {e}")
+        cik = None
+    if cik is None:
+        cik = _fallback_cik(ticker)
+    # pad cik to 10 digits with leading zeros
+    return str(cik).zfill(10)
+
+
+def lookup_cik(ticker):
+    """
+    Return a ticker's CIK as a 10-digit string, resolved once per process.
+
+    Tickers missing from the SEC table fall back to secedgar's per-ticker
+    lookup, whose answers are also saved on disk; a failed lookup is not
+    cached, so the next call retries.
+    """
+    return _resolve_cik(ticker.upper())
+
 
 def fetch_fundamentals(ticker):
     url = f"https://www.alphavantage.co/query?function=INCOME_STATEMENT&symbol={ticker}&apikey={API_KEY}"
-    r = requests.get(url)
+    r = cached_get(url, session=_av_session)
     data = r.json()
     return data
 
@@ -26,32 +112,58 @@ def fetch_filings(ticker):
     The 'filings' property contains 'recent' (most recent filings) and 
     'files' (references to additional JSON files if more than 1000 filings).
     """
-    cik = CIKLookup(lookups=[ticker], user_agent="Daniel Li dli2004@seas.upenn.edu").lookup_dict[ticker]
-    # pad cik to 10 digits with leading zeros
-    cik = str(cik).zfill(10)
+    cik = lookup_cik(ticker)
     url = f"https://data.sec.gov/submissions/CIK{cik}.json"
-    r = requests.get(url, headers={"User-Agent": "Daniel Li dli2004@seas.upenn.edu"})
+    r = cached_get(url, session=_sec_session)
     r.raise_for_status()  # Raise an exception for bad status codes
     data = r.json()
     return data
 
-def filings_to_dataframe(filings_data):
+def filings_to_dataframe(filings_data, columns=FILING_COLUMNS):
     """
     Convert the 'recent' filings from the SEC JSON response to a pandas DataFrame.
     
     The filings are stored in a columnar format where each key is a column name
-    and the value is an array of values for that column.
+    and the value is an array of values for that column. Only the given
+    columns (all of them when columns is None) are built, and the date
+    columns among them are parsed.
     """
     if "filings" not in filings_data or "recent" not in filings_data["filings"]:
         return pd.DataFrame()
     
     recent = filings_data["filings"]["recent"]
-    # Convert columnar format to DataFrame
+    if columns is not None:
+        # Select before construction so unused columns are never converted
+        recent = {key: recent[key] for key in columns if key in recent}
     df = pd.DataFrame(recent)
-    return df 
+    for col in FILING_DATE_COLUMNS:
+        if col in df:
+            df[col] = pd.to_datetime(df[col], format="%Y-%m-%d", errors="coerce")
+    return df
 
 def download_filing(filing_url, save_path):
-    headers = {"User-Agent": "Daniel Li dli2004@seas.upenn.edu"}
-    r = requests.get(filing_url, headers=headers)
-    with open(save_path, "wb") as f:
-        f.write(r.content)
\ No newline at end of file
+    """Save one filing document, streamed to disk through the cache and SEC's rate limit."""
+    cached_download(filing_url, save_path, session=_sec_session)
+
+
+def download_filings(urls_and_paths: Iterable[Tuple[str, str]], max_workers: int = SEC_DOWNLOAD_WORKERS) -> List[Path]:
+    """
+    Download many filing documents concurrently, within SEC's request rate.
+
+    Takes (filing_url, save_path) pairs; returns the paths saved, in input
+    order. A failed download is reported and left out rather than aborting
+    the batch.
+    """
+    pairs = list(urls_and_paths)
+
+    def download_one(pair):
+        filing_url, save_path = pair
+        try:
+            download_filing(filing_url, save_path)
+            return Path(save_path)
+        except Exception as e:
+            print(f"[FILINGS] Failed {filing_url}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sec-download") as pool:
+        return [path for path in pool.map(download_one, pairs) if path is not None]
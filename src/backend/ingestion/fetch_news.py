@@ -1,54 +1,54 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import pandas as pd
 import yfinance as yf
 import feedparser
 
+from ingestion.http_cache import cached_get
+from ingestion.http_session import make_session
+from utils.storage import write_ticker_parquet
+
+# Feed fetches are I/O-bound; Google News tolerates this many in parallel
+NEWS_FETCH_WORKERS = 10
+GOOGLE_NEWS_TIMEOUT = 10
+
+# requests asks for gzip/deflate by default; feedparser gets the decoded bytes
+_session = make_session(headers={"User-Agent": feedparser.USER_AGENT})
+
+YFINANCE_NEWS_COLUMNS = ["ticker", "title", "description", "summary", "link", "published", "publisher", "type", "uuid"]
+GOOGLE_NEWS_COLUMNS = ["ticker", "title", "link", "published", "publisher", "type", "uuid"]
+
 def fetch_news(ticker, max_articles=None, source="yfinance"):
     """Fetch news articles for a given ticker."""
-    articles = []
+    # Articles are accumulated column by column; published stays a raw
+    # string until one bulk datetime conversion at the end
+    columns = {}
     
     if source == "yfinance":
         try:
             stock = yf.Ticker(ticker)
             news = stock.news
             
+            columns = {name: [] for name in YFINANCE_NEWS_COLUMNS}
             for article in news:
                 # yfinance news has nested structure with 'content' key
-                content = article.get("content", {})
-                provider = content.get("provider", {})  # provider is inside content
-                canonical_url = content.get("canonicalUrl", {})  # canonicalUrl is inside content
-                click_through_url = content.get("clickThroughUrl", {})
-                
-                # Parse published date
-                published = None
-                if content.get("pubDate"):
-                    try:
-                        published = pd.to_datetime(content.get("pubDate"))
-                    except:
-                        pass
-                
+                content = article.get("content") or {}
+                provider = content.get("provider") or {}  # provider is inside content
                 # Use clickThroughUrl if canonicalUrl is not available
-                link = ""
-                if canonical_url and canonical_url.get("url"):
-                    link = canonical_url.get("url", "")
-                elif click_through_url and click_through_url.get("url"):
-                    link = click_through_url.get("url", "")
+                link = (content.get("canonicalUrl") or {}).get("url") or (content.get("clickThroughUrl") or {}).get("url") or ""
                 
-                article_data = {
-                    "ticker": ticker,
-                    "title": content.get("title", ""),
-                    "description": content.get("description", ""),
-                    "summary": content.get("summary", ""),
-                    "link": link,
-                    "published": published,
-                    "publisher": provider.get("displayName", "") if provider else "",
-                    "type": content.get("contentType", ""),
-                    "uuid": article.get("id", "")
-                }
-                articles.append(article_data)
+                columns["ticker"].append(ticker)
+                columns["title"].append(content.get("title", ""))
+                columns["description"].append(content.get("description", ""))
+                columns["summary"].append(content.get("summary", ""))
+                columns["link"].append(link)
+                columns["published"].append(content.get("pubDate") or None)
+                columns["publisher"].append(provider.get("displayName", ""))
+                columns["type"].append(content.get("contentType", ""))
+                columns["uuid"].append(article.get("id", ""))
                 
-                if max_articles and len(articles) >= max_articles:
+                if max_articles and len(columns["ticker"]) >= max_articles:
                     break
         except Exception as e:
             print(f"Error fetching news from yfinance: {e}")
@@ -56,34 +56,36 @@ def fetch_news(ticker, max_articles=None, source="yfinance"):
             return fetch_news(ticker, max_articles, source="google")
     
     elif source == "google":
+        columns = {name: [] for name in GOOGLE_NEWS_COLUMNS}
         try:
             query = f"{ticker} stock"
             feed_url = f"https://news.google.com/rss/search?q={query}&hl=en-US&gl=US&ceid=US:en"
-            feed = feedparser.parse(feed_url)
+            response = cached_get(feed_url, timeout=GOOGLE_NEWS_TIMEOUT, session=_session)
+            response.raise_for_status()
+            feed = feedparser.parse(response.content)
             
             for entry in feed.entries:
-                article_data = {
-                    "ticker": ticker,
-                    "title": entry.get("title", ""),
-                    "link": entry.get("link", ""),
-                    "published": entry.get("published", ""),
-                    "publisher": entry.get("source", {}).get("title", "") if hasattr(entry, "source") else "",
-                    "type": "google_news",
-                    "uuid": ""
-                }
-                articles.append(article_data)
+                publisher = entry.get("source", {}).get("title", "") if hasattr(entry, "source") else ""
+                columns["ticker"].append(ticker)
+                columns["title"].append(entry.get("title", ""))
+                columns["link"].append(entry.get("link", ""))
+                columns["published"].append(entry.get("published", ""))
+                columns["publisher"].append(publisher)
+                columns["type"].append("google_news")
+                columns["uuid"].append("")
                 
-                if max_articles and len(articles) >= max_articles:
+                if max_articles and len(columns["ticker"]) >= max_articles:
                     break
         except Exception as e:
             print(f"Error fetching news from Google: {e}")
     
-    df = pd.DataFrame(articles)
-    if not df.empty and "published" in df.columns:
-        # Convert published to datetime if it's a string
-        df["published"] = pd.to_datetime(df["published"], errors="coerce")
-        # Sort by published date (most recent first)
-        df = df.sort_values("published", ascending=False).reset_index(drop=True)
+    if not columns.get("ticker"):
+        return pd.DataFrame()
+    df = pd.DataFrame(columns)
+    # Convert published to datetime in one pass (unparseable -> NaT)
+    df["published"] = pd.to_datetime(df["published"], errors="coerce")
+    # Sort by published date (most recent first)
+    df = df.sort_values("published", ascending=False, kind="stable", ignore_index=True)
     
     return df
 
@@ -95,7 +97,17 @@ def fetch_news_and_save(ticker, max_articles=None, save_dir="data/raw/news", sou
     
     if not df.empty:
         filepath = os.path.join(save_dir, f"{ticker}_news.parquet")
-        df.to_parquet(filepath, index=False)
+        write_ticker_parquet(df, filepath)
         print(f"Saved {len(df)} articles to {filepath}")
     
-    return df
\ No newline at end of file
+    return df
+
+def fetch_news_and_save_many(tickers, max_articles=None, save_dir="data/raw/news", source="yfinance",
+                             max_workers=NEWS_FETCH_WORKERS):
+    """Fetch and save news for several tickers concurrently; returns {ticker: DataFrame}."""
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tickers)), thread_name_prefix="news") as pool:
+        frames = pool.map(lambda t: fetch_news_and_save(t, max_articles, save_dir, source), tickers)
+        return dict(zip(tickers, frames))
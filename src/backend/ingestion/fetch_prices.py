@@ -2,17 +2,47 @@ import os
 import yfinance as yf
 import pandas as pd
 
-def fetch_prices(ticker, period="5y", interval="1d"):
-    """Fetch price data for a ticker."""
-    data = yf.download(ticker, period=period, interval=interval)
-    data.reset_index(inplace=True)
-    return data
+from utils.storage import write_ticker_parquets
 
-def fetch_prices_and_save(ticker, period="5y", interval="1d", save_dir="data/raw/prices"):
-    """Fetch price data and save to parquet file."""
+def fetch_prices(tickers, period="5y", interval="1d"):
+    """
+    Fetch price data for one ticker or a list of tickers.
+
+    All tickers go to Yahoo in a single threaded yf.download call. Returns a
+    long DataFrame with one row per (date, ticker); dates on which a ticker
+    has no data (e.g. before it listed) are dropped.
+    """
+    symbols = [tickers] if isinstance(tickers, str) else list(dict.fromkeys(tickers))
+    data = yf.download(
+        symbols, period=period, interval=interval,
+        group_by="ticker", threads=True, progress=False,
+    )
+
+    frames = []
+    for symbol in symbols:
+        if isinstance(data.columns, pd.MultiIndex):
+            if symbol not in data.columns.get_level_values(0):
+                continue
+            frame = data[symbol]
+        else:
+            # Older yfinance releases return flat columns for a single ticker
+            frame = data
+        frame = frame.dropna(how="all")
+        if frame.empty:
+            continue
+        frame = frame.rename_axis(index="date", columns=None).reset_index()
+        frame.insert(1, "ticker", symbol)
+        frames.append(frame)
+
+    if not frames:
+        return pd.DataFrame(columns=["date", "ticker"])
+    return pd.concat(frames, ignore_index=True)
+
+def fetch_prices_and_save(tickers, period="5y", interval="1d", save_dir="data/raw/prices"):
+    """Fetch price data for one or more tickers and save one parquet file per ticker."""
     os.makedirs(save_dir, exist_ok=True)
-    df = fetch_prices(ticker, period, interval)
-    filepath = os.path.join(save_dir, f"{ticker}.parquet")
-    df.to_parquet(filepath, index=False)
-    print(f"Saved price data for {ticker} to {filepath}")
-    return df
\ No newline at end of file
+    df = fetch_prices(tickers, period, interval)
+    # clean_all_prices reads the raw directory as one file per ticker
+    for ticker, filepath in write_ticker_parquets(df, save_dir).items():
+        print(f"Saved price data for {ticker} to {filepath}")
+    return df
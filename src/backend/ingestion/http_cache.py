@@ -0,0 +1,288 @@
+"""
+On-disk cache for upstream HTTP GETs.
+
+Re-running the pipeline for a ticker re-requests the same SEC, API Ninjas,
+Alpha Vantage and Google News URLs. Successful responses are stored under
+``ETLConfig.HTTP_CACHE_DIR`` and replayed while younger than the TTL for
+their host (``ETLConfig.HTTP_CACHE_TTLS``); hosts without a TTL are never
+cached. Request headers (API keys) are not part of the key and never stored.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+import orjson
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from etl.config import ETLConfig
+
+# Response headers worth replaying; the rest describe the original transfer
+_KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Date")
+# Top-level keys marking a 200 JSON body as an error or rate-limit notice
+_ERROR_KEYS = ("error", "Error", "Error Message", "Note", "Information")
+# Read size when streaming a download to disk
+_CHUNK_SIZE = 64 * 1024
+# Statuses (after the session's retries) for which cached_get serves a stale copy
+_STALE_IF_ERROR = (429, 500, 502, 503, 504)
+
+_refresh = threading.Event()
+
+
+def force_refresh(enabled: bool = True) -> None:
+    """Bypass cached responses (they are still rewritten) for the rest of the process."""
+    if enabled:
+        _refresh.set()
+    else:
+        _refresh.clear()
+
+
+def _cache_key(url: str, params: Optional[Dict[str, Any]]) -> str:
+    if params:
+        url = f"{url}{'&' if '?' in url else '?'}{urlencode(sorted(params.items()))}"
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def _ttl_for(url: str, config) -> float:
+    return config.HTTP_CACHE_TTLS.get(urlsplit(url).hostname or "", 0)
+
+
+def _is_error_payload(response: requests.Response, content: Optional[bytes] = None) -> bool:
+    """JSON APIs (Alpha Vantage, API Ninjas) report errors and rate limits in 200 bodies."""
+    if "json" not in response.headers.get("Content-Type", ""):
+        return False
+    try:
+        payload = orjson.loads(response.content if content is None else content)
+    except orjson.JSONDecodeError:
+        return True
+    return isinstance(payload, dict) and any(key in payload for key in _ERROR_KEYS)
+
+
+def _load_meta(meta_path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        return orjson.loads(meta_path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+
+
+def _replay(url: str, body_path: Path, meta: Dict[str, Any]) -> Optional[requests.Response]:
+    try:
+        content = body_path.read_bytes()
+    except OSError:
+        return None
+    response = requests.Response()
+    response.status_code = meta["status_code"]
+    response.url = url
+    response.encoding = meta.get("encoding")
+    response.headers = CaseInsensitiveDict(meta.get("headers", {}))
+    response._content = content
+    return response
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _copy_atomic(source: Path, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    os.close(fd)
+    try:
+        shutil.copyfile(source, tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _store(body_path: Path, meta_path: Path, response: requests.Response, body_file: Optional[Path] = None) -> None:
+    """Cache response; with body_file, its streamed body is copied from that file."""
+    meta = {
+        "status_code": response.status_code,
+        "encoding": response.encoding,
+        "headers": {k: response.headers[k] for k in _KEPT_HEADERS if k in response.headers},
+    }
+    body_path.parent.mkdir(parents=True, exist_ok=True)
+    # Meta first: a body is only read when it is fresh, and its mtime is the fetch time
+    _atomic_write(meta_path, orjson.dumps(meta))
+    if body_file is None:
+        _atomic_write(body_path, response.content)
+    else:
+        _copy_atomic(body_file, body_path)
+
+
+def _is_fresh(body_path: Path, ttl: float) -> bool:
+    try:
+        return time.time() - body_path.stat().st_mtime <= ttl
+    except OSError:
+        return False
+
+
+def _validators(meta: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """Conditional-request headers for a stored response (ETag / Last-Modified)."""
+    stored = (meta or {}).get("headers", {})
+    conditional = {}
+    if "ETag" in stored:
+        conditional["If-None-Match"] = stored["ETag"]
+    if "Last-Modified" in stored:
+        conditional["If-Modified-Since"] = stored["Last-Modified"]
+    return conditional
+
+
+def _cache_paths(url: str, params: Optional[Dict[str, Any]], config) -> Tuple[float, Path, Path]:
+    """(ttl, body path, meta path) for a request; ttl <= 0 means it isn't cached."""
+    ttl = _ttl_for(url, config) if config.HTTP_CACHE_ENABLED else 0
+    key = _cache_key(url, params)
+    body_path = config.HTTP_CACHE_DIR / key[:2] / f"{key}.body"
+    return ttl, body_path, body_path.with_suffix(".json")
+
+
+def cached_get(
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = 30,
+    session: Optional[requests.Session] = None,
+    config=None,
+) -> requests.Response:
+    """
+    requests.get with the response cached on disk per the host's TTL.
+
+    Cached responses come back as requests.Response objects, so callers can
+    keep using raise_for_status(), json(), content and text. Expired entries
+    are revalidated with If-None-Match / If-Modified-Since. Only 200
+    responses that aren't JSON error notices are stored, and URLs (which can
+    carry API keys) are kept only as a hash.
+
+    If the upstream is unreachable, rate limited, failing (5xx) or answers
+    with a JSON error notice, an expired copy is returned instead when one
+    exists, even when force_refresh is on.
+    """
+    config = config or ETLConfig()
+    ttl, body_path, meta_path = _cache_paths(url, params, config)
+    if ttl <= 0:
+        return (session or requests).get(url, params=params, headers=headers, timeout=timeout)
+
+    meta = _load_meta(meta_path)
+    refresh = _refresh.is_set()
+    if meta is not None and not refresh and _is_fresh(body_path, ttl):
+        cached = _replay(url, body_path, meta)
+        if cached is not None:
+            return cached
+
+    get = (session or requests).get
+    # Expired: revalidate, so an unchanged resource comes back as a bodyless 304
+    conditional = {} if refresh else _validators(meta)
+    try:
+        response = get(url, params=params, headers={**(headers or {}), **conditional}, timeout=timeout)
+    except requests.RequestException as exc:
+        stale = _replay(url, body_path, meta) if meta is not None else None
+        if stale is None:
+            raise
+        print(f"[HTTP_CACHE] Using stale response for {urlsplit(url).hostname}: {exc}")
+        return stale
+    if response.status_code == 304 and meta is not None:
+        cached = _replay(url, body_path, meta)
+        if cached is not None:
+            # Restart the TTL from this successful revalidation
+            os.utime(body_path)
+            return cached
+        # Body removed since the metadata was read: fetch it unconditionally
+        response = get(url, params=params, headers=headers, timeout=timeout)
+    failed = response.status_code in _STALE_IF_ERROR
+    if response.status_code == 200:
+        failed = _is_error_payload(response)
+        if not failed:
+            try:
+                _store(body_path, meta_path, response)
+            except OSError as exc:
+                print(f"[HTTP_CACHE] Failed to cache response from {urlsplit(url).hostname}: {exc}")
+    if failed and meta is not None:
+        # e.g. Alpha Vantage's rate-limit notice: yesterday's statement beats none
+        stale = _replay(url, body_path, meta)
+        if stale is not None:
+            print(f"[HTTP_CACHE] Using stale response for {urlsplit(url).hostname} (HTTP {response.status_code})")
+            return stale
+    return response
+
+
+def _stream_to(response: requests.Response, dest: Path) -> None:
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=dest.parent, prefix=dest.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            # iter_content undoes the gzip/deflate transfer encoding chunk by chunk
+            for chunk in response.iter_content(_CHUNK_SIZE):
+                f.write(chunk)
+        os.replace(tmp, dest)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def cached_download(
+    url: str,
+    dest: Path,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = 30,
+    session: Optional[requests.Session] = None,
+    config=None,
+) -> None:
+    """
+    Save a GET response body to dest, through the same cache as cached_get.
+
+    The body is streamed to disk in chunks, never held in memory whole, and
+    dest is replaced atomically. Raises requests.HTTPError for error statuses.
+    """
+    config = config or ETLConfig()
+    dest = Path(dest)
+    ttl, body_path, meta_path = _cache_paths(url, None, config)
+    meta = None if ttl <= 0 or _refresh.is_set() else _load_meta(meta_path)
+    if meta is not None and _is_fresh(body_path, ttl):
+        try:
+            _copy_atomic(body_path, dest)
+            return
+        except OSError:
+            pass
+
+    get = (session or requests).get
+    # Expired: revalidate, so an unchanged resource comes back as a bodyless 304
+    conditional = _validators(meta)
+    with get(url, headers={**(headers or {}), **conditional}, timeout=timeout, stream=True) as response:
+        if response.status_code == 304 and meta is not None:
+            try:
+                _copy_atomic(body_path, dest)
+                # Restart the TTL from this successful revalidation
+                os.utime(body_path)
+                return
+            except OSError:
+                pass
+        else:
+            response.raise_for_status()
+            _stream_to(response, dest)
+    if response.status_code == 304:
+        # Body removed since the metadata was read: fetch it unconditionally
+        with get(url, headers=headers, timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+            _stream_to(response, dest)
+
+    if ttl > 0 and response.status_code == 200:
+        content = dest.read_bytes() if "json" in response.headers.get("Content-Type", "") else b""
+        if not _is_error_payload(response, content):
+            try:
+                _store(body_path, meta_path, response, body_file=dest)
+            except OSError as exc:
+                print(f"[HTTP_CACHE] Failed to cache response from {urlsplit(url).hostname}: {exc}")
+
+
+__all__ = ["cached_download", "cached_get", "force_refresh"]
@@ -0,0 +1,61 @@
+"""
+Shared requests sessions for the ingestion modules.
+
+Each module keeps one module-level Session so repeat calls to SEC, API
+Ninjas, Alpha Vantage and Google News reuse kept-alive connections instead
+of paying a TCP + TLS handshake per request. Rate limits (429) and
+transient server errors are retried with exponential backoff. A session can
+also be given a Throttle, so every request it sends (from any module or
+thread) is spaced to the upstream's rate limit.
+"""
+
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.throttle import Throttle
+
+# Connections kept per host; enough for the concurrent download/probe pools
+POOL_SIZE = 20
+# 0.5s, 1s, 2s, ... between attempts; Retry-After is honoured for 429/503.
+# The last response is returned rather than raised, so callers still see it
+# through raise_for_status().
+RETRY = Retry(
+    total=5,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    raise_on_status=False,
+)
+
+
+class ThrottledSession(requests.Session):
+    """Session that waits on a shared Throttle before sending each request."""
+
+    def __init__(self, throttle: Throttle):
+        super().__init__()
+        self.throttle = throttle
+
+    def send(self, request, **kwargs):
+        # Redirects are sent through here too, so they are spaced as well
+        self.throttle.wait()
+        return super().send(request, **kwargs)
+
+
+def make_session(
+    headers: Optional[Dict[str, str]] = None,
+    pool_size: int = POOL_SIZE,
+    throttle: Optional[Throttle] = None,
+) -> requests.Session:
+    """Session with a pooled, retrying adapter and default headers set once."""
+    session = ThrottledSession(throttle) if throttle is not None else requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=RETRY)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+__all__ = ["make_session"]
@@ -1,14 +1,291 @@
+import ast
+import re
+import numpy as np
 import pandas as pd
+import pyarrow.dataset as ds
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from etl.config import PARQUET_WRITE_OPTIONS
+
+try:
+    import numba as nb
+except ImportError:  # numba is optional; fall back to pandas rolling
+    nb = None
+
+# Date columns aggregate_news_sentiment looks for, in order of preference
+NEWS_DATE_COLUMNS = ["date", "published", "publish_date", "timestamp"]
+# The only news columns build_features uses (news.parquet also holds embeddings)
+NEWS_COLUMNS = ["ticker", "sentiment"] + NEWS_DATE_COLUMNS
+# String form of a yfinance (metric, ticker) column, e.g. "('Close', 'AAPL')"
+_TUPLE_COLUMN_RE = re.compile(r"""^\((['"])([^'"\\]*)\1(?:,\s*(['"])([^'"\\]*)\3,?|,)\s*\)$""")
+
+
+def _read_parquet(path, columns=None, tickers=None):
+    """
+    Read a parquet file with projection and filter pushdown.
+
+    Only the requested columns that exist are decoded (all columns when
+    columns is None), and with tickers only row groups that can hold those
+    tickers are read.
+    """
+    dataset = ds.dataset(str(path), format="parquet")
+    names = dataset.schema.names
+    if columns is not None:
+        columns = [col for col in names if col in columns]
+    row_filter = ds.field("ticker").isin(list(tickers)) if tickers and "ticker" in names else None
+    table = dataset.to_table(columns=columns, filter=row_filter)
+    # The table isn't reused, so let pandas take over its buffers
+    return table.to_pandas(self_destruct=True, split_blocks=True)
+
+
+def _as_datetime(values):
+    """values as datetime64, parsing (invalid -> NaT) only when not already datetime."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    return pd.to_datetime(values, errors="coerce")
+
+
+def _tz_naive(values):
+    """Drop the timezone from a datetime series; naive series are returned as is."""
+    if getattr(values.dtype, "tz", None) is None:
+        return values
+    return values.dt.tz_localize(None)
+
+
+def _flatten_tuple_column(col):
+    """"('Close', 'AAPL')" -> "close_aapl"; other strings are just lowercased."""
+    if not (isinstance(col, str) and col.startswith('(') and col.endswith(')')):
+        return str(col).lower()
+    match = _TUPLE_COLUMN_RE.match(col)
+    if match:
+        parts = (match.group(2), match.group(4))
+    else:
+        # Rare shapes (non-string elements, escapes): parse the literal
+        try:
+            parsed = ast.literal_eval(col)
+        except (ValueError, SyntaxError):
+            return col.lower()
+        if not isinstance(parsed, tuple) or not parsed:
+            return col.lower()
+        parts = (parsed[0], parsed[1] if len(parsed) > 1 else None)
+    new_col = f"{parts[0]}_{parts[1]}" if parts[1] else str(parts[0])
+    return new_col.lower()
+
+
+def _select_ticker_column(prices, candidate_cols):
+    """
+    Per row, the value of the first candidate column whose name contains the
+    row's ticker (NaN when none does).
+
+    The column is resolved once per distinct ticker and filled with array
+    masks, rather than searched again for every row.
+    """
+    codes, tickers = pd.factorize(prices['ticker'], use_na_sentinel=False)
+    conds, choices = [], []
+    for code, ticker in enumerate(tickers):
+        ticker = str(ticker).lower()
+        col = next((c for c in candidate_cols if ticker in c.lower()), None)
+        if col is not None:
+            conds.append(codes == code)
+            choices.append(prices[col].to_numpy())
+    if not conds:
+        return np.full(len(prices), np.nan)
+    if np.logical_or.reduce(conds).all():
+        # Every row matched: keep the columns' own dtype (e.g. integer volume)
+        return np.select(conds, choices)
+    return np.select(conds, choices, default=np.nan)
+
+
+def _grouped_shift(values, position, periods):
+    """values shifted by periods rows within contiguous groups (NaN across a group start)."""
+    shifted = np.full(len(values), np.nan)
+    shifted[periods:] = values[:-periods]
+    shifted[position < periods] = np.nan
+    return shifted
+
+
+# The numba kernel costs ~0.15s to load from its on-disk cache on first use
+# in a process (~1s to compile on a fresh install), while pandas rolling
+# takes ~30ms per million rows; below this size pandas wins
+NUMBA_ROLLING_MIN_ROWS = 5_000_000
+
+
+if nb is not None:
+    # "contract" only lets the running-sum updates use FMA; full fastmath
+    # would assume no NaNs and drop the missing-value checks
+    @nb.njit(parallel=True, cache=True, fastmath={"contract"})
+    def _rolling_std_blocks(values, bounds, window):
+        """
+        Rolling std (ddof=1) within each values[bounds[g]:bounds[g + 1]], blocks in parallel.
+
+        A running sum / sum of squares makes each point O(1) rather than
+        O(window). Values are shifted by the block's first finite value to
+        keep the sum of squares from cancelling; a window holding any
+        non-finite value, or fewer than window rows, is NaN.
+        """
+        out = np.full(len(values), np.nan)
+        for g in nb.prange(len(bounds) - 1):
+            lo, hi = bounds[g], bounds[g + 1]
+            shift = 0.0
+            for i in range(lo, hi):
+                if np.isfinite(values[i]):
+                    shift = values[i]
+                    break
+            total = 0.0
+            squares = 0.0
+            missing = 0
+            for i in range(lo, hi):
+                new = values[i] - shift
+                if np.isfinite(new):
+                    total += new
+                    squares += new * new
+                else:
+                    missing += 1
+                if i - lo >= window:
+                    old = values[i - window] - shift
+                    if np.isfinite(old):
+                        total -= old
+                        squares -= old * old
+                    else:
+                        missing -= 1
+                if i - lo >= window - 1 and missing == 0:
+                    var = (squares - total * total / window) / (window - 1)
+                    out[i] = np.sqrt(var) if var > 0 else 0.0
+        return out
+else:
+    _rolling_std_blocks = None
+
+
+def _grouped_rolling_std(values, starts, position, window):
+    """Rolling std of values within contiguous groups starting at starts (NaN for a group's first window - 1 rows)."""
+    if _rolling_std_blocks is not None and window > 1 and len(values) >= NUMBA_ROLLING_MIN_ROWS:
+        return _rolling_std_blocks(values, np.r_[starts, len(values)].astype(np.int64), window)
+    std = pd.Series(values).rolling(window).std().to_numpy(copy=True)
+    std[position < window - 1] = np.nan
+    return std
 
 
 def compute_price_features(prices_df):
-    """Compute technical features from price data."""
-    prices = prices_df.copy()
-    prices["returns_1d"] = prices.groupby("ticker")["close"].pct_change()
-    prices["momentum_5d"] = prices.groupby("ticker")["close"].pct_change(5)
-    prices["volatility_20d"] = prices.groupby("ticker")["close"].rolling(20).std().reset_index(level=0, drop=True)
-    return prices
+    """
+    Compute technical features from price data.
+
+    Same results as per-ticker groupby pct_change/rolling, but each ticker's
+    closes are laid out contiguously (a stable sort, so row order within a
+    ticker is kept) and every feature is one pass over that array; windows
+    that would reach into the previous ticker are masked out. The input's
+    columns are shared with the returned frame rather than copied.
+    """
+    codes, _ = pd.factorize(prices_df["ticker"])
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    close = prices_df["close"].to_numpy(dtype=np.float64)[order]
+
+    # Row position within its ticker's block
+    group_start = np.r_[True, sorted_codes[1:] != sorted_codes[:-1]] if len(order) else np.array([], dtype=bool)
+    starts = np.flatnonzero(group_start)
+    position = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+
+    # pct_change semantics: x / x.shift(n) - 1, so a zero close gives inf
+    with np.errstate(divide="ignore", invalid="ignore"):
+        features = {
+            "returns_1d": close / _grouped_shift(close, position, 1) - 1,
+            "momentum_5d": close / _grouped_shift(close, position, 5) - 1,
+            "volatility_20d": _grouped_rolling_std(close, starts, position, 20),
+        }
+    columns = {}
+    for name, values in features.items():
+        values[sorted_codes < 0] = np.nan  # rows without a ticker belong to no group
+        out = np.empty(len(order))
+        out[order] = values
+        columns[name] = out
+    return prices_df.assign(**columns)
+
+
+def _grouped_mean(keys, values):
+    """
+    groupby(keys)[values].mean() as a DataFrame, via factorized keys and bincount.
+
+    keys maps output column name -> Series. Groups come out sorted by key,
+    rows with a missing key are dropped and NaN values are skipped, as with
+    groupby; the composite key is factorized once instead of hashed per row.
+    """
+    value_name = values.name
+    combined = np.zeros(len(values), dtype=np.int64)
+    keep = np.ones(len(values), dtype=bool)
+    levels = {}
+    for name, key in keys.items():
+        codes, uniques = pd.factorize(key, sort=True)
+        combined = combined * max(len(uniques), 1) + codes
+        keep &= codes >= 0
+        levels[name] = uniques
+
+    group_ids, groups = pd.factorize(combined[keep], sort=True)
+    values = values.to_numpy(dtype=np.float64)[keep]
+    valid = ~np.isnan(values)
+    sums = np.bincount(group_ids[valid], weights=values[valid], minlength=len(groups))
+    counts = np.bincount(group_ids[valid], minlength=len(groups))
+
+    # Split each composite key back into per-level positions, last level first
+    positions = {}
+    for name, uniques in reversed(list(levels.items())):
+        positions[name] = groups % max(len(uniques), 1)
+        groups = groups // max(len(uniques), 1)
+    columns = {name: uniques.take(positions[name]) for name, uniques in levels.items()}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        columns[value_name] = sums / counts
+    return pd.DataFrame(columns)
+
+
+def _merge_ticker_dates(features, news_sent):
+    """
+    features.merge(news_sent, how="left", on=["ticker", "date"]) for a
+    news_sent with unique (ticker, date) keys and numeric value columns, as
+    produced by aggregate_news_sentiment.
+
+    Both key pairs are mapped to one int64 code over the news keys; each
+    feature row finds its news row through a direct code table when that
+    key space is small, else a binary search over the sorted news codes.
+    Only the distinct tickers and dates of each frame are hashed, and rows
+    keep their order.
+    """
+    tickers = pd.Index(news_sent["ticker"].unique()).sort_values()
+    dates = np.unique(news_sent["date"].to_numpy(dtype="datetime64[ns]").view(np.int64))
+
+    def key_codes(frame):
+        # Missing keys factorize to -1, which picks the appended -1 (no match)
+        codes, uniques = pd.factorize(frame["ticker"])
+        ticker_codes = np.append(tickers.get_indexer(uniques), -1)[codes]
+        codes, uniques = pd.factorize(frame["date"])
+        values = uniques.to_numpy(dtype="datetime64[ns]").view(np.int64)
+        date_codes = np.searchsorted(dates, values).clip(max=max(len(dates) - 1, 0))
+        date_codes = np.append(np.where(dates[date_codes] == values, date_codes, -1), -1)[codes]
+        found = (ticker_codes >= 0) & (date_codes >= 0)
+        return np.where(found, ticker_codes.astype(np.int64) * len(dates) + date_codes, -1)
+
+    news_codes = key_codes(news_sent)
+    feature_codes = key_codes(features)
+    key_space = len(tickers) * len(dates)
+    if key_space <= len(features):
+        # Small key space: a direct code -> news row table, no larger than
+        # the feature codes themselves
+        lookup = np.full(key_space + 1, -1, dtype=np.int64)
+        valid = news_codes >= 0
+        lookup[news_codes[valid]] = np.flatnonzero(valid)
+        positions = lookup[feature_codes]
+    else:
+        order = np.argsort(news_codes, kind="stable")
+        positions = np.searchsorted(news_codes[order], feature_codes).clip(max=len(news_codes) - 1)
+        positions = np.where(news_codes[order][positions] == feature_codes, order[positions], -1)
+    matched = (feature_codes >= 0) & (positions >= 0)
+
+    columns = {}
+    for name in news_sent.columns.drop(["ticker", "date"]):
+        values = news_sent[name].to_numpy(dtype=np.float64)[positions]
+        values[~matched] = np.nan
+        columns[name] = values
+    return features.assign(**columns)
 
 
 def aggregate_news_sentiment(news_df):
@@ -18,7 +295,7 @@ def aggregate_news_sentiment(news_df):
     
     # Check for date column variations
     date_col = None
-    for col in ["date", "published", "publish_date", "timestamp"]:
+    for col in NEWS_DATE_COLUMNS:
         if col in news_df.columns:
             date_col = col
             break
@@ -26,38 +303,37 @@ def aggregate_news_sentiment(news_df):
     if date_col is None:
         # If no date column, aggregate by ticker only
         if "ticker" in news_df.columns:
-            news_sent = news_df.groupby("ticker")["sentiment"].mean().reset_index()
-            return news_sent
+            return _grouped_mean({"ticker": news_df["ticker"]}, news_df["sentiment"])
         else:
             # No ticker column either, return empty
             return pd.DataFrame()
     
-    # Convert date column to datetime (consistent with prices)
-    news_df = news_df.copy()
-    news_df[date_col] = pd.to_datetime(news_df[date_col], errors="coerce")
+    # Convert date column to datetime (consistent with prices); only this
+    # column is converted, the rest of the frame (embeddings) isn't copied
+    dates = _as_datetime(news_df[date_col])
     
     # Group by ticker and date
-    if "ticker" in news_df.columns:
-        news_sent = news_df.groupby(["ticker", date_col])["sentiment"].mean().reset_index()
-        news_sent = news_sent.rename(columns={date_col: "date"})
-    else:
-        news_sent = news_df.groupby(date_col)["sentiment"].mean().reset_index()
-        news_sent = news_sent.rename(columns={date_col: "date"})
-    
-    return news_sent
+    keys = {"ticker": news_df["ticker"]} if "ticker" in news_df.columns else {}
+    keys["date"] = dates
+    return _grouped_mean(keys, news_df["sentiment"])
 
 
 def build_features(prices_path="data/processed/prices.parquet",
                    news_path="data/processed/news.parquet",
-                   output_path="data/processed/features.parquet"):
-    """Build feature set from prices and news data (basic stock-related features only)."""
+                   output_path="data/processed/features.parquet",
+                   tickers=None):
+    """
+    Build feature set from prices and news data (basic stock-related features only).
+
+    With tickers, only those tickers' rows are read from either file.
+    """
     from pathlib import Path
     
     # Load data with error handling
     prices = pd.DataFrame()
     if Path(prices_path).exists():
         try:
-            prices = pd.read_parquet(prices_path)
+            prices = _read_parquet(prices_path, tickers=tickers)
         except Exception as e:
             print(f"Warning: Could not load prices from {prices_path}: {e}")
     else:
@@ -66,7 +342,7 @@ def build_features(prices_path="data/processed/prices.parquet",
     news = pd.DataFrame()
     if Path(news_path).exists():
         try:
-            news = pd.read_parquet(news_path)
+            news = _read_parquet(news_path, columns=NEWS_COLUMNS, tickers=tickers)
         except Exception as e:
             print(f"Warning: Could not load news from {news_path}: {e}")
     else:
@@ -77,26 +353,8 @@ def build_features(prices_path="data/processed/prices.parquet",
         raise ValueError(f"No price data available. Please ensure prices are processed first. Expected file: {prices_path}")
     
     # Fix column names if they're multi-level (from yfinance) or string tuples
-    import ast
     if any(isinstance(col, str) and col.startswith('(') and col.endswith(')') for col in prices.columns):
-        new_columns = []
-        for col in prices.columns:
-            if isinstance(col, str) and col.startswith('(') and col.endswith(')'):
-                try:
-                    parsed = ast.literal_eval(col)
-                    if isinstance(parsed, tuple):
-                        if len(parsed) > 1 and parsed[1]:
-                            new_col = f"{parsed[0]}_{parsed[1]}"
-                        else:
-                            new_col = str(parsed[0])
-                        new_columns.append(new_col.lower())
-                    else:
-                        new_columns.append(col.lower())
-                except:
-                    new_columns.append(col.lower())
-            else:
-                new_columns.append(str(col).lower())
-        prices.columns = new_columns
+        prices.columns = [_flatten_tuple_column(col) for col in prices.columns]
     
     # Handle ticker-specific columns (e.g., close_aapl, close_meta)
     # If we have ticker column and ticker-specific price columns, create unified columns
@@ -104,26 +362,13 @@ def build_features(prices_path="data/processed/prices.parquet",
         close_cols = [col for col in prices.columns if 'close' in col.lower() and '_' in col]
         if close_cols and 'close' not in prices.columns:
             # Create a unified 'close' column by selecting the appropriate ticker-specific column
-            def get_close_value(row):
-                ticker = str(row.get('ticker', '')).lower()
-                for col in close_cols:
-                    if ticker in col.lower():
-                        return row.get(col)
-                return None
-            
-            prices['close'] = prices.apply(get_close_value, axis=1)
+            prices['close'] = _select_ticker_column(prices, close_cols)
             
             # Do the same for other metrics
             for metric in ['open', 'high', 'low', 'volume']:
                 metric_cols = [col for col in prices.columns if metric in col.lower() and '_' in col]
                 if metric_cols and metric not in prices.columns:
-                    def get_metric_value(row, m=metric):
-                        ticker = str(row.get('ticker', '')).lower()
-                        for col in metric_cols:
-                            if ticker in col.lower():
-                                return row.get(col)
-                        return None
-                    prices[metric] = prices.apply(get_metric_value, axis=1)
+                    prices[metric] = _select_ticker_column(prices, metric_cols)
     
     # Ensure we have a 'close' column (check for variations)
     if 'close' not in prices.columns:
@@ -148,7 +393,7 @@ def build_features(prices_path="data/processed/prices.parquet",
             raise ValueError(f"No 'date' column found in price data. Available columns: {prices.columns.tolist()}")
     
     # Ensure date is datetime
-    prices['date'] = pd.to_datetime(prices['date'], errors='coerce')
+    prices['date'] = _as_datetime(prices['date'])
     
     # Compute price features
     prices = compute_price_features(prices)
@@ -158,19 +403,22 @@ def build_features(prices_path="data/processed/prices.parquet",
     if not news.empty:
         news_sent = aggregate_news_sentiment(news)
     
-    # Start with prices as base
-    features = prices.copy()
+    # Start with prices as base (compute_price_features returned a new frame)
+    features = prices
     
     # Merge news sentiment if available
     if not news_sent.empty and "ticker" in news_sent.columns and "date" in news_sent.columns:
         # Ensure date types match for merge (remove timezone info)
         if "date" in features.columns:
-            features["date"] = pd.to_datetime(features["date"]).dt.tz_localize(None)
-            news_sent["date"] = pd.to_datetime(news_sent["date"]).dt.tz_localize(None)
-        features = features.merge(news_sent, how="left", on=["ticker", "date"])
+            features["date"] = _tz_naive(_as_datetime(features["date"]))
+            news_sent["date"] = _tz_naive(_as_datetime(news_sent["date"]))
+        if news_sent.columns.intersection(features.columns).difference(["ticker", "date"]).empty:
+            features = _merge_ticker_dates(features, news_sent)
+        else:
+            features = features.merge(news_sent, how="left", on=["ticker", "date"])
     
     # Save to parquet
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    features.to_parquet(output_path, index=False)
+    features.to_parquet(output_path, index=False, **PARQUET_WRITE_OPTIONS)
     
     return features
\ No newline at end of file
@@ -1,6 +1,26 @@
 import pandas as pd
 import glob
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from etl.config import PARQUET_WRITE_OPTIONS
+
+
+def _fill_gaps(df):
+    """
+    Same result as df.ffill().bfill(), skipping the passes that can't change
+    anything: a frame without gaps (the usual case, as fetch_prices drops
+    empty rows) is returned as is, and after ffill only a leading gap can
+    remain, so bfill runs only when the first row has one.
+    """
+    missing = df.isna().to_numpy()
+    if not missing.any():
+        return df
+    df = df.ffill()
+    if missing[0].any():
+        df = df.bfill()
+    return df
 
 
 def clean_price_file(path):
@@ -80,7 +100,7 @@ def clean_price_file(path):
         if not pd.api.types.is_datetime64_any_dtype(df["date"]):
             df["date"] = pd.to_datetime(df["date"], errors="coerce")
     
-    df = df.ffill().bfill()  # fill gaps
+    df = _fill_gaps(df)
     return df
 
 
@@ -117,7 +137,7 @@ def clean_all_prices(input_dir="data/raw/prices", output_dir="data/processed/pri
         
         # Save cleaned file
         output_path = os.path.join(output_dir, f"{ticker}.parquet")
-        df.to_parquet(output_path, index=False)
+        df.to_parquet(output_path, index=False, **PARQUET_WRITE_OPTIONS)
         
         cleaned.append(df)
     
@@ -131,12 +151,12 @@ def combine_price_files(input_dir="data/raw/prices", output_path="data/processed
     if cleaned:
         combined = pd.concat(cleaned, ignore_index=True)
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        combined.to_parquet(output_path, index=False)
+        combined.to_parquet(output_path, index=False, **PARQUET_WRITE_OPTIONS)
         return combined
     else:
         # Create empty file with expected structure if no data
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         empty_df = pd.DataFrame(columns=["ticker", "date", "close", "open", "high", "low", "volume"])
-        empty_df.to_parquet(output_path, index=False)
+        empty_df.to_parquet(output_path, index=False, **PARQUET_WRITE_OPTIONS)
         print(f"Warning: No price files found in {input_dir}. Created empty file at {output_path}")
         return empty_df
\ No newline at end of file
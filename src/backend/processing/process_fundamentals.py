@@ -1,6 +1,10 @@
 import pandas as pd
 import glob
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from etl.config import PARQUET_WRITE_OPTIONS
 
 
 def compute_ratios(df):
@@ -36,7 +40,7 @@ def process_fundamentals_file(input_path, output_path=None):
     
     # Save processed data
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    df.to_parquet(output_path, index=False)
+    df.to_parquet(output_path, index=False, **PARQUET_WRITE_OPTIONS)
     
     return df
 
@@ -62,13 +66,13 @@ def combine_fundamentals(input_dir="data/raw/fundamentals", output_path="data/pr
     if processed:
         combined = pd.concat(processed, ignore_index=True)
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        combined.to_parquet(output_path, index=False)
+        combined.to_parquet(output_path, index=False, **PARQUET_WRITE_OPTIONS)
         return combined
     else:
         # Create empty file with expected structure if no data
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         empty_df = pd.DataFrame(columns=["ticker"])
-        empty_df.to_parquet(output_path, index=False)
+        empty_df.to_parquet(output_path, index=False, **PARQUET_WRITE_OPTIONS)
         print(f"Warning: No fundamentals files found in {input_dir}. Created empty file at {output_path}")
         return empty_df
 
@@ -1,12 +1,15 @@
+import mmap
 import re
 import pandas as pd
+import pyarrow as pa
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from etl.config import ETLConfig
+from etl.config import ETLConfig, PARQUET_WRITE_OPTIONS
 from processing.docetl_pipelines import (
     DocETLError,
     extract_transcript_insights,
@@ -14,6 +17,9 @@ from processing.docetl_pipelines import (
 from utils.sentiment_model import sentiment
 from utils.nlp import get_embedding
 
+# Raw transcript files: zstd-compressed text, or plain text saved before
+TRANSCRIPT_SUFFIXES = (".txt.zst", ".txt")
+
 
 def split_speakers(text):
     """Split transcript text by speaker."""
@@ -129,14 +135,45 @@ def process_transcript_text(text):
     return rows
 
 
+def transcript_output_name(path) -> str:
+    """Processed parquet filename for a raw transcript file."""
+    name = os.path.basename(path)
+    for suffix in TRANSCRIPT_SUFFIXES:
+        if name.endswith(suffix):
+            return name[:-len(suffix)] + ".parquet"
+    return name
+
+
+def read_transcript_text(path) -> str:
+    """
+    Read a UTF-8 transcript file, plain or zstd-compressed (``.zst``).
+
+    Plain files are memory-mapped and decoded straight from the mapping, so
+    the raw bytes are never copied into a Python buffer first; compressed
+    files are decompressed by pyarrow. Newlines are normalized the way
+    text-mode open() would.
+    """
+    if str(path).endswith(".zst"):
+        with pa.input_stream(str(path), compression="zstd") as f:
+            text = f.read().decode("utf-8")
+    else:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return ""
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                text = str(mm, "utf-8")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
 def process_transcript_file(input_path, output_path=None, config: Optional[ETLConfig] = None):
     """Process a transcript file (txt or parquet) by splitting into segments and computing features."""
     cfg = config or ETLConfig()
     # Check if it's a text file or parquet
-    if str(input_path).endswith('.txt'):
+    if str(input_path).endswith(TRANSCRIPT_SUFFIXES):
         # Read text file directly
-        with open(input_path, "r", encoding="utf-8") as f:
-            text = f.read()
+        text = read_transcript_text(input_path)
     else:
         # Try to read as parquet
         try:
@@ -148,8 +185,7 @@ def process_transcript_file(input_path, output_path=None, config: Optional[ETLCo
                 text = str(df.iloc[0, 0]) if len(df) > 0 else ""
         except:
             # If parquet read fails, try as text
-            with open(input_path, "r", encoding="utf-8") as f:
-                text = f.read()
+            text = read_transcript_text(input_path)
     
     if not text or not text.strip():
         print(f"Warning: Empty transcript file: {input_path}")
@@ -166,15 +202,15 @@ def process_transcript_file(input_path, output_path=None, config: Optional[ETLCo
     
     # Set output path if not provided
     if output_path is None:
-        filename = os.path.basename(input_path).replace(".txt", ".parquet")
+        filename = transcript_output_name(input_path)
         output_path = os.path.join("data/processed/transcripts", filename)
     
     # Save processed data
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    result_df.to_parquet(output_path, index=False)
+    result_df.to_parquet(output_path, index=False, **PARQUET_WRITE_OPTIONS)
 
     if cfg.DOCETL_ENABLED:
-        stem = Path(input_path).stem
+        stem = Path(transcript_output_name(input_path)).stem
         parts = stem.split("_")
         ticker = parts[0] if parts else ""
         quarter = None
@@ -202,11 +238,11 @@ def process_transcript_file(input_path, output_path=None, config: Optional[ETLCo
             if not qa_df.empty:
                 qa_path = cfg.PROCESSED_TRANSCRIPTS_QA_DIR / os.path.basename(output_path)
                 qa_path.parent.mkdir(parents=True, exist_ok=True)
-                qa_df.to_parquet(qa_path, index=False)
+                qa_df.to_parquet(qa_path, index=False, **PARQUET_WRITE_OPTIONS)
             if not guidance_df.empty:
                 guidance_path = cfg.PROCESSED_TRANSCRIPTS_GUIDANCE_DIR / os.path.basename(output_path)
                 guidance_path.parent.mkdir(parents=True, exist_ok=True)
-                guidance_df.to_parquet(guidance_path, index=False)
+                guidance_df.to_parquet(guidance_path, index=False, **PARQUET_WRITE_OPTIONS)
         except DocETLError as exc:
             print(f"[DOCETL][TRANSCRIPT] Failed for {input_path}: {exc}")
     
@@ -221,7 +257,7 @@ def process_transcript_from_text(text, output_path=None, config: Optional[ETLCon
     
     if output_path:
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        result_df.to_parquet(output_path, index=False)
+        result_df.to_parquet(output_path, index=False, **PARQUET_WRITE_OPTIONS)
 
     if cfg.DOCETL_ENABLED:
         try:
@@ -241,12 +277,35 @@ def process_transcript_from_text(text, output_path=None, config: Optional[ETLCon
             if not qa_df.empty:
                 qa_path = cfg.PROCESSED_TRANSCRIPTS_QA_DIR / base_name
                 qa_path.parent.mkdir(parents=True, exist_ok=True)
-                qa_df.to_parquet(qa_path, index=False)
+                qa_df.to_parquet(qa_path, index=False, **PARQUET_WRITE_OPTIONS)
             if not guidance_df.empty:
                 guidance_path = cfg.PROCESSED_TRANSCRIPTS_GUIDANCE_DIR / base_name
                 guidance_path.parent.mkdir(parents=True, exist_ok=True)
-                guidance_df.to_parquet(guidance_path, index=False)
+                guidance_df.to_parquet(guidance_path, index=False, **PARQUET_WRITE_OPTIONS)
         except DocETLError as exc:
             print(f"[DOCETL][TRANSCRIPT] Failed for text input: {exc}")
     
     return result_df
+
+
+def _process_transcript_to_dir(input_path, output_dir, cfg: ETLConfig):
+    filename = transcript_output_name(input_path)
+    output_path = os.path.join(output_dir, filename)
+    return process_transcript_from_text(read_transcript_text(input_path), output_path, config=cfg)
+
+
+def process_transcript_files(files, output_dir, config: Optional[ETLConfig] = None):
+    """
+    Process raw transcript files into output_dir, several at a time.
+
+    Uses a thread pool of PROCESS_WORKERS: the sentiment/embedding models and
+    DocETL calls release the GIL, and worker processes would each have to load
+    the models again. The first failure is re-raised, as in a plain loop.
+    """
+    cfg = config or ETLConfig()
+    files = list(files)
+    workers = min(cfg.PROCESS_WORKERS, len(files))
+    if workers <= 1:
+        return [_process_transcript_to_dir(path, output_dir, cfg) for path in files]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="transcripts") as pool:
+        return list(pool.map(lambda path: _process_transcript_to_dir(path, output_dir, cfg), files))
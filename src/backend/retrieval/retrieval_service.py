@@ -5,6 +5,7 @@ Retrieval service for search over financial documents.
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 import sys
+import threading
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
@@ -164,11 +165,15 @@ class RetrievalService:
 
 # Global service instance
 _retrieval_service = None
+_retrieval_service_lock = threading.Lock()
 
 def get_retrieval_service() -> RetrievalService:
     """Get or create global retrieval service instance."""
     global _retrieval_service
     if _retrieval_service is None:
-        _retrieval_service = RetrievalService()
+        # Double-checked so concurrent first calls build a single instance
+        with _retrieval_service_lock:
+            if _retrieval_service is None:
+                _retrieval_service = RetrievalService()
     return _retrieval_service
 
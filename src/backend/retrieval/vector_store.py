@@ -6,8 +6,6 @@ Uses FAISS for efficient similarity search.
 import faiss
 import numpy as np
 import pickle
-import json
-from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 from io import BytesIO
@@ -108,22 +106,14 @@ class FinancialVectorStore:
                 # No ticker filter, just add to results
                 ticker_matches.append(metadata)
         
-        # Compute ticker presence diagnostics (lightweight scan)
+        # Whether the ticker is in the corpus at all (lightweight scan)
         ticker_present_total = 0
-        ticker_present_doc_type = 0
         if ticker:
             target = ticker.upper()
             ticker_present_total = sum(1 for m in self.metadata if m.get("ticker", "").upper() == target)
-            if doc_type:
-                ticker_present_doc_type = sum(
-                    1
-                    for m in self.metadata
-                    if m.get("ticker", "").upper() == target and m.get("doc_type") == doc_type
-                )
 
         # If ticker exists in the corpus but we got no (or too few) ticker matches in the initial candidate pool,
         # do a bounded second-pass search with a larger pool and merge results.
-        second_pass = {"ran": False, "search_k": None, "ticker_matches": None, "other_results": None}
         if ticker and ticker_present_total > 0 and len(ticker_matches) < min(k, 3):
             try:
                 # Increase candidate pool (bounded). This keeps behavior predictable while improving ticker recall.
@@ -152,7 +142,6 @@ class FinancialVectorStore:
                     # Replace the candidate sets for final selection.
                     ticker_matches = tm2
                     other_results = other2
-                    second_pass = {"ran": True, "search_k": int(big_search_k), "ticker_matches": len(tm2), "other_results": len(other2)}
             except Exception:
                 pass
 
@@ -169,34 +158,6 @@ class FinancialVectorStore:
         # Return top k results (IMPORTANT: computed AFTER optional second pass)
         final = results[:k]
 
-        # region agent log
-        try:
-            with open("/Users/danielli/Documents/penn/fa25/is/.cursor/debug.log", "a") as _f:
-                _f.write(json.dumps({
-                    "sessionId": "debug-session",
-                    "runId": "run-docs-missing-post",
-                    "hypothesisId": "H3",
-                    "location": "vector_store.py:search",
-                    "message": "vector search results",
-                    "data": {
-                        "doc_type": doc_type,
-                        "ticker_param": ticker,
-                        "k": k,
-                        "search_k": search_k,
-                        "ticker_matches": len(ticker_matches),
-                        "other_results": len(other_results),
-                        "returned": len(final),
-                        "sample_returned_tickers": list({m.get('ticker') for m in final if m.get('ticker')})[:5],
-                        "ticker_present_total": ticker_present_total,
-                        "ticker_present_doc_type": ticker_present_doc_type,
-                        "second_pass": second_pass,
-                    },
-                    "timestamp": int(datetime.now().timestamp() * 1000),
-                }) + "\n")
-        except Exception:
-            pass
-        # endregion
-
         return final
     
     def save(self, save_path: Path, use_storage_adapter: bool = False, config=None):
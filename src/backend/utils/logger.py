@@ -2,18 +2,33 @@
 Logging utility for the financial research platform.
 """
 
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 from pathlib import Path
 
 
-def setup_logger(name: str = None, level: int = logging.INFO) -> logging.Logger:
+def _queued(handler: logging.Handler) -> logging.Handler:
+    """Wrap handler so records are enqueued and written by a listener thread."""
+    records = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(records, handler, respect_handler_level=True)
+    listener.start()
+    # Drain anything still queued at interpreter exit
+    atexit.register(listener.stop)
+    return logging.handlers.QueueHandler(records)
+
+
+def setup_logger(name: str = None, level: int = logging.INFO, queued: bool = False) -> logging.Logger:
     """
     Set up a logger with consistent formatting.
     
     Args:
         name: Logger name (typically __name__)
         level: Logging level (default: INFO)
+        queued: Hand records to a background listener thread instead of
+            writing them from the logging thread (for multi-threaded callers)
     
     Returns:
         Configured logger instance
@@ -37,7 +52,7 @@ def setup_logger(name: str = None, level: int = logging.INFO) -> logging.Logger:
     )
     handler.setFormatter(formatter)
     
-    logger.addHandler(handler)
+    logger.addHandler(_queued(handler) if queued else handler)
     
     return logger
 
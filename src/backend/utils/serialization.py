@@ -0,0 +1,102 @@
+"""
+JSON serialization helpers shared by the API and the ETL cache writer.
+
+Both sides must produce byte-identical payloads for the same DataFrame, so the
+cleaning logic lives here rather than in the API module.
+"""
+
+import math
+from datetime import timedelta
+
+import numpy as np
+import orjson
+import pandas as pd
+
+# numpy scalars/arrays are encoded natively; non-finite floats become null
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _clean_value(v):
+    """Make a single object-column value JSON-safe."""
+    if v is None or v is pd.NaT or v is pd.NA:
+        return None
+    if isinstance(v, float):
+        return v if math.isfinite(v) else None
+    if isinstance(v, pd.Timestamp):
+        return v.isoformat()
+    if isinstance(v, np.ndarray):
+        return v.tolist()
+    return v
+
+
+def _isoformat_column(col: pd.Series) -> np.ndarray:
+    """
+    Datetime column -> object array of Timestamp.isoformat() strings (NaT -> None).
+
+    Whole-second naive or UTC columns (the common case for dates, prices and
+    news) are formatted in one numpy call; anything else (sub-second values,
+    non-UTC zones) keeps the per-value isoformat() so the output is unchanged.
+    """
+    tz = getattr(col.dtype, "tz", None)
+    if tz is None:
+        values, suffix = col.to_numpy(), ""
+    elif tz.utcoffset(None) == timedelta(0):
+        values, suffix = col.dt.tz_localize(None).to_numpy(), "+00:00"
+    else:
+        values = None
+
+    if values is not None:
+        missing = np.isnat(values)
+        seconds = values.astype("datetime64[s]")
+        if (seconds[~missing] == values[~missing]).all():
+            strings = np.datetime_as_string(seconds, unit="s")
+            if suffix:
+                strings = np.char.add(strings, suffix)
+            out = strings.astype(object)
+            out[missing] = None
+            return out
+
+    return np.array(
+        [None if ts is pd.NaT else ts.isoformat() for ts in col.astype(object)],
+        dtype=object,
+    )
+
+
+def _clean_column(col: pd.Series) -> np.ndarray:
+    """Return a column as an object array of JSON-safe Python values."""
+    dtype = col.dtype
+    if pd.api.types.is_float_dtype(dtype) and not isinstance(dtype, pd.api.extensions.ExtensionDtype):
+        values = col.to_numpy()
+        if dtype == np.float32:
+            # Keep numpy float32 scalars: orjson writes their shortest float32
+            # repr, whereas Python floats would print the widened float64 digits
+            out = np.empty(len(values), dtype=object)
+            out[:] = list(values)
+        else:
+            out = values.astype(object)
+        out[~np.isfinite(values)] = None
+        return out
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return _isoformat_column(col)
+    if dtype == object:
+        return np.array([_clean_value(v) for v in col.to_numpy()], dtype=object)
+    # ints, bools, strings, categoricals and nullable extension types
+    out = col.to_numpy(dtype=object)
+    missing = col.isna().to_numpy()
+    if missing.any():
+        out[missing] = None
+    return out
+
+
+def clean_dataframe_for_json(df: pd.DataFrame) -> list:
+    """Convert DataFrame to JSON-serializable format, handling NaN values."""
+    # Clean column-wise (vectorized for numeric columns), then zip the
+    # cleaned columns into records; no per-cell pd.isna calls.
+    columns = list(df.columns)
+    cleaned = [_clean_column(df.iloc[:, i]) for i in range(df.shape[1])]
+    return [dict(zip(columns, row)) for row in zip(*cleaned)]
+
+
+def dumps_json(content) -> bytes:
+    """Encode content to compact JSON bytes with orjson."""
+    return orjson.dumps(content, option=ORJSON_OPTIONS)
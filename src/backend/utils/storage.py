@@ -1,10 +1,101 @@
 """
 Storage abstraction layer that supports both local and Supabase storage.
 """
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple, Union
+import numpy as np
 import pandas as pd
-from etl.config import ETLConfig
+import pyarrow as pa
+import pyarrow.parquet as pq
+from etl.config import ETLConfig, PARQUET_WRITE_OPTIONS
+
+# Matches the ticker partitions (etl/partitioning.py)
+ROW_GROUP_SIZE = 131072
+# Concurrent file writes in write_ticker_parquets (pyarrow releases the GIL)
+WRITE_WORKERS = 4
+
+
+def scan_ticker_files(directory: Path, suffix: Union[str, Tuple[str, ...]], ticker: str) -> List[os.DirEntry]:
+    """
+    One ticker's ``{TICKER}_*{suffix}`` files, matched by literal prefix/suffix
+    instead of glob; suffix may be a tuple of alternatives.
+    """
+    prefix = f"{ticker}_"
+    try:
+        with os.scandir(directory) as entries:
+            return [
+                entry for entry in entries
+                if entry.name.startswith(prefix) and entry.name.endswith(suffix) and entry.is_file()
+            ]
+    except FileNotFoundError:
+        return []
+
+
+def staging_path(path: Path) -> Path:
+    """
+    Temporary sibling to write path's new contents to before os.replace.
+
+    Unique per process and thread, so concurrent writers of the same file
+    never truncate or rename each other's half-written copy.
+    """
+    path = Path(path)
+    return path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def _write_table_atomic(table: pa.Table, path: Path) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = staging_path(path)
+    pq.write_table(table, tmp, row_group_size=ROW_GROUP_SIZE, **PARQUET_WRITE_OPTIONS)
+    os.replace(tmp, path)
+
+
+def write_ticker_parquet(df: pd.DataFrame, path: Path) -> None:
+    """
+    Write one ticker's raw frame, replacing the previous file atomically.
+
+    Per-ticker raw files are the unit a refresh replaces, and other tickers'
+    workers may be combining the directory while this one writes, so the
+    file is staged and renamed rather than written in place.
+    """
+    _write_table_atomic(pa.Table.from_pandas(df, preserve_index=False), path)
+
+
+def write_ticker_parquets(
+    df: pd.DataFrame, directory: Path, filename: str = "{ticker}.parquet", column: str = "ticker"
+) -> Dict[str, Path]:
+    """
+    Split a multi-ticker frame into per-ticker files, as write_ticker_parquet
+    would write them one by one; returns {ticker: path}.
+
+    The frame is converted to Arrow once and each ticker's file is a
+    zero-copy slice of that table (rows keep their order within a ticker);
+    the files are written concurrently. Rows without a ticker are dropped.
+    """
+    codes, tickers = pd.factorize(df[column])
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if not np.all(codes[:-1] <= codes[1:]):
+        # Group each ticker's rows together (factorize numbers tickers in
+        # order of appearance, so contiguous rows are already sorted)
+        order = np.argsort(codes, kind="stable")
+        codes = codes[order]
+        table = table.take(order)
+    counts = np.bincount(codes[codes >= 0], minlength=len(tickers))
+    starts = np.searchsorted(codes, np.arange(len(tickers)))
+
+    paths = {ticker: Path(directory) / filename.format(ticker=ticker) for ticker in tickers}
+    with ThreadPoolExecutor(max_workers=WRITE_WORKERS, thread_name_prefix="parquet-write") as pool:
+        futures = [
+            pool.submit(_write_table_atomic, table.slice(start, count), paths[ticker])
+            for ticker, start, count in zip(tickers, starts.tolist(), counts.tolist())
+        ]
+        for future in futures:
+            future.result()
+    return paths
+
 
 class StorageAdapter:
     """Adapter for storage operations that can use local or Supabase."""
@@ -28,7 +119,7 @@ class StorageAdapter:
         """Save DataFrame as parquet, optionally to Supabase."""
         # Always save locally first (for caching/backup)
         path.parent.mkdir(parents=True, exist_ok=True)
-        df.to_parquet(path, index=False)
+        df.to_parquet(path, index=False, **PARQUET_WRITE_OPTIONS)
         
         # Also save to Supabase if enabled
         if self.use_supabase and remote_path and self.storage:
@@ -43,7 +134,7 @@ class StorageAdapter:
             if df is not None:
                 # Cache locally
                 path.parent.mkdir(parents=True, exist_ok=True)
-                df.to_parquet(path, index=False)
+                df.to_parquet(path, index=False, **PARQUET_WRITE_OPTIONS)
                 return df
         
         # Fall back to local
@@ -0,0 +1,25 @@
+"""
+Cross-thread call spacing for rate-limited upstream APIs.
+"""
+
+import threading
+import time
+
+
+class Throttle:
+    """Spaces successive calls at least interval seconds apart, across threads."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self) -> None:
+        if self.interval <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
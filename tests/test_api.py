@@ -0,0 +1,204 @@
+"""
+api.main request handling: /api/ticker responses, single-flight coalescing
+and ETL job state.
+"""
+
+import asyncio
+import gzip
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "backend"))
+
+main = pytest.importorskip("api.main")
+
+from etl.config import ETLConfig
+from etl.ticker_cache import ticker_cache_path, write_ticker_cache
+
+
+@pytest.fixture
+def data_config(tmp_path, monkeypatch):
+    """An ETLConfig whose data directory is tmp_path, with a small prices file."""
+    class Config(ETLConfig):
+        pass
+
+    for name in dir(ETLConfig):
+        value = getattr(ETLConfig, name)
+        if isinstance(value, Path) and value.is_relative_to(ETLConfig.DATA_DIR):
+            setattr(Config, name, tmp_path / value.relative_to(ETLConfig.DATA_DIR))
+    cfg = Config()
+    cfg.PROCESSED_PRICES_FILE.parent.mkdir(parents=True, exist_ok=True)
+    dates = pd.date_range("2024-01-01", periods=20)
+    pd.DataFrame({
+        "ticker": ["AAPL"] * 20 + ["MSFT"] * 20,
+        "date": dates.append(dates),
+        "close": np.r_[np.arange(20) + 100.25, np.arange(20) + 400.5],
+        "volume": np.arange(40) * 1000,
+    }).to_parquet(cfg.PROCESSED_PRICES_FILE, index=False)
+    monkeypatch.setattr(main, "config", cfg)
+    return cfg
+
+
+@pytest.fixture
+def client(data_config):
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+    # No lifespan: the endpoints under test don't need the agent or retrieval service
+    return TestClient(main.app)
+
+
+IDENTITY = {"accept-encoding": "identity"}
+
+
+def _vary(response):
+    return {token.strip() for token in response.headers["vary"].split(",")}
+
+
+def test_ticker_json_etag_and_304(client):
+    response = client.get("/api/ticker/aapl/prices", headers=IDENTITY)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["ticker"] == "AAPL" and body["count"] == 20
+    etag = response.headers["etag"]
+    assert {"Accept", "Accept-Encoding"} <= _vary(response)
+
+    again = client.get("/api/ticker/AAPL/prices", headers={**IDENTITY, "if-none-match": etag})
+    assert again.status_code == 304
+    assert again.headers["etag"] == etag
+    assert {"Accept", "Accept-Encoding"} <= _vary(again)
+
+    stale = client.get("/api/ticker/AAPL/prices", headers={**IDENTITY, "if-none-match": '"other"'})
+    assert stale.status_code == 200
+
+
+def test_precomputed_gzip_payload_has_its_own_etag(client, data_config):
+    write_ticker_cache("AAPL", data_config)
+    assert ticker_cache_path(data_config, "prices", "AAPL").exists()
+    live = client.get("/api/ticker/AAPL/prices", headers=IDENTITY)
+
+    response = client.get("/api/ticker/AAPL/prices", headers={"accept-encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == live.headers["etag"][:-1] + '-gzip"'
+    # Same document as the live JSON, not re-compressed by the middleware
+    assert response.content == live.content
+    raw = ticker_cache_path(data_config, "prices", "AAPL").read_bytes()
+    assert gzip.decompress(raw) == live.content
+
+    revalidated = client.get(
+        "/api/ticker/AAPL/prices",
+        headers={"accept-encoding": "gzip", "if-none-match": response.headers["etag"]},
+    )
+    assert revalidated.status_code == 304
+
+
+def test_ticker_row_selection(client):
+    response = client.get(
+        "/api/ticker/MSFT/prices",
+        params={"since": "2024-01-05", "until": "2024-01-15", "offset": 2, "limit": 3, "columns": "date,close"},
+        headers=IDENTITY,
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["count"] == 3
+    assert [sorted(row) for row in body["data"]] == [["close", "date"]] * 3
+    assert [row["close"] for row in body["data"]] == [406.5, 407.5, 408.5]
+
+    unfiltered = client.get("/api/ticker/MSFT/prices", headers=IDENTITY)
+    assert response.headers["etag"] != unfiltered.headers["etag"]
+
+
+@pytest.mark.parametrize("params, detail", [
+    ({"columns": "close,nope"}, "Unknown columns: nope"),
+    ({"since": "not-a-date"}, "Invalid since date: not-a-date"),
+])
+def test_ticker_row_selection_errors(client, params, detail):
+    response = client.get("/api/ticker/AAPL/prices", params=params, headers=IDENTITY)
+    assert response.status_code == 400
+    assert response.json()["detail"] == detail
+
+
+def test_ticker_arrow_format(client):
+    response = client.get("/api/ticker/AAPL/prices", params={"format": "arrow", "limit": 5})
+    assert response.headers["content-type"] == main.TICKER_MEDIA_TYPES["arrow"]
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.num_rows == 5
+    assert set(table.column("ticker").to_pylist()) == {"AAPL"}
+
+
+def test_ticker_not_found(client):
+    assert client.get("/api/ticker/ZZZZ/prices", headers=IDENTITY).status_code == 404
+    assert client.get("/api/ticker/bad$/prices", headers=IDENTITY).status_code == 400
+
+
+def test_coalesce_runs_compute_once_per_key():
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return b"x"
+
+    async def scenario():
+        waiters = [asyncio.ensure_future(main.coalesce(("once",), compute)) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        release.set()
+        return await asyncio.gather(*waiters)
+
+    assert asyncio.run(scenario()) == [b"x"] * 5
+    assert calls == [1]
+    assert ("once",) not in main._in_flight
+
+
+def test_coalesce_owner_cancel_does_not_fail_followers():
+    release = threading.Event()
+
+    def compute():
+        release.wait(5)
+        return b"x"
+
+    async def scenario():
+        owner = asyncio.ensure_future(main.coalesce(("cancel",), compute))
+        await asyncio.sleep(0.05)
+        follower = asyncio.ensure_future(main.coalesce(("cancel",), compute))
+        await asyncio.sleep(0.05)
+        # The owning client disconnects while the work is still running
+        owner.cancel()
+        await asyncio.sleep(0.05)
+        release.set()
+        assert await follower == b"x"
+        assert owner.cancelled()
+
+    asyncio.run(scenario())
+    assert ("cancel",) not in main._in_flight
+
+
+def test_coalesce_error_reaches_every_caller_and_is_not_kept():
+    def compute():
+        raise ValueError("boom")
+
+    async def scenario():
+        return await asyncio.gather(
+            *(main.coalesce(("error",), compute) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert ("error",) not in main._in_flight
+
+
+def test_failed_etl_run_marks_the_job_failed(monkeypatch):
+    def fail(ticker, *args, **kwargs):
+        raise RuntimeError(f"no data for {ticker}")
+
+    monkeypatch.setattr(main, "run_etl_pipeline", fail)
+    main.etl_jobs.submit(main.etl_job_key("ZZZZ"), main.run_etl_background, "zzzz")
+    job = main.etl_jobs.join(main.etl_job_key("ZZZZ"), timeout=5)
+    assert job["status"] == "failed"
+    assert job["error"] == "no data for ZZZZ"
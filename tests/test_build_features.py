@@ -0,0 +1,161 @@
+"""
+processing.build_features against the pandas groupby/merge code it replaced.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "backend"))
+
+from processing import build_features as bf
+
+
+def _prices(seed=0, rows=2000):
+    """Interleaved tickers of varied length, with NaN tickers and NaN/zero closes."""
+    rng = np.random.default_rng(seed)
+    # SHORT has fewer rows than the 20-day window, TINY fewer than 5
+    tickers = rng.choice(["AAPL", "MSFT", "NVDA", "SHORT", "TINY", None], rows, p=[0.3, 0.3, 0.3, 0.04, 0.01, 0.05])
+    short = np.flatnonzero(tickers == "SHORT")
+    tickers[short[12:]] = "AAPL"
+    tiny = np.flatnonzero(tickers == "TINY")
+    tickers[tiny[3:]] = "MSFT"
+    close = rng.lognormal(4, 0.3, rows)
+    close[rng.random(rows) < 0.03] = np.nan
+    close[rng.random(rows) < 0.01] = 0.0
+    return pd.DataFrame({"ticker": tickers, "close": close, "volume": rng.integers(0, 10**6, rows)})
+
+
+def _assert_close(actual, expected, rtol=1e-9):
+    actual, expected = np.asarray(actual, dtype=np.float64), np.asarray(expected, dtype=np.float64)
+    np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+    np.testing.assert_allclose(actual, expected, rtol=rtol, atol=1e-12)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_compute_price_features_matches_groupby(seed):
+    prices = _prices(seed)
+    grouped = prices.groupby("ticker")["close"]
+    expected = {
+        "returns_1d": grouped.pct_change(),
+        "momentum_5d": grouped.pct_change(5),
+        "volatility_20d": grouped.rolling(20).std().reset_index(level=0, drop=True).reindex(prices.index),
+    }
+
+    features = bf.compute_price_features(prices)
+
+    pd.testing.assert_frame_equal(features[prices.columns], prices)
+    for name, values in expected.items():
+        _assert_close(features[name], values)
+
+
+def test_compute_price_features_empty():
+    features = bf.compute_price_features(_prices().iloc[:0])
+    assert features.empty
+    assert {"returns_1d", "momentum_5d", "volatility_20d"} <= set(features.columns)
+
+
+def _news(seed=0, rows=3000, tz=None):
+    """Sentiment rows with missing tickers/dates and one ticker whose sentiment is all NaN."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2024-01-01", periods=30, freq="D", tz=tz).append(pd.DatetimeIndex([pd.NaT], tz=tz))
+    news = pd.DataFrame({
+        "ticker": rng.choice(["AAPL", "MSFT", "NVDA", "EMPTY", None], rows),
+        "date": dates[rng.integers(0, len(dates), rows)],
+        "sentiment": rng.normal(0, 1, rows),
+    })
+    news.loc[rng.random(rows) < 0.1, "sentiment"] = np.nan
+    news.loc[news["ticker"] == "EMPTY", "sentiment"] = np.nan
+    return news
+
+
+@pytest.mark.parametrize("tz", [None, "UTC", "America/New_York"])
+def test_grouped_mean_matches_groupby(tz):
+    news = _news(tz=tz)
+    expected = news.groupby(["ticker", "date"])["sentiment"].mean().reset_index()
+
+    actual = bf._grouped_mean({"ticker": news["ticker"], "date": news["date"]}, news["sentiment"])
+
+    pd.testing.assert_frame_equal(actual, expected)
+    assert actual.loc[actual["ticker"] == "EMPTY", "sentiment"].isna().all()
+
+
+def test_grouped_mean_single_key():
+    news = _news()
+    expected = news.groupby("ticker")["sentiment"].mean().reset_index()
+    actual = bf._grouped_mean({"ticker": news["ticker"]}, news["sentiment"])
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def _features_and_sentiment(feature_rows, news_tickers, news_days, seed=0):
+    """Feature rows (with NaT dates, unknown and missing tickers) and unique-key sentiment for a subset."""
+    rng = np.random.default_rng(seed)
+    days = pd.date_range("2024-01-01", periods=40, freq="D")
+    features = pd.DataFrame({
+        "ticker": rng.choice(news_tickers + ["UNKNOWN", None], feature_rows),
+        "date": days[rng.integers(0, len(days), feature_rows)],
+        "close": rng.random(feature_rows),
+    })
+    features.loc[rng.random(feature_rows) < 0.05, "date"] = pd.NaT
+    keys = pd.MultiIndex.from_product([news_tickers, days[:news_days]], names=["ticker", "date"])
+    news_sent = keys.to_frame(index=False).sample(frac=0.7, random_state=seed).reset_index(drop=True)
+    news_sent["sentiment"] = rng.normal(0, 1, len(news_sent))
+    news_sent.loc[rng.random(len(news_sent)) < 0.1, "sentiment"] = np.nan
+    return features, news_sent
+
+
+@pytest.mark.parametrize("feature_rows, news_tickers, news_days, table_lookup", [
+    # ticker x date key space no larger than the features: direct code table
+    (5000, ["AAPL", "MSFT", "NVDA"], 30, True),
+    # key space larger than the features: binary search over news codes
+    (50, [f"T{i}" for i in range(40)] + ["AAPL"], 35, False),
+])
+def test_merge_ticker_dates_matches_left_merge(feature_rows, news_tickers, news_days, table_lookup):
+    features, news_sent = _features_and_sentiment(feature_rows, news_tickers, news_days)
+    key_space = news_sent["ticker"].nunique() * news_sent["date"].nunique()
+    assert (key_space <= len(features)) == table_lookup
+
+    expected = features.merge(news_sent, how="left", on=["ticker", "date"])
+    actual = bf._merge_ticker_dates(features, news_sent)
+
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_merge_ticker_dates_no_matches():
+    features, news_sent = _features_and_sentiment(200, ["AAPL"], 10)
+    features["ticker"] = "UNKNOWN"
+    actual = bf._merge_ticker_dates(features, news_sent)
+    assert actual["sentiment"].isna().all()
+    pd.testing.assert_frame_equal(actual.drop(columns="sentiment"), features)
+
+
+@pytest.mark.parametrize("use_numba", [
+    pytest.param(True, marks=pytest.mark.skipif(bf._rolling_std_blocks is None, reason="numba not installed")),
+    False,
+])
+def test_rolling_volatility_matches_pandas(monkeypatch, use_numba):
+    if use_numba:
+        # Force the kernel on a small frame
+        monkeypatch.setattr(bf, "NUMBA_ROLLING_MIN_ROWS", 0)
+    else:
+        monkeypatch.setattr(bf, "_rolling_std_blocks", None)
+    prices = _prices(seed=3, rows=5000)
+    # Large, close-together prices: the running sum of squares must not cancel
+    prices["close"] += 10_000
+    prices.loc[prices.sample(frac=0.002, random_state=0).index, "close"] = np.inf
+    expected = prices.groupby("ticker")["close"].rolling(20).std().reset_index(level=0, drop=True).reindex(prices.index)
+
+    actual = bf.compute_price_features(prices)["volatility_20d"]
+
+    _assert_close(actual, expected, rtol=1e-7)
+
+
+def test_rolling_volatility_constant_prices_is_zero(monkeypatch):
+    monkeypatch.setattr(bf, "NUMBA_ROLLING_MIN_ROWS", 0)
+    prices = pd.DataFrame({"ticker": ["AAPL"] * 30, "close": [5.0] * 30})
+    volatility = bf.compute_price_features(prices)["volatility_20d"]
+    assert volatility[:19].isna().all()
+    assert (volatility[19:] == 0).all()
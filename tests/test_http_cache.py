@@ -0,0 +1,168 @@
+"""
+ingestion.http_cache against a fake session: TTL hits, revalidation, stale
+copies on upstream errors and JSON error notices.
+"""
+
+import io
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import orjson
+import pytest
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "backend"))
+
+from ingestion.http_cache import cached_download, cached_get
+
+URL = "https://api.test/data"
+
+
+def _response(status=200, body=b"", headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    response._content = body
+    # Streamed reads (cached_download) go through raw
+    response.raw = io.BytesIO(body)
+    response.url = URL
+    return response
+
+
+class FakeSession:
+    """Returns queued responses in order, recording each request's headers."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, params=None, headers=None, timeout=None, stream=False):
+        self.requests.append(dict(headers or {}))
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+@pytest.fixture
+def config(tmp_path):
+    return SimpleNamespace(
+        HTTP_CACHE_ENABLED=True,
+        HTTP_CACHE_TTLS={"api.test": 60},
+        HTTP_CACHE_DIR=tmp_path / "http",
+    )
+
+
+def _body_files(config):
+    return list(config.HTTP_CACHE_DIR.rglob("*.body"))
+
+
+def _expire(config):
+    for body in _body_files(config):
+        past = time.time() - 3600
+        os.utime(body, (past, past))
+
+
+JSON = {"Content-Type": "application/json", "ETag": '"v1"'}
+
+
+def test_fresh_entry_is_replayed_without_a_request(config):
+    session = FakeSession(_response(body=b'{"a": 1}', headers=JSON))
+    first = cached_get(URL, session=session, config=config)
+    second = cached_get(URL, session=session, config=config)
+
+    assert len(session.requests) == 1
+    assert second.status_code == 200
+    assert second.json() == first.json() == {"a": 1}
+    assert second.headers["ETag"] == '"v1"'
+
+
+def test_expired_entry_revalidated_with_304(config):
+    session = FakeSession(_response(body=b'{"a": 1}', headers=JSON), _response(status=304))
+    cached_get(URL, session=session, config=config)
+    _expire(config)
+
+    response = cached_get(URL, session=session, config=config)
+    assert session.requests[-1]["If-None-Match"] == '"v1"'
+    assert response.status_code == 200
+    assert response.json() == {"a": 1}
+    # The revalidation restarts the TTL
+    [body] = _body_files(config)
+    assert time.time() - body.stat().st_mtime < 60
+
+
+@pytest.mark.parametrize("failure", [
+    _response(status=503),
+    requests.ConnectionError("unreachable"),
+    _response(body=b'{"Note": "rate limit reached"}', headers={"Content-Type": "application/json"}),
+])
+def test_expired_entry_served_stale_on_upstream_error(config, failure):
+    session = FakeSession(_response(body=b'{"a": 1}', headers=JSON), failure)
+    cached_get(URL, session=session, config=config)
+    _expire(config)
+
+    response = cached_get(URL, session=session, config=config)
+    assert len(session.requests) == 2
+    assert response.status_code == 200
+    assert response.json() == {"a": 1}
+
+
+def test_upstream_error_without_a_cached_copy_is_returned(config):
+    session = FakeSession(_response(status=503))
+    assert cached_get(URL, session=session, config=config).status_code == 503
+    assert _body_files(config) == []
+
+
+def test_json_error_payload_is_not_stored(config):
+    notice = b'{"Error Message": "Invalid API call"}'
+    session = FakeSession(
+        _response(body=notice, headers={"Content-Type": "application/json"}),
+        _response(body=b'{"a": 1}', headers=JSON),
+    )
+    assert cached_get(URL, session=session, config=config).content == notice
+    assert _body_files(config) == []
+
+    assert cached_get(URL, session=session, config=config).json() == {"a": 1}
+    assert len(session.requests) == 2
+
+
+def test_hosts_without_ttl_are_not_cached(config):
+    url = "https://other.test/data"
+    session = FakeSession(_response(body=b"x"), _response(body=b"y"))
+    assert cached_get(url, session=session, config=config).content == b"x"
+    assert cached_get(url, session=session, config=config).content == b"y"
+    assert _body_files(config) == []
+
+
+def test_cached_download_uses_and_revalidates_the_cache(config, tmp_path):
+    html = {"Content-Type": "text/html", "ETag": '"doc"'}
+    session = FakeSession(_response(body=b"<html>10-K</html>", headers=html), _response(status=304))
+    first, second, third = (tmp_path / f"doc{i}.txt" for i in range(3))
+
+    cached_download(URL, first, session=session, config=config)
+    cached_download(URL, second, session=session, config=config)
+    assert len(session.requests) == 1
+    _expire(config)
+    cached_download(URL, third, session=session, config=config)
+
+    assert session.requests[-1]["If-None-Match"] == '"doc"'
+    assert first.read_bytes() == second.read_bytes() == third.read_bytes() == b"<html>10-K</html>"
+
+
+def test_cached_download_does_not_store_json_error_payload(config, tmp_path):
+    notice = orjson.dumps({"error": "quota"})
+    session = FakeSession(_response(body=notice, headers={"Content-Type": "application/json"}))
+    dest = tmp_path / "out.json"
+    cached_download(URL, dest, session=session, config=config)
+    assert dest.read_bytes() == notice
+    assert _body_files(config) == []
+
+
+def test_cached_download_raises_for_error_status(config, tmp_path):
+    session = FakeSession(_response(status=404))
+    with pytest.raises(requests.HTTPError):
+        cached_download(URL, tmp_path / "missing.txt", session=session, config=config)
+    assert not (tmp_path / "missing.txt").exists()
@@ -0,0 +1,56 @@
+"""
+ingestion.http_session: throttled sessions space every request they send.
+"""
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+from requests.adapters import BaseAdapter
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "backend"))
+
+from ingestion.http_session import make_session
+from utils.throttle import Throttle
+
+
+class RecordingAdapter(BaseAdapter):
+    """Answers every request with an empty 200, recording when it was sent."""
+
+    def __init__(self):
+        super().__init__()
+        self.sent = []
+
+    def send(self, request, **kwargs):
+        self.sent.append(time.monotonic())
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b""
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+def test_throttled_session_spaces_requests_across_threads():
+    interval = 0.05
+    session = make_session(headers={"User-Agent": "test"}, throttle=Throttle(interval))
+    adapter = RecordingAdapter()
+    session.mount("https://", adapter)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda i: session.get(f"https://example.test/{i}"), range(6)))
+
+    sent = sorted(adapter.sent)
+    gaps = [b - a for a, b in zip(sent, sent[1:])]
+    assert len(sent) == 6
+    assert min(gaps) >= interval * 0.9
+
+
+def test_plain_session_is_not_throttled():
+    session = make_session()
+    assert type(session) is requests.Session
@@ -0,0 +1,93 @@
+"""
+etl.jobs.ETLJobQueue: deduplication by key and job state.
+"""
+
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "backend"))
+
+from etl.jobs import ETLJobQueue
+
+
+def test_submit_dedupes_active_jobs():
+    queue = ETLJobQueue(max_workers=1)
+    release = threading.Event()
+    calls = []
+
+    def work(n):
+        calls.append(n)
+        release.wait(5)
+        return n
+
+    job, created = queue.submit("etl:AAPL", work, 1)
+    again, created_again = queue.submit("etl:AAPL", work, 2)
+    assert created and not created_again
+    assert again["job_id"] == job["job_id"] == "etl:AAPL"
+
+    release.set()
+    done = queue.join("etl:AAPL", timeout=5)
+    assert done["status"] == "finished"
+    assert done["result"] == 1
+    assert calls == [1]
+
+    # A finished key can be submitted again
+    _, created = queue.submit("etl:AAPL", work, 3)
+    assert created
+    assert queue.join("etl:AAPL", timeout=5)["result"] == 3
+
+
+def test_failed_job_records_error():
+    queue = ETLJobQueue(max_workers=1)
+
+    def work():
+        raise RuntimeError("boom")
+
+    queue.submit("etl:FAIL", work)
+    done = queue.join("etl:FAIL", timeout=5)
+    assert done["status"] == "failed"
+    assert done["error"] == "boom"
+    assert done["result"] is None
+    assert done["finished_at"] is not None
+
+
+def test_follow_running_queues_behind_a_running_job():
+    queue = ETLJobQueue(max_workers=1)
+    started, release = threading.Event(), threading.Event()
+
+    def work(n):
+        started.set()
+        release.wait(5)
+        return n
+
+    queue.submit("index:all", work, 1)
+    assert started.wait(5)
+    # Running: a new job is queued and becomes the one tracked for the key
+    _, created = queue.submit("index:all", work, 2, follow_running=True)
+    assert created
+    # Queued: joined rather than duplicated
+    _, created = queue.submit("index:all", work, 3, follow_running=True)
+    assert not created
+
+    release.set()
+    assert queue.join("index:all", timeout=5)["result"] == 2
+
+
+def test_status_and_wait_for_unknown_and_pending_keys():
+    queue = ETLJobQueue(max_workers=1)
+    release = threading.Event()
+    assert queue.status("etl:NONE") is None
+
+    queue.submit("etl:SLOW", release.wait, 5)
+
+    async def scenario():
+        pending = await queue.wait("etl:SLOW", timeout=0.05)
+        release.set()
+        finished = await queue.wait("etl:SLOW", timeout=5)
+        return pending, finished
+
+    pending, finished = asyncio.run(scenario())
+    assert pending["status"] in ("queued", "running")
+    assert finished["status"] == "finished"
@@ -0,0 +1,77 @@
+"""
+etl.partitioning: per-ticker splits of the combined files and their swap-in.
+"""
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "backend"))
+
+from etl.partitioning import partition_by_ticker, source_fingerprint, ticker_partition_path
+
+
+def _combined(path, tickers=("MSFT", "AAPL", None, "AAPL", "GOOG", "MSFT")):
+    df = pd.DataFrame({"ticker": list(tickers), "close": [float(i) for i in range(len(tickers))]})
+    df.to_parquet(path, index=False)
+    return df
+
+
+def _leftovers(target):
+    return sorted(p.name for p in target.parent.iterdir() if p.name != target.name and p.name != "combined.parquet")
+
+
+def test_partition_by_ticker_splits_in_order(tmp_path):
+    source = tmp_path / "combined.parquet"
+    df = _combined(source)
+    target = tmp_path / "prices"
+
+    assert partition_by_ticker(source, target) == 3
+    for ticker in ("AAPL", "GOOG", "MSFT"):
+        part = pq.read_table(ticker_partition_path(tmp_path, "prices", ticker)).to_pandas()
+        expected = df[df["ticker"] == ticker].reset_index(drop=True)
+        pd.testing.assert_frame_equal(part, expected)
+    assert _leftovers(target) == []
+
+
+def test_partition_by_ticker_replaces_previous_partitions(tmp_path):
+    source = tmp_path / "combined.parquet"
+    target = tmp_path / "prices"
+    _combined(source)
+    partition_by_ticker(source, target)
+
+    _combined(source, tickers=("AAPL", "AAPL"))
+    assert partition_by_ticker(source, target) == 1
+    assert sorted(p.name for p in target.iterdir()) == ["ticker=AAPL"]
+    assert _leftovers(target) == []
+
+
+def test_partition_by_ticker_without_ticker_column(tmp_path):
+    source = tmp_path / "combined.parquet"
+    pd.DataFrame({"close": [1.0]}).to_parquet(source, index=False)
+    assert partition_by_ticker(source, tmp_path / "prices") == 0
+    assert not (tmp_path / "prices").exists()
+
+
+def test_partition_by_ticker_concurrent_writers(tmp_path):
+    source = tmp_path / "combined.parquet"
+    _combined(source)
+    target = tmp_path / "prices"
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        counts = list(pool.map(lambda _: partition_by_ticker(source, target), range(20)))
+
+    assert counts == [3] * 20
+    assert sorted(p.name for p in target.iterdir()) == ["ticker=AAPL", "ticker=GOOG", "ticker=MSFT"]
+    assert _leftovers(target) == []
+
+
+def test_source_fingerprint_tracks_rewrites(tmp_path):
+    source = tmp_path / "combined.parquet"
+    _combined(source)
+    before = source_fingerprint(source)
+    _combined(source, tickers=("AAPL",))
+    assert source_fingerprint(source) != before
@@ -0,0 +1,59 @@
+"""
+etl.ticker_cache.read_ticker_table: projection, ticker filtering and column types.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "backend"))
+
+from etl.ticker_cache import FLOAT32_COLUMNS, read_ticker_table
+
+
+def _features(path):
+    df = pd.DataFrame({
+        "ticker": ["AAPL", "BRK.A", "AAPL", "BRK.A"],
+        "date": pd.date_range("2024-01-01", periods=4),
+        "close": [190.25, 731234.56, 191.5, 732000.01],
+        "volume": [5e7, 1e3, 6e7, 2e3],
+        "returns_1d": [np.nan, 0.01, 0.0066, 1e40],
+        "momentum_5d": [0.1, -0.2, np.nan, 0.3],
+        "volatility_20d": [np.nan, np.nan, np.nan, np.nan],
+        "sentiment": [0.5, np.nan, -0.25, 0.0],
+    })
+    df.to_parquet(path, index=False)
+    return df
+
+
+def test_float32_columns_do_not_depend_on_the_rows_read(tmp_path):
+    source = tmp_path / "features.parquet"
+    _features(source)
+
+    whole = read_ticker_table("features", source)
+    for ticker in ("AAPL", "BRK.A"):
+        assert read_ticker_table("features", source, ticker).schema == whole.schema
+
+    for name in FLOAT32_COLUMNS["features"]:
+        assert whole.schema.field(name).type == pa.float32()
+    # Price levels keep their cents whatever their magnitude
+    assert whole.schema.field("close").type == pa.float64()
+    assert whole.column("close").to_pylist()[1] == 731234.56
+    assert whole.schema.field("volume").type == pa.float64()
+
+
+def test_read_ticker_table_filters_and_projects(tmp_path):
+    source = tmp_path / "news.parquet"
+    pd.DataFrame({
+        "ticker": ["AAPL", "MSFT", "AAPL"],
+        "title": ["a", "b", "c"],
+        "embedding": [np.ones(2, dtype=np.float32)] * 3,
+    }).to_parquet(source, index=False)
+
+    table = read_ticker_table("news", source, "AAPL")
+    assert table.column_names == ["ticker", "title"]
+    assert table.column("title").to_pylist() == ["a", "c"]
+    assert pa.types.is_dictionary(table.schema.field("ticker").type)